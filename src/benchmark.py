@@ -0,0 +1,358 @@
+# src/benchmark.py
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import numpy as np
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from src.jit import JIT_AVAILABLE, numba
+from src.numerics import apply_fvm
+from src.results import OutputSchedule
+from src.solver import BACKENDS, HydraulicSystem
+from src.utilities import initialize_nodes
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default grid sizes and simulated durations (s)
+CELL_COUNTS = (100, 1_000, 10_000, 100_000)
+DURATIONS = (60.0, 600.0)
+DELTA_X = 10.0  # Cell size (m) of every target; main.py's initial dt assumes 10 m cells
+TARGETS = ("system", "apply_fvm", "main")
+# HydraulicSystem engines timed by the system target: the time-loop backends plus
+# the implicit Preissmann scheme and the multi-process subdomain engine
+SYSTEM_BACKENDS = BACKENDS + ("preissmann", "subdomains")
+PREISSMANN_DT = 30.0  # Time step (s) of the preissmann variant
+SUBDOMAINS = 4        # Worker processes of the subdomains variant (fewer on smaller machines)
+
+# main.run_simulation loops over cells in Python; larger grids take minutes per run
+PYTHON_LOOP_MAX_CELLS = 1_000
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+@dataclass
+class BenchmarkResult:
+    target: str
+    backend: str
+    num_cells: int
+    total_time: float            # Simulated time (s)
+    steps: int
+    seconds: float               # Best wall-clock time over the repeats
+    steps_per_second: float
+    cell_updates_per_second: float
+    peak_memory_bytes: Optional[int]  # Peak traced allocation during one run, None if not measured
+    failed: Optional[str] = None      # Why the run is not a valid measurement, None if it is
+
+    @property
+    def key(self) -> Tuple[str, str, int, float]:
+        return self.target, self.backend, self.num_cells, self.total_time
+
+def machine_info() -> Dict[str, Optional[str]]:
+    """
+    Hardware and software the numbers were measured on.
+    """
+    return {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": str(os.cpu_count()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": numba.__version__ if numba is not None else None,
+    }
+
+def machine_tag(info: Optional[Dict[str, Optional[str]]] = None) -> str:
+    """
+    File-name-safe id of a machine: hostname plus a hash of its hardware and library versions.
+    """
+    info = machine_info() if info is None else info
+    digest = hashlib.sha256(json.dumps(info, sort_keys=True).encode()).hexdigest()[:8]
+    host = re.sub(r"[^A-Za-z0-9_.-]+", "-", info.get("hostname") or "unknown")
+    return f"{host}-{digest}"
+
+def _subdomain_count() -> int:
+    return max(2, min(SUBDOMAINS, os.cpu_count() or 1))
+
+def _make_system(num_cells: int, total_time: float, backend: str = "numpy") -> HydraulicSystem:
+    if backend == "preissmann":
+        options = dict(scheme="preissmann", delta_t=PREISSMANN_DT)
+    elif backend == "subdomains":
+        options = dict(subdomains=_subdomain_count())
+    else:
+        options = dict(backend=backend)
+    return HydraulicSystem(initialize_nodes(num_cells, h0=2.0, u0=0.5), delta_x=DELTA_X,
+                           total_time=total_time, CFL=0.9, h_in=2.5, u_in=1.0, h_out=2.0,
+                           output=OutputSchedule.final(), **options)
+
+# Each prepared run returns its step count and final [h, hu], which must be finite
+
+def _prepare_system(num_cells: int, total_time: float, backend: str) -> Callable[[], Tuple[int, np.ndarray]]:
+    system = _make_system(num_cells, total_time, backend)
+
+    def run() -> Tuple[int, np.ndarray]:
+        system.run_simulation(write_back=False)
+        return system.n_steps, system.state.U
+    return run
+
+def _prepare_apply_fvm(num_cells: int, total_time: float, backend: str) -> Callable[[], Tuple[int, np.ndarray]]:
+    system = _make_system(num_cells, total_time)
+
+    def run() -> Tuple[int, np.ndarray]:
+        steps = apply_fvm(system)
+        return steps, np.array([(node.flow.h, node.flow.Q) for node in system.nodes.values()])
+    return run
+
+def _prepare_main(num_cells: int, total_time: float, backend: str) -> Callable[[], Tuple[int, np.ndarray]]:
+    import main  # Standalone script; needs matplotlib
+
+    def run() -> Tuple[int, np.ndarray]:
+        # The script is configured through module globals; use the same grid as the other targets
+        saved = {name: getattr(main, name) for name in ("num_cells", "L", "dx", "total_time", "boundary_conditions")}
+        steps = 0
+        apply_boundaries = main.boundary_conditions
+
+        def counting_boundary_conditions(U_left, U_right, t):
+            # Called exactly once per time step
+            nonlocal steps
+            steps += 1
+            apply_boundaries(U_left, U_right, t)
+
+        main.num_cells, main.L, main.dx, main.total_time = num_cells, num_cells * DELTA_X, DELTA_X, total_time
+        main.boundary_conditions = counting_boundary_conditions
+        try:
+            _, U = main.run_simulation()
+        finally:
+            for name, value in saved.items():
+                setattr(main, name, value)
+        return steps, U
+    return run
+
+_PREPARE = {"system": _prepare_system, "apply_fvm": _prepare_apply_fvm, "main": _prepare_main}
+
+def benchmark_case(target: str, num_cells: int, total_time: float, backend: str = "numpy",
+                   repeat: int = 3, measure_memory: bool = True) -> BenchmarkResult:
+    """
+    Times one target on one grid size and duration.
+
+    Each repeat runs on a freshly built system; the best time is kept, so a
+    first-run JIT compilation only counts when repeat is 1. Peak memory is
+    measured with tracemalloc in one extra run, since tracing slows the run.
+    A run that blows up (non-finite state) is timed but marked as failed, and
+    the remaining repeats and the memory run are skipped.
+    """
+    prepare = _PREPARE[target]
+    best = np.inf
+    steps = 0
+    failed = None
+    for _ in range(max(repeat, 1)):
+        run = prepare(num_cells, total_time, backend)
+        start = time.perf_counter()
+        steps, U = run()
+        best = min(best, time.perf_counter() - start)
+        if not np.all(np.isfinite(U)):
+            failed = f"non-finite state after {steps} steps"
+        elif steps < 1:
+            failed = "no time steps taken"
+        if failed is not None:
+            logger.warning(f"{target}/{backend} {num_cells} cells, {total_time:g}s failed: {failed}")
+            break
+
+    peak = None
+    if measure_memory and failed is None:
+        run = prepare(num_cells, total_time, backend)
+        tracemalloc.start()
+        try:
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+            peak -= base
+        finally:
+            tracemalloc.stop()
+
+    return BenchmarkResult(target=target, backend=backend, num_cells=num_cells, total_time=total_time,
+                           steps=steps, seconds=best, steps_per_second=steps / best,
+                           cell_updates_per_second=steps * num_cells / best, peak_memory_bytes=peak,
+                           failed=failed)
+
+def run_suite(cells: Sequence[int] = CELL_COUNTS, durations: Sequence[float] = DURATIONS,
+              targets: Sequence[str] = TARGETS, backends: Optional[Sequence[str]] = None,
+              repeat: int = 3, measure_memory: bool = True) -> List[BenchmarkResult]:
+    """
+    Runs every combination of target, backend, grid size and duration.
+
+    Args:
+        cells: Grid sizes (cells of DELTA_X m).
+        durations: Simulated durations (s).
+        targets: Any of "system" (HydraulicSystem.run_simulation), "apply_fvm"
+            (numerics.apply_fvm) and "main" (the standalone main.run_simulation).
+        backends: HydraulicSystem engines from SYSTEM_BACKENDS: the "numpy" and "jit"
+            backends, the implicit "preissmann" scheme (delta_t = PREISSMANN_DT) and
+            the "subdomains" engine (up to SUBDOMAINS worker processes); defaults to
+            all that are available here. apply_fvm is reported as "numpy" and main
+            as "python".
+        repeat: Timed runs per case; the best is kept.
+        measure_memory: Also measure the peak traced allocation of each case.
+
+    Unavailable targets and backends are skipped with a warning, and main is
+    only run up to PYTHON_LOOP_MAX_CELLS cells. Runs that blow up are kept
+    with their ``failed`` reason.
+    """
+    for target in targets:
+        if target not in _PREPARE:
+            raise ValueError(f"Unknown target {target!r}; expected one of {TARGETS}.")
+    if backends is None:
+        backends = [b for b in SYSTEM_BACKENDS if b != "jit" or JIT_AVAILABLE]
+    for backend in backends:
+        if backend not in SYSTEM_BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {SYSTEM_BACKENDS}.")
+
+    rows = []
+    for target in targets:
+        if target == "system":
+            target_backends = []
+            for backend in backends:
+                if backend == "jit" and not JIT_AVAILABLE:
+                    logger.warning("Skipping the jit backend: numba is not installed.")
+                    continue
+                target_backends.append(backend)
+        else:
+            target_backends = ["numpy" if target == "apply_fvm" else "python"]
+        if target == "main":
+            try:
+                import main  # noqa: F401
+            except ImportError as e:
+                logger.warning(f"Skipping main.run_simulation: {e}")
+                continue
+
+        for backend in target_backends:
+            for num_cells in cells:
+                if target == "main" and num_cells > PYTHON_LOOP_MAX_CELLS:
+                    logger.info(f"Skipping main.run_simulation on {num_cells} cells (Python loop).")
+                    continue
+                if backend == "subdomains" and num_cells < 2 * _subdomain_count():
+                    logger.info(f"Skipping the subdomains engine on {num_cells} cells (too few cells).")
+                    continue
+                for total_time in durations:
+                    row = benchmark_case(target, num_cells, total_time, backend, repeat, measure_memory)
+                    if row.failed is None:
+                        logger.info(f"{target}/{backend} {num_cells} cells, {total_time:g}s: "
+                                    f"{row.cell_updates_per_second:.3g} cell-updates/s")
+                    rows.append(row)
+    return rows
+
+def save_baseline(results: Sequence[BenchmarkResult], directory: str = BASELINE_DIR,
+                  tag: Optional[str] = None) -> str:
+    """
+    Writes the results and machine info to ``directory/<machine tag>.json``.
+
+    Failed runs are left out, so they never become a baseline.
+
+    Returns:
+        str: Path of the baseline file.
+    """
+    info = machine_info()
+    tag = machine_tag(info) if tag is None else tag
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{tag}.json")
+    payload = {
+        "tag": tag,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": info,
+        "results": [asdict(row) for row in results if row.failed is None],
+    }
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+def load_baseline(path: str) -> List[BenchmarkResult]:
+    with open(path) as f:
+        payload = json.load(f)
+    return [BenchmarkResult(**row) for row in payload["results"]]
+
+def compare(results: Sequence[BenchmarkResult], baseline: Sequence[BenchmarkResult],
+            tolerance: float = 0.2) -> List[Dict]:
+    """
+    Cases that exist in both runs, with the throughput ratio new / baseline.
+
+    A case is flagged as a regression when its cell-updates/s dropped by more
+    than ``tolerance`` (a fraction) compared with the baseline. Failed runs
+    are not compared.
+    """
+    previous = {row.key: row for row in baseline if row.failed is None}
+    rows = []
+    for row in results:
+        old = previous.get(row.key)
+        if old is None or row.failed is not None:
+            continue
+        ratio = row.cell_updates_per_second / old.cell_updates_per_second
+        rows.append({"target": row.target, "backend": row.backend, "num_cells": row.num_cells,
+                     "total_time": row.total_time, "ratio": ratio, "regression": ratio < 1.0 - tolerance})
+    return rows
+
+def format_table(results: Sequence[BenchmarkResult]) -> str:
+    lines = [f"{'target':<10} {'backend':<10} {'cells':>8} {'t_sim':>7} {'steps':>7} {'seconds':>9} "
+             f"{'steps/s':>10} {'cell-upd/s':>11} {'peak MiB':>9}"]
+    for row in results:
+        if row.failed is not None:
+            lines.append(f"{row.target:<10} {row.backend:<10} {row.num_cells:>8} {row.total_time:>7g} "
+                         f"{row.steps:>7}  FAILED: {row.failed}")
+            continue
+        memory = f"{row.peak_memory_bytes / 2 ** 20:9.1f}" if row.peak_memory_bytes is not None else f"{'-':>9}"
+        lines.append(f"{row.target:<10} {row.backend:<10} {row.num_cells:>8} {row.total_time:>7g} {row.steps:>7} "
+                     f"{row.seconds:>9.3f} {row.steps_per_second:>10.1f} {row.cell_updates_per_second:>11.3g} {memory}")
+    return "\n".join(lines)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time the solver across grid sizes, durations and backends.")
+    parser.add_argument("--cells", type=int, nargs="+", default=list(CELL_COUNTS))
+    parser.add_argument("--durations", type=float, nargs="+", default=list(DURATIONS))
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--backends", nargs="+", choices=SYSTEM_BACKENDS, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="Small grids and one short duration.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run.")
+    parser.add_argument("--save", action="store_true", help="Store the results as this machine's baseline.")
+    parser.add_argument("--compare", nargs="?", const="", default=None, metavar="BASELINE",
+                        help="Compare with a baseline file (default: this machine's baseline).")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--baseline-dir", default=BASELINE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.cells, args.durations = [100, 1_000], [60.0]
+    results = run_suite(args.cells, args.durations, args.targets, args.backends, args.repeat,
+                        measure_memory=not args.no_memory)
+    print(f"Machine {machine_tag()}")
+    print(format_table(results))
+
+    # A run that blew up is an error, not a data point
+    status = 1 if any(row.failed is not None for row in results) else 0
+    if args.compare is not None:
+        path = args.compare or os.path.join(args.baseline_dir, f"{machine_tag()}.json")
+        if not os.path.exists(path):
+            print(f"No baseline at {path}")
+        else:
+            print(f"\nCompared with {path}")
+            for row in compare(results, load_baseline(path), args.tolerance):
+                flag = "  REGRESSION" if row["regression"] else ""
+                print(f"{row['target']:<10} {row['backend']:<10} {row['num_cells']:>8} {row['total_time']:>7g} "
+                      f"{row['ratio']:6.2f}x{flag}")
+                status = 1 if row["regression"] else status
+    if args.save:
+        print(f"\nBaseline written to {save_baseline(results, args.baseline_dir)}")
+    return status
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
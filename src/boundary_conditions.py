@@ -4,18 +4,21 @@ from typing import Dict
 from src.models import Node, OpenChannel
 from src.solver import HydraulicSystem
 
-def apply_boundary_conditions(system: 'HydraulicSystem') -> None:
+def apply_boundary_conditions(system: 'HydraulicSystem', t: float = 0.0) -> None:
     """
     Applies boundary conditions to the hydraulic system's nodes.
+
+    A node's inflow or outflow may be a constant or a time series such as an
+    InterpolationTable of (time, discharge), which is evaluated at time t.
     """
     for node_id, node in system.nodes.items():
         if node.boundary_condition == 'Inflow' and node.inflow is not None:
-            node.flow.Q = node.inflow
+            node.flow.Q = node.inflow(t) if callable(node.inflow) else node.inflow
             # Assuming a rectangular channel for OpenChannel
             if isinstance(node.flow, OpenChannel):
                 node.flow.A = node.flow.b * node.flow.h
         elif node.boundary_condition == 'Outflow' and node.outflow is not None:
-            node.flow.Q = node.outflow
+            node.flow.Q = node.outflow(t) if callable(node.outflow) else node.outflow
             # Assuming a rectangular channel for OpenChannel
             if isinstance(node.flow, OpenChannel):
                 node.flow.A = node.flow.b * node.flow.h
@@ -0,0 +1,191 @@
+# src/cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from src.results import SimulationResults
+from src.state import ChannelState
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+_code_version: Optional[str] = None
+
+def code_version() -> str:
+    """
+    Hash of the solver source files, so cached results are dropped when the code changes.
+    """
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(_SRC_DIR)):
+            if name.endswith(".py"):
+                digest.update(name.encode())
+                with open(os.path.join(_SRC_DIR, name), "rb") as f:
+                    digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+def solver_inputs(system) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    Everything that determines a HydraulicSystem's results: scalar settings and per-cell arrays.
+
+    The worker count (subdomains), the checkpoint writer and the profiler are
+    left out since they do not change the results.
+    """
+    output = system.output
+    monitor = system.steady_state
+    scalars = {
+        "delta_x": system.delta_x, "total_time": system.total_time, "CFL": system.CFL,
+        "h_in": system.h_in, "u_in": system.u_in, "h_out": system.h_out,
+        "backend": system.active_backend, "reconstruction": system.reconstruction,
+        "limiter": system.limiter, "time_integration": system.time_integration,
+        "friction": system.friction, "scheme": system.scheme, "delta_t": system.delta_t,
+        "theta": system.theta, "slot_celerity": system.slot_celerity,
+        "output": {
+            "interval": output.interval,
+            "times": None if output.times is None else output.times.tolist(),
+            "every_n_steps": output.every_n_steps,
+            "final_only": output.final_only,
+        },
+        "steady_state": None if monitor is None else {
+            "tol": monitor.tol, "window": monitor.window, "norm": monitor.norm,
+            "check_every": monitor.check_every,
+        },
+    }
+    state = ChannelState.from_nodes(system.nodes)
+    arrays = {"U": state.U, "b": state.b, "S0": state.S0, "n": state.n,
+              "A_fixed": state.A_fixed, "is_open": state.is_open,
+              "crown": state.crown, "slot_ratio": state.slot_ratio}
+    for side in ("upstream", "downstream"):
+        boundary = getattr(system, side)
+        scalars[side] = None if boundary is None else boundary.kind
+        if boundary is not None:
+            for name, table in boundary.tables().items():
+                arrays[f"{side}.{name}.x"] = table.x
+                arrays[f"{side}.{name}.y"] = table.y
+    return scalars, arrays
+
+def cache_key(system) -> str:
+    """
+    Stable content hash of all solver inputs and the code version.
+    """
+    scalars, arrays = solver_inputs(system)
+    digest = hashlib.sha256()
+    digest.update(code_version().encode())
+    digest.update(json.dumps(scalars, sort_keys=True, default=float).encode())
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Two-tier cache of SimulationResults keyed by cache_key.
+
+    The memory tier is an LRU of at most ``memory_items`` results. The disk
+    tier stores one ``.npz`` file per key in ``directory`` and evicts the least
+    recently used files once their total size exceeds ``disk_bytes``. Disk hits
+    are promoted to the memory tier. Safe to share between threads.
+    """
+
+    def __init__(self, directory: str, memory_items: int = 8, disk_bytes: int = 2 ** 30):
+        self.directory = directory
+        self.memory_items = memory_items
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, SimulationResults]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[SimulationResults]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                results = SimulationResults.from_arrays(data["x"], data["time"], data["h"], data["Q"], data["A"])
+            os.utime(path)  # Mark as recently used for eviction
+        except (OSError, KeyError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, results)
+        return results
+
+    def put(self, key: str, results: SimulationResults) -> None:
+        with self._lock:
+            self._remember(key, results)
+        # Sessions share the cache, so two jobs may store the same key at once: each writes its
+        # own temporary file, and the last rename wins with identical contents
+        with tempfile.NamedTemporaryFile(dir=self.directory, prefix=f"{key}.", suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            try:
+                np.savez(f, x=results.x, time=results.time, h=results.h, Q=results.Q, A=results.A)
+            except BaseException:
+                f.close()
+                os.remove(tmp)
+                raise
+        os.replace(tmp, self._path(key))
+        self._evict_disk()
+
+    def _remember(self, key: str, results: SimulationResults) -> None:
+        self._memory[key] = results
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            logger.info(f"Evicted cached result {os.path.basename(path)}")
+
+def run_cached(system, cache: ResultCache):
+    """
+    Returns cached results for the system's inputs, running the simulation on a miss.
+
+    On a hit the nodes are not updated, since no simulation runs.
+
+    Returns:
+        Tuple[SimulationResults, np.ndarray]: Same as HydraulicSystem.run_simulation.
+    """
+    key = cache_key(system)
+    results = cache.get(key)
+    if results is not None:
+        logger.info(f"Result cache hit {key[:12]}")
+        return results, results.x
+    results, x = system.run_simulation()
+    cache.put(key, results)
+    return results, x
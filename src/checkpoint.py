@@ -0,0 +1,172 @@
+# src/checkpoint.py
+
+import os
+import time
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+from src.state import ChannelState
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+@dataclass
+class Checkpoint:
+    """
+    Everything needed to continue a run: the state, clock, boundaries and geometry.
+    """
+    U: np.ndarray          # Conserved variables [h, hu], shape (num_cells, 2)
+    t: float               # Simulated time (s)
+    n_steps: int           # Solver steps taken
+    h_in: float
+    u_in: float
+    h_out: float
+    delta_x: float
+    b: np.ndarray
+    S0: np.ndarray
+    n: np.ndarray
+    A_fixed: np.ndarray
+    is_open: np.ndarray
+    node_ids: List[int]
+    crown: Optional[np.ndarray] = None       # Pipe geometry of mixed systems
+    slot_ratio: Optional[np.ndarray] = None
+
+    @classmethod
+    def capture(cls, system, state: ChannelState, t: float, n_steps: int) -> 'Checkpoint':
+        """
+        Copies the state so the time loop can keep modifying its own arrays.
+        """
+        return cls(U=state.U.copy(), t=float(t), n_steps=int(n_steps),
+                   h_in=float(system.h_in), u_in=float(system.u_in), h_out=float(system.h_out),
+                   delta_x=float(system.delta_x), b=state.b, S0=state.S0, n=state.n,
+                   A_fixed=state.A_fixed, is_open=state.is_open, node_ids=list(state.node_ids),
+                   crown=state.crown, slot_ratio=state.slot_ratio)
+
+    def to_state(self) -> ChannelState:
+        return ChannelState(U=self.U.copy(), b=self.b, S0=self.S0, n=self.n, A_fixed=self.A_fixed,
+                            is_open=self.is_open, node_ids=list(self.node_ids),
+                            crown=None if self.crown is None else self.crown.copy(),
+                            slot_ratio=None if self.slot_ratio is None else self.slot_ratio.copy())
+
+def save_checkpoint(path: str, checkpoint: Checkpoint) -> None:
+    """
+    Writes a checkpoint atomically: to a temporary file in the same directory,
+    flushed to disk and then renamed over ``path``. A crash mid-write leaves the
+    previous checkpoint intact.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, version=CHECKPOINT_VERSION, U=checkpoint.U, t=checkpoint.t, n_steps=checkpoint.n_steps,
+                 boundary=np.array([checkpoint.h_in, checkpoint.u_in, checkpoint.h_out]),
+                 delta_x=checkpoint.delta_x, b=checkpoint.b, S0=checkpoint.S0, n=checkpoint.n,
+                 A_fixed=checkpoint.A_fixed, is_open=checkpoint.is_open,
+                 node_ids=np.asarray(checkpoint.node_ids, dtype=np.int64),
+                 **{name: getattr(checkpoint, name) for name in ("crown", "slot_ratio")
+                    if getattr(checkpoint, name) is not None})
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """
+    Reads a checkpoint written by save_checkpoint.
+    """
+    with np.load(path) as data:
+        if int(data["version"]) != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {int(data['version'])} in {path}.")
+        h_in, u_in, h_out = data["boundary"]
+        return Checkpoint(U=data["U"], t=float(data["t"]), n_steps=int(data["n_steps"]),
+                          h_in=float(h_in), u_in=float(u_in), h_out=float(h_out),
+                          delta_x=float(data["delta_x"]), b=data["b"], S0=data["S0"], n=data["n"],
+                          A_fixed=data["A_fixed"], is_open=data["is_open"],
+                          node_ids=[int(i) for i in data["node_ids"]],
+                          crown=data["crown"] if "crown" in data.files else None,
+                          slot_ratio=data["slot_ratio"] if "slot_ratio" in data.files else None)
+
+class CheckpointWriter:
+    """
+    Periodically saves the solver state for restart after preemption.
+
+    A checkpoint is due every ``every_steps`` solver steps and/or every
+    ``every_seconds`` of wall-clock time. The time loop only copies the state;
+    the file is written on a background thread. If the previous write is still
+    in flight when the next checkpoint is due, that checkpoint is skipped
+    rather than stalling the loop.
+
+    Args:
+        path (str): Checkpoint file, replaced atomically on every write.
+        every_steps (int, optional): Solver steps between checkpoints.
+        every_seconds (float, optional): Wall-clock seconds between checkpoints.
+        check_every (int): Segment length in steps used to poll the wall clock
+            when only every_seconds is given.
+    """
+
+    def __init__(self, path: str, every_steps: Optional[int] = None, every_seconds: Optional[float] = None,
+                 check_every: int = 100):
+        if every_steps is None and every_seconds is None:
+            raise ValueError("CheckpointWriter needs every_steps or every_seconds.")
+        if every_steps is not None and every_steps < 1:
+            raise ValueError("every_steps must be at least 1.")
+        self.path = path
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self.check_every = every_steps if every_steps is not None else max(int(check_every), 1)
+        self.written = 0
+        self.skipped = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+
+    def start(self, n: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        self._last_step = n
+        self._last_time = time.monotonic()
+        self.written = 0
+        self.skipped = 0
+
+    def steps_until_due(self, n: int) -> int:
+        """
+        Solver steps from step n before the writer wants the loop to pause.
+        """
+        if self.every_steps is not None:
+            return self.every_steps - (n - self._last_step) % self.every_steps
+        return self.check_every
+
+    def due(self, n: int) -> bool:
+        if self.every_steps is not None and n - self._last_step >= self.every_steps:
+            return True
+        return self.every_seconds is not None and time.monotonic() - self._last_time >= self.every_seconds
+
+    def maybe_write(self, system, state: ChannelState, t: float, n: int) -> bool:
+        """
+        Queues a checkpoint of the current state if one is due. Returns True if queued.
+        """
+        if not self.due(n):
+            return False
+        self._last_step = n
+        self._last_time = time.monotonic()
+        if self._pending is not None and not self._pending.done():
+            self.skipped += 1
+            logger.info(f"Previous checkpoint still being written; skipping the one at t = {t:.2f}s")
+            return False
+        self._raise_failed_write()
+        self._pending = self._executor.submit(save_checkpoint, self.path, Checkpoint.capture(system, state, t, n))
+        self.written += 1
+        return True
+
+    def _raise_failed_write(self) -> None:
+        if self._pending is not None and self._pending.done() and self._pending.exception() is not None:
+            raise RuntimeError(f"Writing checkpoint {self.path} failed") from self._pending.exception()
+
+    def close(self) -> None:
+        """
+        Waits for the last checkpoint to reach the disk.
+        """
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._raise_failed_write()
+        self._pending = None
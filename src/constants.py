@@ -1,3 +1,4 @@
 # src/constants.py
 
 G = 9.81  # Gravitational acceleration (m/s²)
+H_DRY = 1e-6  # Depth below which a cell is treated as dry (m)
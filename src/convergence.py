@@ -0,0 +1,70 @@
+# src/convergence.py
+
+import numpy as np
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+NORMS = ("l2", "linf")
+
+class SteadyStateMonitor:
+    """
+    Tracks how fast the solution is still changing and detects steady state.
+
+    At every check the change of h and hu since the previous check is divided
+    by the elapsed simulated time, giving residuals in the L2 (root mean square)
+    and L-infinity norms. The run is considered steady once the selected norm
+    of both h and hu stays below ``tol`` for ``window`` consecutive checks.
+
+    Args:
+        tol (float): Residual threshold per unit time (m/s for h, m²/s² for hu).
+        window (int): Number of consecutive checks that must stay below tol.
+        norm (str): "l2" or "linf".
+        check_every (int): Solver steps between checks.
+    """
+
+    def __init__(self, tol: float = 1e-6, window: int = 50, norm: str = "linf", check_every: int = 1):
+        if norm not in NORMS:
+            raise ValueError(f"Unknown norm {norm!r}; expected one of {NORMS}.")
+        if window < 1 or check_every < 1:
+            raise ValueError("window and check_every must be at least 1.")
+        self.tol = tol
+        self.window = window
+        self.norm = norm
+        self.check_every = check_every
+        self.reset()
+
+    def reset(self) -> None:
+        self._rows: List[tuple] = []
+        self._below = 0
+        self.converged = False
+        self.converged_time = None
+
+    def update(self, t: float, elapsed: float, U_old: np.ndarray, U_new: np.ndarray) -> bool:
+        """
+        Records the residuals of one check and returns True once steady state is reached.
+        """
+        if elapsed <= 0:
+            return self.converged
+        change = (U_new - U_old) / elapsed
+        l2 = np.sqrt(np.mean(change ** 2, axis=0))
+        linf = np.max(np.abs(change), axis=0)
+        self._rows.append((t, l2[0], linf[0], l2[1], linf[1]))
+
+        residual = l2 if self.norm == "l2" else linf
+        self._below = self._below + 1 if np.all(residual < self.tol) else 0
+        if self._below >= self.window and not self.converged:
+            self.converged = True
+            self.converged_time = t
+            logger.info(f"Steady state reached at t = {t:.2f}s ({self.norm} residual below {self.tol:g})")
+        return self.converged
+
+    @property
+    def history(self) -> Dict[str, np.ndarray]:
+        """
+        Residual history as arrays keyed by "Time", "L2 (h)", "Linf (h)", "L2 (hu)" and "Linf (hu)".
+        """
+        rows = np.array(self._rows).reshape(-1, 5)
+        keys = ("Time", "L2 (h)", "Linf (h)", "L2 (hu)", "Linf (hu)")
+        return {key: rows[:, k] for k, key in enumerate(keys)}
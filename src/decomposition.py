@@ -0,0 +1,318 @@
+# src/decomposition.py
+
+import multiprocessing as mp
+import os
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError, Thread
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.numerics import max_wave_speed
+from src.state import ChannelState
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Slots of the shared control array
+_COMMAND, _T, _T_STOP, _MAX_STEPS = range(4)
+_EXIT, _ADVANCE = 0.0, 1.0
+
+def split_cells(num_cells: int, subdomains: int, min_cells: int = 1) -> List[Tuple[int, int]]:
+    """
+    Splits 0..num_cells-1 into contiguous, nearly equal (lo, hi) cell ranges.
+    """
+    if subdomains < 1:
+        raise ValueError("subdomains must be at least 1.")
+    if num_cells < subdomains * min_cells:
+        raise ValueError(f"{num_cells} cells cannot be split into {subdomains} subdomains "
+                         f"of at least {min_cells} cells.")
+    bounds = np.linspace(0, num_cells, subdomains + 1).round().astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+class _SharedArray:
+    """
+    A float64 NumPy array backed by a named shared memory block.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], name: Optional[str] = None):
+        size = int(np.prod(shape)) * 8
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(size, 8))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.shape = shape
+        self.array = np.ndarray(shape, dtype=float, buffer=self.shm.buf)
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, ...]]:
+        return self.shm.name, self.shape
+
+    def close(self, unlink: bool = False) -> None:
+        del self.array
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def _subdomain_stage(system, U_src: np.ndarray, lo: int, hi: int, ng: int,
+                     S0: np.ndarray, n: np.ndarray, dt: float, U_ext: np.ndarray) -> np.ndarray:
+    """
+    One forward-Euler stage for cells lo..hi-1, reading ng halo cells from U_src.
+
+    Halo cells come from the neighbouring subdomains' part of the shared array;
+    physical boundary ghosts are filled exactly as in the serial solver.
+    """
+    N = len(U_src)
+    a, b = max(lo - ng, 0), min(hi + ng, N)
+    U_ext[ng - (lo - a):ng + (hi - lo) + (b - hi)] = U_src[a:b]
+    if lo == 0:
+        system._fill_upstream_ghosts(U_ext, ng)
+    if hi == N:
+        system._fill_downstream_ghosts(U_ext, ng, U_src[N - 1, 1])
+    F = system._ghosted_fluxes(U_ext)
+    return system._finite_volume_update(U_src[lo:hi], F, S0, n, dt)
+
+def _worker(k: int, system, bounds: List[Tuple[int, int]], specs: Dict[str, Tuple[str, Tuple[int, ...]]],
+            S0: np.ndarray, n: np.ndarray, start, done, barrier) -> None:
+    """
+    Worker loop: advances subdomain k on command until told to exit.
+
+    Every step the workers publish their local maximum wave speed and agree on
+    the same global dt; each Runge-Kutta stage ends with a barrier so that the
+    halo cells read by the next stage are complete.
+    """
+    shared = {key: _SharedArray(shape, name) for key, (name, shape) in specs.items()}
+    U, U1, U2 = shared["U"].array, shared["U1"].array, shared["U2"].array
+    speeds, control, report = shared["speeds"].array, shared["control"].array, shared["report"].array
+    lo, hi = bounds[k]
+    ng = 2 if system.reconstruction == "muscl" else 1
+    U_ext = np.zeros((hi - lo + 2 * ng, 2))
+    S0, n = S0[lo:hi], n[lo:hi]
+    dx, CFL = system.delta_x, system.CFL
+    scheme = system.time_integration
+    own = slice(lo, hi)
+
+    def stage(U_src, dt):
+        return _subdomain_stage(system, U_src, lo, hi, ng, S0, n, dt, U_ext)
+
+    try:
+        while True:
+            start.wait()
+            if control[_COMMAND] == _EXIT:
+                break
+            t, t_stop, max_steps = control[_T], control[_T_STOP], control[_MAX_STEPS]
+            steps = 0
+            max_speed = 0.0
+            while t < t_stop and steps < max_steps:
+                # Global reduction of the CFL time step
+                speeds[k] = max_wave_speed(U[own])
+                barrier.wait()
+                max_speed = speeds.max()
+                dt = CFL * dx / max_speed if max_speed > 0 else CFL * dx / 1e-3
+                reached = t + dt >= t_stop
+                if reached:
+                    dt = t_stop - t
+
+                # SSP Runge-Kutta stages, with a halo exchange after each
+                U1[own] = stage(U, dt)
+                barrier.wait()
+                if scheme == "ssp_rk2":
+                    U2[own] = 0.5 * U[own] + 0.5 * stage(U1, dt)
+                    barrier.wait()
+                    U[own] = U2[own]
+                elif scheme == "ssp_rk3":
+                    U2[own] = 0.75 * U[own] + 0.25 * stage(U1, dt)
+                    barrier.wait()
+                    U1[own] = U[own] / 3.0 + (2.0 / 3.0) * stage(U2, dt)
+                    barrier.wait()
+                    U[own] = U1[own]
+                else:
+                    U[own] = U1[own]
+
+                t = t_stop if reached else t + dt
+                steps += 1
+            if k == 0:
+                report[:] = (t, steps, max_speed)
+            done.wait()
+    except BrokenBarrierError:
+        pass
+    except Exception:
+        logger.exception(f"Subdomain worker {k} failed")
+        for b in (barrier, start, done):
+            b.abort()
+    finally:
+        del U, U1, U2, speeds, control, report
+        for array in shared.values():
+            array.close()
+
+class SubdomainPool:
+    """
+    Advances one HydraulicSystem with its cell range split across worker processes.
+
+    The state and the Runge-Kutta stage buffers live in shared memory. Each
+    worker owns a contiguous block of cells and reads its one (two for MUSCL)
+    halo cells directly from the neighbouring blocks of the shared arrays, so
+    the halo exchange costs one barrier per stage. A per-step reduction of the
+    local wave speeds gives every worker the same global dt, and all kernels
+    are the serial ones applied to slices, so results are identical to the
+    serial NumPy run.
+
+    Use as a context manager around the time loop; ``advance`` has the same
+    signature as HydraulicSystem's advance methods. ``context`` is the
+    multiprocessing context to start the workers with (the default start
+    method when None). While waiting for the workers, the parent checks every
+    ``poll_interval`` seconds that they are all alive, and ``advance`` raises
+    instead of waiting forever if one has died.
+    """
+
+    def __init__(self, system, state: ChannelState, subdomains: int, context=None, poll_interval: float = 0.5):
+        ng = 2 if system.reconstruction == "muscl" else 1
+        self.bounds = split_cells(state.num_cells, subdomains, min_cells=ng)
+        self.subdomains = subdomains
+        shape = state.U.shape
+        self._shared = {
+            "U": _SharedArray(shape),
+            "U1": _SharedArray(shape),
+            "U2": _SharedArray(shape),
+            "speeds": _SharedArray((subdomains,)),
+            "control": _SharedArray((4,)),
+            "report": _SharedArray((3,)),
+        }
+        specs = {key: array.spec for key, array in self._shared.items()}
+        ctx = context if context is not None else mp.get_context()
+        self._start = ctx.Barrier(subdomains + 1)
+        self._done = ctx.Barrier(subdomains + 1)
+        # Kept referenced until close: a spawned worker rebuilds the barrier's semaphores by name
+        self._barrier = ctx.Barrier(subdomains)
+        self._workers = [
+            ctx.Process(target=_worker, daemon=True,
+                        args=(k, system, self.bounds, specs, state.S0, state.n, self._start, self._done,
+                              self._barrier))
+            for k in range(subdomains)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._poll_interval = poll_interval
+
+    def _dead_workers(self) -> List[str]:
+        return [f"worker {k} (exit code {worker.exitcode})" for k, worker in enumerate(self._workers)
+                if not worker.is_alive()]
+
+    def _wait(self, barrier) -> None:
+        """
+        Waits at a barrier shared with the workers, raising RuntimeError if a worker dies meanwhile.
+
+        The wait runs in a helper thread: a timed-out or aborted multiprocessing
+        barrier wakes every process waiting on it and blocks until each one
+        acknowledges, so it would hang on a dead worker itself.
+        """
+        failed = []
+
+        def wait():
+            try:
+                barrier.wait()
+            except BrokenBarrierError:
+                failed.append(True)
+
+        waiter = Thread(target=wait, daemon=True)
+        waiter.start()
+        while True:
+            waiter.join(self._poll_interval)
+            if not waiter.is_alive():
+                break
+            dead = self._dead_workers()
+            if dead:
+                raise RuntimeError(f"Subdomain {', '.join(dead)} died; see the log for its traceback.")
+        if failed:
+            raise RuntimeError("A subdomain worker failed; see the log for its traceback.")
+
+    def __enter__(self) -> 'SubdomainPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def advance(self, state: ChannelState, t: float, t_stop: float, max_steps: int, n: int):
+        """
+        Advance the shared state until t_stop or max_steps steps.
+        """
+        U = self._shared["U"].array
+        control = self._shared["control"].array
+        U[:] = state.U
+        control[:] = (_ADVANCE, t, t_stop, float(max_steps))
+        self._wait(self._start)
+        self._wait(self._done)
+        t, steps, max_speed = self._shared["report"].array
+        steps = int(steps)
+        state.U = U.copy()
+
+        # Logging
+        if (n + steps) // 20 > n // 20:
+            logger.info(f"Time step {n + steps}, Time {t:.2f}s, Max Speed {max_speed:.2f} m/s "
+                        f"({self.subdomains} subdomains)")
+        return float(t), steps
+
+    def close(self) -> None:
+        """
+        Stops the workers and releases the shared memory.
+        """
+        if not self._workers:
+            return
+        control = self._shared["control"].array
+        control[_COMMAND] = _EXIT
+        if self._dead_workers():
+            # The others are stuck at a barrier the dead worker never reaches
+            for worker in self._workers:
+                worker.terminate()
+        else:
+            try:
+                self._start.wait(timeout=10.0)
+            except BrokenBarrierError:
+                pass
+        for worker in self._workers:
+            worker.join(timeout=10.0)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+        for array in self._shared.values():
+            array.close(unlink=True)
+
+def scaling_benchmark(num_cells: int = 200_000, total_time: float = 5.0,
+                      cores: Optional[Sequence[int]] = None, **options) -> List[Dict[str, float]]:
+    """
+    Wall-clock time of the same run on 1..N subdomains.
+
+    Args:
+        num_cells: Number of cells of the test channel (1 m spacing).
+        total_time: Simulated time (s).
+        cores: Subdomain counts to time; defaults to 1, 2, 4, ... up to os.cpu_count().
+        options: Extra HydraulicSystem arguments, e.g. reconstruction="muscl".
+
+    Returns:
+        List[Dict[str, float]]: One row per core count with seconds, speedup and efficiency.
+    """
+    from src.results import OutputSchedule
+    from src.solver import HydraulicSystem
+    from src.utilities import initialize_nodes
+
+    if cores is None:
+        max_cores = os.cpu_count() or 1
+        cores = sorted({2 ** p for p in range(int(np.log2(max_cores)) + 1)} | {max_cores})
+    rows = []
+    for count in cores:
+        system = HydraulicSystem(initialize_nodes(num_cells, h0=2.0, u0=0.5), delta_x=1.0,
+                                 total_time=total_time, CFL=0.9, h_in=2.5, u_in=1.0, h_out=2.0,
+                                 output=OutputSchedule.final(), subdomains=count, **options)
+        start = time.perf_counter()
+        system.run_simulation(write_back=False)
+        seconds = time.perf_counter() - start
+        base = rows[0]["seconds"] * rows[0]["cores"] if rows else seconds * count
+        rows.append({"cores": count, "seconds": seconds, "speedup": base / seconds,
+                     "efficiency": base / seconds / count})
+        logger.info(f"{count} subdomains: {seconds:.2f}s")
+    return rows
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    for row in scaling_benchmark():
+        print(f"{row['cores']:>3} cores  {row['seconds']:8.2f} s  speedup {row['speedup']:5.2f}  "
+              f"efficiency {row['efficiency']:4.0%}")
@@ -0,0 +1,155 @@
+# src/ensemble.py
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+from src.models import Node
+from src.numerics import hll_flux_array, compute_source_array, max_wave_speed
+from src.results import OutputSchedule
+from src.state import ChannelState
+import logging
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[float, np.ndarray]
+
+@dataclass
+class EnsembleResults:
+    time: np.ndarray   # Snapshot times, shape (num_snapshots,)
+    h: np.ndarray      # Depth, shape (num_snapshots, members, num_cells)
+    hu: np.ndarray     # Unit discharge, shape (num_snapshots, members, num_cells)
+    x: np.ndarray      # Cell positions (m)
+    steps: np.ndarray  # Solver steps taken by each member
+
+def _member_cell_array(value: Optional[ArrayLike], default: np.ndarray) -> np.ndarray:
+    """
+    Shapes a per-member parameter as (members, cells) for broadcasting.
+
+    None takes the per-cell node values; a 1-D array is one value per member.
+    """
+    if value is None:
+        return default[None, :]
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 0:
+        return value.reshape(1, 1)
+    if value.ndim == 1:
+        return value[:, None]
+    return value
+
+class EnsembleSystem:
+    """
+    Advances many scenarios of the same channel in lockstep as one batched array.
+
+    The state has shape (members, num_cells, 2). Boundary values, Manning's n
+    and the bed slope may be given per member (shape (members,)) or per member
+    and cell (shape (members, num_cells)); scalars are shared by all members.
+    Geometry defaults come from the nodes.
+
+    With ``time_step="shared"`` every member advances with the smallest CFL
+    time step of the ensemble. With ``time_step="per_member"`` each member uses
+    its own CFL step and members wait for each other only at output times, so
+    every member reproduces its standalone HydraulicSystem run.
+    """
+
+    def __init__(self, nodes: Dict[int, Node], delta_x: float, total_time: float, CFL: float,
+                 h_in: ArrayLike, u_in: ArrayLike, h_out: ArrayLike,
+                 n: Optional[ArrayLike] = None, S0: Optional[ArrayLike] = None,
+                 time_step: str = "shared", output: Optional[OutputSchedule] = None):
+        if time_step not in ("shared", "per_member"):
+            raise ValueError("time_step must be 'shared' or 'per_member'.")
+        self.base = ChannelState.from_nodes(nodes)
+        self.delta_x = delta_x
+        self.total_time = total_time
+        self.CFL = CFL
+        self.time_step = time_step
+        self.output = output if output is not None else OutputSchedule.final()
+        if not self.output.is_time_based:
+            raise ValueError("Ensemble runs need a time-based output schedule.")
+
+        num_cells = self.base.num_cells
+        h_in, u_in, h_out = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (h_in, u_in, h_out))
+        n = _member_cell_array(n, self.base.n)
+        S0 = _member_cell_array(S0, self.base.S0)
+
+        self.members = np.broadcast_shapes(h_in.shape, u_in.shape, h_out.shape, n.shape[:1], S0.shape[:1])[0]
+        self.h_in = np.broadcast_to(h_in, (self.members,))
+        self.u_in = np.broadcast_to(u_in, (self.members,))
+        self.h_out = np.broadcast_to(h_out, (self.members,))
+        self.n = np.broadcast_to(n, (self.members, num_cells))
+        self.S0 = np.broadcast_to(S0, (self.members, num_cells))
+
+    def initial_state(self) -> np.ndarray:
+        return np.broadcast_to(self.base.U, (self.members,) + self.base.U.shape).copy()
+
+    def run(self, U0: Optional[np.ndarray] = None) -> EnsembleResults:
+        """
+        Run all members to total_time and return the scheduled snapshots.
+        """
+        M = self.members
+        num_cells = self.base.num_cells
+        dx = self.delta_x
+        CFL = self.CFL
+        U = self.initial_state() if U0 is None else np.array(U0, dtype=float)
+
+        output_times = self.output.output_times(self.total_time)
+        if len(output_times) == 0 or output_times[-1] < self.total_time:
+            # Always march to total_time even if the last output is earlier
+            targets = np.append(output_times, self.total_time)
+        else:
+            targets = output_times
+        snap_time, snap_h, snap_hu = [], [], []
+
+        t = np.zeros(M)
+        steps = np.zeros(M, dtype=int)
+        sweeps = 0
+        U_ext = np.zeros((M, num_cells + 2, 2))
+        for target in targets:
+            if target <= 0.0 and target in output_times:
+                snap_time.append(0.0)
+                snap_h.append(U[..., 0].copy())
+                snap_hu.append(U[..., 1].copy())
+                continue
+
+            while np.any(t < target):
+                # Ghost cells for every member at once
+                U_ext[:, 1:-1] = U
+                U_ext[:, 0, 0] = self.h_in
+                U_ext[:, 0, 1] = self.h_in * self.u_in
+                U_ext[:, -1, 0] = self.h_out
+                U_ext[:, -1, 1] = U_ext[:, -2, 1]
+
+                F = hll_flux_array(U_ext[:, :-1], U_ext[:, 1:])
+
+                max_speed = max_wave_speed(U, axis=1)
+                dt = CFL * dx / np.where(max_speed > 0, max_speed, 1e-3)
+                if self.time_step == "shared":
+                    dt = np.full(M, dt.min())
+                # Members that already reached the target wait with dt = 0
+                dt = np.minimum(dt, target - t)
+                active = dt > 0
+
+                S = compute_source_array(U, self.S0, self.n)
+                scale = dt[:, None, None]
+                U = U - (scale / dx) * (F[:, 1:] - F[:, :-1]) + scale * S
+
+                t = np.where(dt >= target - t, target, t + dt)
+                steps += active
+                sweeps += 1
+
+                # Logging
+                if sweeps % 20 == 0:
+                    logger.info(f"Ensemble sweep {sweeps}, Time {t.min():.2f}-{t.max():.2f}s, Members {M}")
+
+            if target in output_times:
+                snap_time.append(target)
+                snap_h.append(U[..., 0].copy())
+                snap_hu.append(U[..., 1].copy())
+
+        x = np.arange(num_cells) * dx
+        return EnsembleResults(
+            time=np.array(snap_time),
+            h=np.array(snap_h).reshape(len(snap_time), M, num_cells),
+            hu=np.array(snap_hu).reshape(len(snap_time), M, num_cells),
+            x=x,
+            steps=steps
+        )
@@ -0,0 +1,165 @@
+# src/hydrographs.py
+
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+class InterpolationTable:
+    """
+    Piecewise-linear table y(x) evaluated with a cursor.
+
+    The slope of every interval is precomputed, and the cursor remembers the
+    interval of the last lookup. Lookups that stay in that interval or move to
+    an adjacent one (a time series stepped forward, a slowly changing
+    discharge) cost O(1); any other jump falls back to a binary search. Values
+    outside the table are held at the first and last samples.
+
+    Args:
+        x (array): Strictly increasing sample positions, e.g. times (s).
+        y (array): Values at the samples.
+    """
+
+    def __init__(self, x: ArrayLike, y: ArrayLike):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if x.ndim != 1 or x.shape != y.shape or len(x) == 0:
+            raise ValueError("x and y must be non-empty 1D arrays of the same length.")
+        if np.any(np.diff(x) <= 0):
+            raise ValueError("Table positions must be strictly increasing.")
+        self.x = x
+        self.y = y
+        slopes = np.zeros(len(x))
+        slopes[:-1] = np.diff(y) / np.diff(x)
+        # Plain lists: indexing them with Python ints is cheaper than indexing arrays
+        self._x = x.tolist()
+        self._y = y.tolist()
+        self._slopes = slopes.tolist()
+        self._last = len(x) - 1
+        self._k = 0
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def reset(self) -> None:
+        self._k = 0
+
+    def __call__(self, x: float) -> float:
+        xs = self._x
+        k = self._k
+        if x < xs[k] or (k < self._last and x >= xs[k + 1]):
+            k = self._locate(x, k)
+            self._k = k
+        if x <= xs[0]:
+            return self._y[0]
+        return self._y[k] + self._slopes[k] * (x - xs[k])
+
+    def _locate(self, x: float, k: int) -> int:
+        xs = self._x
+        # Neighbouring intervals first, then a binary search
+        if k + 1 < self._last and xs[k + 1] <= x < xs[k + 2]:
+            return k + 1
+        if k > 0 and xs[k - 1] <= x < xs[k]:
+            return k - 1
+        return max(int(np.searchsorted(self.x, x, side="right")) - 1, 0)
+
+def _table(times: ArrayLike, values: Union[float, ArrayLike]) -> InterpolationTable:
+    values = np.broadcast_to(np.asarray(values, dtype=float), np.shape(times))
+    return InterpolationTable(times, values)
+
+class DischargeInflow:
+    """
+    Upstream discharge hydrograph Q(t) (m³/s).
+
+    The mass flux through the upstream face is set to the unit discharge
+    Q / b of the first cell, so exactly Q enters the channel. The ghost cell
+    carries that unit discharge and the depth of the first cell (zero
+    gradient), so the depth is free to respond.
+    """
+    kind = "discharge"
+
+    def __init__(self, times: ArrayLike, discharge: ArrayLike):
+        self.discharge = _table(times, discharge)
+
+    def reset(self) -> None:
+        self.discharge.reset()
+
+    def __call__(self, t: float, U: np.ndarray, b: np.ndarray) -> Tuple[float, float]:
+        return float(U[0, 0]), self.discharge(t) / float(b[0])
+
+    def tables(self) -> Dict[str, InterpolationTable]:
+        return {"discharge": self.discharge}
+
+class StageInflow:
+    """
+    Upstream stage hydrograph h(t) (m), with an optional velocity series u(t) (m/s).
+
+    Without a velocity the ghost cell takes the velocity of the first cell.
+    """
+    kind = "stage"
+
+    def __init__(self, times: ArrayLike, stage: ArrayLike, velocity: Optional[Union[float, ArrayLike]] = None):
+        self.stage = _table(times, stage)
+        self.velocity = _table(times, velocity) if velocity is not None else None
+
+    def reset(self) -> None:
+        self.stage.reset()
+        if self.velocity is not None:
+            self.velocity.reset()
+
+    def __call__(self, t: float, U: np.ndarray, b: np.ndarray) -> Tuple[float, float]:
+        h = self.stage(t)
+        if self.velocity is not None:
+            u = self.velocity(t)
+        else:
+            u = float(U[0, 1] / U[0, 0]) if U[0, 0] > 0 else 0.0
+        return h, h * u
+
+    def tables(self) -> Dict[str, InterpolationTable]:
+        tables = {"stage": self.stage}
+        if self.velocity is not None:
+            tables["velocity"] = self.velocity
+        return tables
+
+class StageOutflow:
+    """
+    Downstream stage series h(t) (m), e.g. a tide.
+    """
+    kind = "stage"
+
+    def __init__(self, times: ArrayLike, stage: ArrayLike):
+        self.stage = _table(times, stage)
+
+    def reset(self) -> None:
+        self.stage.reset()
+
+    def __call__(self, t: float, U: np.ndarray, b: np.ndarray) -> float:
+        return self.stage(t)
+
+    def tables(self) -> Dict[str, InterpolationTable]:
+        return {"stage": self.stage}
+
+class RatingCurveOutflow:
+    """
+    Downstream rating curve: the stage follows from the discharge leaving the last cell.
+
+    Args:
+        stage (array): Stages of the rating table (m).
+        discharge (array): Discharges at those stages (m³/s), strictly increasing.
+    """
+    kind = "rating"
+
+    def __init__(self, stage: ArrayLike, discharge: ArrayLike):
+        self.rating = InterpolationTable(discharge, stage)
+
+    def reset(self) -> None:
+        self.rating.reset()
+
+    def __call__(self, t: float, U: np.ndarray, b: np.ndarray) -> float:
+        return self.rating(float(U[-1, 1] * b[-1]))
+
+    def tables(self) -> Dict[str, InterpolationTable]:
+        return {"rating": self.rating}
@@ -0,0 +1,151 @@
+# src/jit.py
+
+import numpy as np
+from src.constants import G
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Numba is optional: without it the solver falls back to the NumPy backend
+try:
+    import numba
+except ImportError:  # pragma: no cover - depends on the environment
+    numba = None
+
+JIT_AVAILABLE = numba is not None
+
+def _njit(func):
+    """
+    Compiles func with Numba when available, caching the machine code on disk
+    (in __pycache__, or NUMBA_CACHE_DIR) so warm starts skip recompilation.
+    """
+    if numba is None:
+        return func
+    return numba.njit(cache=True, fastmath=False)(func)
+
+@_njit
+def _physical_flux(h, hu):
+    u = hu / h if h > 0 else 0.0
+    return hu, hu * u + 0.5 * G * h ** 2
+
+@_njit
+def _hll(h_L, hu_L, h_R, hu_R):
+    u_L = hu_L / h_L if h_L > 0 else 0.0
+    c_L = np.sqrt(G * h_L) if h_L > 0 else 0.0
+    u_R = hu_R / h_R if h_R > 0 else 0.0
+    c_R = np.sqrt(G * h_R) if h_R > 0 else 0.0
+
+    S_L = min(u_L - c_L, u_R - c_R)
+    S_R = max(u_L + c_L, u_R + c_R)
+
+    F0_L, F1_L = _physical_flux(h_L, hu_L)
+    F0_R, F1_R = _physical_flux(h_R, hu_R)
+    if S_L >= 0:
+        return F0_L, F1_L
+    if S_R <= 0:
+        return F0_R, F1_R
+    inv = 1.0 / (S_R - S_L)
+    F0 = (S_R * F0_L - S_L * F0_R + S_L * S_R * (h_R - h_L)) * inv
+    F1 = (S_R * F1_L - S_L * F1_R + S_L * S_R * (hu_R - hu_L)) * inv
+    return F0, F1
+
+@_njit
+def advance(U, S0, n_manning, dx, CFL, h_in, u_in, h_out, t, t_stop, max_steps):
+    """
+    Compiled time loop: boundary fill, HLL fluxes, CFL reduction and update.
+
+    Advances U in place until t_stop or max_steps steps, whichever comes
+    first, using the same boundary conditions as HydraulicSystem.
+
+    Returns:
+        Tuple[float, int, float]: New time, steps taken and last max wave speed.
+    """
+    num_cells = U.shape[0]
+    U_ext = np.empty((num_cells + 2, 2))
+    F = np.empty((num_cells + 1, 2))
+    steps = 0
+    max_speed = 0.0
+    while t < t_stop and steps < max_steps:
+        # Apply boundary conditions
+        for i in range(num_cells):
+            U_ext[i + 1, 0] = U[i, 0]
+            U_ext[i + 1, 1] = U[i, 1]
+        U_ext[0, 0] = h_in
+        U_ext[0, 1] = h_in * u_in
+        U_ext[num_cells + 1, 0] = h_out
+        U_ext[num_cells + 1, 1] = U_ext[num_cells, 1]
+
+        # Fluxes at interfaces
+        for i in range(num_cells + 1):
+            F[i, 0], F[i, 1] = _hll(U_ext[i, 0], U_ext[i, 1], U_ext[i + 1, 0], U_ext[i + 1, 1])
+
+        # CFL reduction
+        max_speed = 0.0
+        for i in range(num_cells):
+            h = U[i, 0]
+            u = U[i, 1] / h if h > 0 else 0.0
+            c = np.sqrt(G * h) if h > 0 else 0.0
+            max_speed = max(max_speed, abs(u) + c)
+        dt = CFL * dx / max_speed if max_speed > 0 else CFL * dx / 1e-3
+        if t + dt >= t_stop:
+            dt = t_stop - t
+            t_next = t_stop
+        else:
+            t_next = t + dt
+
+        # Conservative update with source term
+        for i in range(num_cells):
+            h = U[i, 0]
+            hu = U[i, 1]
+            u = hu / h if h > 0 else 0.0
+            Sf = n_manning[i] ** 2 * u * abs(u) / (h ** (4 / 3)) if h > 0 else 0.0
+            U[i, 0] = h - (dt / dx) * (F[i + 1, 0] - F[i, 0])
+            U[i, 1] = hu - (dt / dx) * (F[i + 1, 1] - F[i, 1]) + dt * (-G * h * (S0[i] + Sf))
+
+        t = t_next
+        steps += 1
+    return t, steps, max_speed
+
+@_njit
+def _gvf_slope(depth, q, S0, n_manning, h_limit, subcritical):
+    # dh/dx of the gradually-varied-flow equation, -(S0 + Sf) / (1 - Fr²), with the solver's sign
+    # convention (momentum source -g h (S0 + Sf), Sf = n² q|q| / h^(10/3)). The depth is kept on
+    # the subcritical or supercritical side of h_limit
+    depth = max(depth, h_limit) if subcritical else min(depth, h_limit)
+    Sf = n_manning ** 2 * q * abs(q) / depth ** (10 / 3)
+    Fr2 = q ** 2 / (G * depth ** 3)
+    return -(S0 + Sf) / (1.0 - Fr2)
+
+@_njit
+def gvf_march(profile, order, h, step, q, S0, n_manning, h_limit, h_dry, subcritical, uniform_from):
+    """
+    RK4 march of steady.gvf_profile from the control depth h through the cells in order.
+
+    Writes the depth of every cell into profile. Once a step leaves the depth
+    unchanged at or after position uniform_from, from which the bed slope and
+    roughness no longer change, the remaining cells take that depth without
+    being marched.
+
+    Returns:
+        int: The first cell whose depth had to be clamped at h_limit, or -1.
+    """
+    clamped = -1
+    for k in range(len(order)):
+        i = order[k]
+        k1 = _gvf_slope(h, q, S0[i], n_manning[i], h_limit, subcritical)
+        k2 = _gvf_slope(h + 0.5 * step * k1, q, S0[i], n_manning[i], h_limit, subcritical)
+        k3 = _gvf_slope(h + 0.5 * step * k2, q, S0[i], n_manning[i], h_limit, subcritical)
+        k4 = _gvf_slope(h + step * k3, q, S0[i], n_manning[i], h_limit, subcritical)
+        h_next = h + step * (k1 + 2 * k2 + 2 * k3 + k4) / 6.0
+        if (subcritical and h_next < h_limit) or (not subcritical and h_next > h_limit):
+            if clamped < 0:
+                clamped = i
+            h_next = h_limit
+        h_next = max(h_next, h_dry)
+        profile[i] = h_next
+        if h_next == h and k >= uniform_from:
+            for j in range(k + 1, len(order)):
+                profile[order[j]] = h_next
+            break
+        h = h_next
+    return clamped
@@ -0,0 +1,183 @@
+# src/jobs.py
+
+import itertools
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional
+from src.cache import ResultCache, cache_key
+from src.results import SimulationResults
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+@dataclass
+class JobProgress:
+    status: str
+    t: float                    # Simulated time reached (s)
+    total_time: float
+    steps: int
+    steps_per_second: float
+    sim_seconds_per_second: float
+    profile: Optional[np.ndarray]  # Latest [h, hu] profile, shape (num_cells, 2), or None
+    profile_time: float
+
+    @property
+    def fraction(self) -> float:
+        return min(self.t / self.total_time, 1.0) if self.total_time > 0 else 1.0
+
+class SimulationJob:
+    """
+    One HydraulicSystem run executed on a background thread.
+
+    The run consumes system.iter_steps(), storing the scheduled snapshots and
+    publishing a copy of the current profile at most every
+    ``profile_interval`` wall-clock seconds. cancel() is checked after every
+    solver step; the step iterator is then closed, which releases worker
+    processes and checkpoint writers.
+    """
+
+    def __init__(self, job_id: int, system, cache: Optional[ResultCache] = None, profile_interval: float = 0.5):
+        self.id = job_id
+        self.system = system
+        self.cache = cache
+        self.profile_interval = profile_interval
+        self.status = QUEUED
+        self.results: Optional[SimulationResults] = None
+        self.x = np.arange(len(system.nodes)) * system.delta_x
+        self.error: Optional[str] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._t = 0.0
+        self._steps = 0
+        self._started = 0.0
+        self._finished: Optional[float] = None
+        self._profile: Optional[np.ndarray] = None
+        self._profile_time = 0.0
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, CANCELLED, FAILED)
+
+    def progress(self) -> JobProgress:
+        with self._lock:
+            end = self._finished if self._finished is not None else time.monotonic()
+            elapsed = end - self._started if self._started else 0.0
+            rate = self._steps / elapsed if elapsed > 0 else 0.0
+            sim_rate = self._t / elapsed if elapsed > 0 else 0.0
+            return JobProgress(status=self.status, t=self._t, total_time=self.system.total_time,
+                               steps=self._steps, steps_per_second=rate, sim_seconds_per_second=sim_rate,
+                               profile=self._profile, profile_time=self._profile_time)
+
+    def _publish(self, view) -> None:
+        with self._lock:
+            self._profile = np.array(view.U)
+            self._profile_time = view.t
+
+    def run(self) -> None:
+        if self._cancel.is_set():
+            self.status = CANCELLED
+            return
+        self.status = RUNNING
+        self._started = time.monotonic()
+        try:
+            key = cache_key(self.system) if self.cache is not None else None
+            cached = self.cache.get(key) if key is not None else None
+            if cached is not None:
+                self.results = cached
+                self._t = self.system.total_time
+                self.status = DONE
+                return
+
+            output_times = self.system.output.output_times(self.system.total_time)
+            results = SimulationResults(self.x, capacity=len(output_times) if output_times is not None else 0)
+            last_publish = 0.0
+            iterator = self.system.iter_steps()
+            try:
+                for view in iterator:
+                    if view.recorded:
+                        state = self.system.state
+                        results.append(view.t, state.head(), view.hu, state.area())
+                    with self._lock:
+                        self._t, self._steps = view.t, view.step
+                    now = time.monotonic()
+                    if view.recorded or now - last_publish >= self.profile_interval:
+                        self._publish(view)
+                        last_publish = now
+                    if self._cancel.is_set():
+                        break
+            finally:
+                iterator.close()
+
+            self.results = results
+            if self._cancel.is_set() and self._t < self.system.total_time:
+                self.status = CANCELLED
+                logger.info(f"Job {self.id} cancelled at t = {self._t:.2f}s")
+                return
+            if self.cache is not None:
+                self.cache.put(key, results)
+            self.status = DONE
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.status = FAILED
+            logger.exception(f"Job {self.id} failed")
+        finally:
+            with self._lock:
+                self._finished = time.monotonic()
+
+class JobManager:
+    """
+    Runs SimulationJobs on a shared thread pool.
+
+    One manager per server process lets several users submit runs without
+    blocking each other's UI: each job runs on its own pool thread and is
+    polled through its id. Finished jobs are kept until forget() is called.
+    """
+
+    def __init__(self, max_workers: int = 4, cache: Optional[ResultCache] = None):
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="simulation")
+        self._jobs: Dict[int, SimulationJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, system, profile_interval: float = 0.5) -> SimulationJob:
+        with self._lock:
+            job = SimulationJob(next(self._ids), system, self.cache, profile_interval)
+            self._jobs[job.id] = job
+        self._executor.submit(job.run)
+        return job
+
+    def get(self, job_id: int) -> Optional[SimulationJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: int) -> None:
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def forget(self, job_id: int) -> None:
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None and not job.finished:
+            job.cancel()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        self._executor.shutdown(wait=True)
@@ -1,7 +1,7 @@
 # src/models.py
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional, Union
 
 @dataclass
 class Flow:
@@ -25,13 +25,17 @@ class OpenChannel(Flow):
 class PressurizedPipe(Flow):
     Af: float     # Full cross-sectional area (m²)
     Cp: float     # Speed of pressure wave (m/s)
-    B: float      # Free surface width (m)
+    B: float      # Preissmann slot width (m), g Af / Cp² when not positive
+    D: Optional[float] = None  # Conduit height (m), defaults to the diameter of a circular pipe of area Af
+    S0: float = 0.0            # Bed slope (dimensionless)
+    n: float = 0.0             # Manning's roughness coefficient
+    top_width: Optional[float] = None  # Free-surface width (m) written back by the solver
 
 @dataclass
 class Node:
     id: int
     flow: Flow
     boundary_condition: Optional[str] = None  # 'Inflow', 'Outflow', or None
-    inflow: Optional[float] = None           # Inflow rate (m³/s) if boundary condition is Inflow
-    outflow: Optional[float] = None          # Outflow rate (m³/s) if boundary condition is Outflow
+    inflow: Optional[Union[float, Callable[[float], float]]] = None   # Inflow rate (m³/s), constant or Q(t), if boundary condition is Inflow
+    outflow: Optional[Union[float, Callable[[float], float]]] = None  # Outflow rate (m³/s), constant or Q(t), if boundary condition is Outflow
     connections: Dict[int, float] = field(default_factory=dict)  # Connected node IDs with beta coefficients
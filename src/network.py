@@ -0,0 +1,379 @@
+# src/network.py
+
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+from src.models import Node
+from src.numerics import (
+    hll_flux_array, compute_source_array, max_wave_speed, apply_implicit_friction, SlotInterfaces
+)
+from src.results import SimulationResults, OutputSchedule
+from src.state import ChannelState
+import logging
+
+logger = logging.getLogger(__name__)
+
+BoundaryValue = Union[float, Dict[int, float]]
+
+@dataclass
+class Reach:
+    """
+    A chain of nodes without junctions, stored as one contiguous block of cells.
+    """
+    id: int
+    node_ids: List[int]                                    # Nodes of the reach, upstream to downstream
+    start: int = 0                                         # Offset of the first cell in the packed state
+    upstream: List[int] = field(default_factory=list)      # Reaches draining into this reach
+    downstream: Dict[int, float] = field(default_factory=dict)  # Receiving reaches with beta coefficients
+
+    @property
+    def num_cells(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def cells(self) -> slice:
+        return slice(self.start, self.start + self.num_cells)
+
+def build_reaches(nodes: Dict[int, Node], beta: Optional[Dict[int, Dict[int, float]]] = None) -> List[Reach]:
+    """
+    Splits a node graph into reaches joined at junctions.
+
+    Edges are read from each node's ``connections`` (or from ``beta``, as built
+    by utilities.add_connection), pointing downstream. A link u -> v lies inside
+    a reach when u has exactly one outgoing and v exactly one incoming edge;
+    every other edge joins the end of one reach to the start of another.
+
+    Returns:
+        List[Reach]: Reaches with their upstream and downstream neighbours.
+    """
+    edges = beta if beta is not None else {node_id: node.connections for node_id, node in nodes.items()}
+    incoming: Dict[int, List[int]] = {node_id: [] for node_id in nodes}
+    for u, targets in edges.items():
+        for v in targets:
+            if u not in nodes or v not in nodes:
+                raise ValueError(f"Connection {u} -> {v} refers to an unknown node.")
+            incoming[v].append(u)
+
+    def chain_link(u):
+        targets = edges.get(u, {})
+        if len(targets) != 1:
+            return None
+        v = next(iter(targets))
+        return v if len(incoming[v]) == 1 else None
+
+    linked = {v for u in nodes for v in [chain_link(u)] if v is not None}
+    # Chain starts first, then any node left on a closed loop of chain links
+    starts = [node_id for node_id in nodes if node_id not in linked] + list(nodes)
+    reach_of: Dict[int, int] = {}
+    reaches: List[Reach] = []
+    for first in starts:
+        if first in reach_of:
+            continue
+        chain = [first]
+        reach_of[first] = len(reaches)
+        v = chain_link(first)
+        while v is not None and v not in reach_of:
+            chain.append(v)
+            reach_of[v] = len(reaches)
+            v = chain_link(v)
+        reaches.append(Reach(id=len(reaches), node_ids=chain))
+
+    for reach in reaches:
+        last = reach.node_ids[-1]
+        for v, beta_val in edges.get(last, {}).items():
+            target = reaches[reach_of[v]]
+            if v != target.node_ids[0]:
+                raise ValueError(f"Connection {last} -> {v} joins the middle of a reach.")
+            reach.downstream[target.id] = beta_val
+            target.upstream.append(reach.id)
+    return reaches
+
+def reach_levels(reaches: List[Reach]) -> List[List[int]]:
+    """
+    Groups reaches into levels whose members do not feed each other.
+
+    Level k holds the reaches whose upstream reaches all lie in earlier levels,
+    so a level can be updated as one batch once the levels above it are done.
+    Reaches on a loop cannot be ordered and form the last level.
+    """
+    remaining = {reach.id: len(set(reach.upstream)) for reach in reaches}
+    by_id = {reach.id: reach for reach in reaches}
+    level = [reach_id for reach_id, count in remaining.items() if count == 0]
+    levels = []
+    while level:
+        levels.append(level)
+        for reach_id in level:
+            del remaining[reach_id]
+        next_level = []
+        for reach_id in level:
+            for target in by_id[reach_id].downstream:
+                if target in remaining:
+                    remaining[target] -= 1
+                    if remaining[target] == 0:
+                        next_level.append(target)
+        level = sorted(set(next_level))
+    if remaining:
+        logger.info(f"{len(remaining)} reaches lie on loops; they are batched in one final level")
+        levels.append(sorted(remaining))
+    return levels
+
+def _boundary_array(value: BoundaryValue, node_ids: List[int], name: str) -> np.ndarray:
+    """
+    One boundary value per boundary node, from a scalar or a dict keyed by node id.
+    """
+    if isinstance(value, dict):
+        missing = [node_id for node_id in node_ids if node_id not in value]
+        if missing:
+            raise ValueError(f"No {name} given for boundary nodes {missing}.")
+        return np.array([value[node_id] for node_id in node_ids], dtype=float)
+    return np.full(len(node_ids), float(value))
+
+class NetworkSystem:
+    """
+    Finite volume solver for dendritic and looped networks of open-channel and pipe reaches.
+
+    Each reach is one contiguous block of the packed state, in the order given
+    by reach_levels. All reaches advance together in one batched HLL sweep over
+    the packed array with one ghost cell at each end of every block. Ghost cells
+    at junctions see the neighbouring reaches' water level, and the mass flux
+    into each receiving reach is set from the discharge leaving its upstream
+    reaches, split in proportion to the beta coefficients of each reach's
+    outgoing connections, so mass is conserved exactly at every junction.
+
+    Upstream boundaries (reach starts without inflowing reaches) take h_in and
+    u_in, downstream boundaries take h_out; each may be a scalar or a dict keyed
+    by the boundary node id.
+
+    PressurizedPipe cells use the Preissmann slot of the single-channel solver:
+    junction ghosts match piezometric heads, so storm sewers can run part full
+    or surcharged within the same sweep; slot_celerity widens their slots as in
+    HydraulicSystem.
+    """
+
+    def __init__(self, nodes: Dict[int, Node], delta_x: float, total_time: float, CFL: float,
+                 h_in: BoundaryValue, u_in: BoundaryValue, h_out: BoundaryValue,
+                 beta: Optional[Dict[int, Dict[int, float]]] = None,
+                 output: Optional[OutputSchedule] = None, friction: str = "explicit",
+                 slot_celerity: Optional[float] = None):
+        if friction not in ("explicit", "implicit"):
+            raise ValueError(f"Unknown friction treatment {friction!r}; expected 'explicit' or 'implicit'.")
+        if slot_celerity is not None and slot_celerity <= 0:
+            raise ValueError("slot_celerity must be positive.")
+        self.nodes = nodes
+        self.delta_x = delta_x
+        self.total_time = total_time
+        self.CFL = CFL
+        self.output = output if output is not None else OutputSchedule()
+        self.friction = friction
+
+        reaches = build_reaches(nodes, beta)
+        self.levels = reach_levels(reaches)
+        order = [reach_id for level in self.levels for reach_id in level]
+        self.reaches = [reaches[reach_id] for reach_id in order]
+        start = 0
+        for reach in self.reaches:
+            reach.start = start
+            start += reach.num_cells
+
+        packed = {node_id: nodes[node_id] for reach in self.reaches for node_id in reach.node_ids}
+        self.base = ChannelState.from_nodes(packed)
+        if not (self.base.b > 0).all():
+            raise ValueError("The network solver supports OpenChannel and PressurizedPipe nodes only.")
+        if slot_celerity is not None:
+            self.base.widen_slots(slot_celerity)
+        self.state: Optional[ChannelState] = None
+        self._build_index(h_in, u_in, h_out)
+        self._build_slot()
+
+    def _build_index(self, h_in: BoundaryValue, u_in: BoundaryValue, h_out: BoundaryValue) -> None:
+        """
+        Precomputes the gather/scatter indices of the batched sweep.
+        """
+        R = len(self.reaches)
+        position = {reach.id: k for k, reach in enumerate(self.reaches)}
+        sizes = np.array([reach.num_cells for reach in self.reaches])
+        starts = np.array([reach.start for reach in self.reaches])
+        self.first = starts
+        self.last = starts + sizes - 1
+
+        # Each block in the ghosted array is [ghost, cells..., ghost]
+        ext_start = starts + 2 * np.arange(R)
+        self.ghost_up = ext_start
+        self.ghost_down = ext_start + sizes + 1
+        self.cell_ext = np.concatenate([np.arange(s + 1, s + 1 + m) for s, m in zip(ext_start, sizes)])
+        self.x = np.concatenate([np.arange(m) * self.delta_x for m in sizes])
+
+        # Junction edges, with each upstream reach's outflow split by its beta coefficients
+        src, dst, weight = [], [], []
+        for reach in self.reaches:
+            total = sum(reach.downstream.values())
+            for target, beta_val in reach.downstream.items():
+                src.append(position[reach.id])
+                dst.append(position[target])
+                weight.append(beta_val / total if total > 0 else 1.0 / len(reach.downstream))
+        self.edge_src = np.array(src, dtype=int)
+        self.edge_dst = np.array(dst, dtype=int)
+        self.edge_weight = np.array(weight, dtype=float)
+        self.junction_in = np.unique(self.edge_dst)
+        self.junction_out = np.unique(self.edge_src)
+
+        self.inflow = np.setdiff1d(np.arange(R), self.junction_in)
+        self.outflow = np.setdiff1d(np.arange(R), self.junction_out)
+        self.h_in = _boundary_array(h_in, [self.reaches[k].node_ids[0] for k in self.inflow], "h_in")
+        self.u_in = _boundary_array(u_in, [self.reaches[k].node_ids[0] for k in self.inflow], "u_in")
+        self.h_out = _boundary_array(h_out, [self.reaches[k].node_ids[-1] for k in self.outflow], "h_out")
+
+    def _build_slot(self) -> None:
+        """
+        Slot geometry of the cells and of both sides of every interface of the ghosted array.
+        """
+        self.slot = self.base.slot()
+        self.slot_ext = None
+        self.slot_faces: Optional[SlotInterfaces] = None
+        if self.slot is None:
+            return
+        # Ghost cells take the geometry of the end cells of their reach
+        cells = np.zeros(self.base.num_cells + 2 * len(self.reaches), dtype=int)
+        cells[self.cell_ext] = np.arange(self.base.num_cells)
+        cells[self.ghost_up] = self.first
+        cells[self.ghost_down] = self.last
+        self.slot_ext = self.slot[cells]
+        self.slot_faces = SlotInterfaces(self.slot_ext[:-1], self.slot_ext[1:])
+
+    def reach_state(self, reach_id: int, U: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        The block of the packed state belonging to one reach, shape (cells, 2).
+        """
+        U = self.state.U if U is None else U
+        reach = next(reach for reach in self.reaches if reach.id == reach_id)
+        return U[reach.cells]
+
+    def _fill_ghosts(self, U: np.ndarray, U_ext: np.ndarray) -> None:
+        """
+        Boundary and junction ghost states for every reach at once.
+
+        Ghost depths are set as water levels (piezometric heads in pipes) and
+        converted to the ghost cells' area per width at the end.
+        """
+        U_ext[self.cell_ext] = U
+        U_ext[self.ghost_up[self.inflow], 0] = self.h_in
+        U_ext[self.ghost_up[self.inflow], 1] = self.h_in * self.u_in
+        U_ext[self.ghost_down[self.outflow], 0] = self.h_out
+        U_ext[self.ghost_down[self.outflow], 1] = U[self.last[self.outflow], 1]
+
+        if len(self.edge_src):
+            R = len(self.reaches)
+            w = self.edge_weight
+            # Receiving reaches see the weighted depth of the reaches draining into them
+            level = U[:, 0] if self.slot is None else self.slot.head(U[:, 0])
+            h_end = level[self.last[self.edge_src]]
+            share = np.bincount(self.edge_dst, weights=w, minlength=R)[self.junction_in]
+            h_up = np.bincount(self.edge_dst, weights=w * h_end, minlength=R)[self.junction_in] / share
+            U_ext[self.ghost_up[self.junction_in], 0] = h_up
+            U_ext[self.ghost_up[self.junction_in], 1] = U[self.first[self.junction_in], 1]
+            # Draining reaches see the weighted depth of the reaches they feed
+            h_start = level[self.first[self.edge_dst]]
+            h_down = np.bincount(self.edge_src, weights=w * h_start, minlength=R)[self.junction_out]
+            U_ext[self.ghost_down[self.junction_out], 0] = h_down
+            U_ext[self.ghost_down[self.junction_out], 1] = U[self.last[self.junction_out], 1]
+
+        if self.slot_ext is not None:
+            for ghosts in (self.ghost_up, self.ghost_down):
+                U_ext[ghosts, 0] = self.slot_ext[ghosts].depth(U_ext[ghosts, 0])
+
+    def _junction_mass_flux(self, F: np.ndarray, b: np.ndarray) -> None:
+        """
+        Overwrites the mass flux entering each receiving reach so junctions conserve mass.
+        """
+        if not len(self.edge_src):
+            return
+        R = len(self.reaches)
+        # Face index k sits between ext cells k and k + 1
+        Q_out = F[self.ghost_down[self.edge_src] - 1, 0] * b[self.last[self.edge_src]]
+        Q_in = np.bincount(self.edge_dst, weights=self.edge_weight * Q_out, minlength=R)[self.junction_in]
+        F[self.ghost_up[self.junction_in], 0] = Q_in / b[self.first[self.junction_in]]
+
+    def step(self, U: np.ndarray, dt: float, U_ext: np.ndarray) -> np.ndarray:
+        """
+        One forward-Euler step of every reach in a single batched sweep.
+        """
+        state = self.base
+        self._fill_ghosts(U, U_ext)
+        if self.slot_faces is None:
+            F = hll_flux_array(U_ext[:-1], U_ext[1:])
+        else:
+            F = self.slot_faces.fluxes(U_ext[:-1], U_ext[1:])
+        self._junction_mass_flux(F, state.b)
+        explicit_friction = self.friction == "explicit"
+        S = compute_source_array(U, state.S0, state.n, friction=explicit_friction, slot=self.slot)
+        dF = F[self.cell_ext] - F[self.cell_ext - 1]
+        if self.slot_faces is not None:
+            wall = self.slot_faces.wall
+            dF[:, 1] += wall[self.cell_ext] + wall[self.cell_ext - 1]
+        U_new = U - (dt / self.delta_x) * dF + dt * S
+        if not explicit_friction:
+            U_new = apply_implicit_friction(U_new, state.n, dt, slot=self.slot)
+        return U_new
+
+    def total_volume(self, U: Optional[np.ndarray] = None) -> float:
+        """
+        Water volume stored in the network (m³).
+        """
+        U = self.state.U if U is None else U
+        return float(np.sum(self.base.b * U[:, 0]) * self.delta_x)
+
+    def run_simulation(self, write_back: bool = True):
+        """
+        Run the network to total_time, recording snapshots of the packed state.
+
+        Returns:
+            Tuple[SimulationResults, np.ndarray]: Recorded snapshots and the
+            along-reach position of every packed cell. Reach.cells selects one
+            reach's columns.
+        """
+        state = ChannelState(U=self.base.U.copy(), b=self.base.b, S0=self.base.S0, n=self.base.n,
+                             A_fixed=self.base.A_fixed, is_open=self.base.is_open,
+                             node_ids=self.base.node_ids, crown=self.base.crown,
+                             slot_ratio=self.base.slot_ratio)
+        self.state = state
+        dx = self.delta_x
+        total_time = self.total_time
+        U_ext = np.zeros((state.num_cells + 2 * len(self.reaches), 2))
+
+        output_times = self.output.output_times(total_time)
+        k_out = 0
+        results = SimulationResults(self.x, capacity=len(output_times) if output_times is not None else 0)
+        if output_times is not None:
+            while k_out < len(output_times) and output_times[k_out] <= 0.0:
+                results.append(0.0, state.head(), state.hu, state.area())
+                k_out += 1
+
+        t = 0.0
+        n = 0
+        while t < total_time:
+            t_stop = output_times[k_out] if output_times is not None and k_out < len(output_times) else total_time
+            max_speed = max_wave_speed(state.U, slot=self.slot)
+            dt = self.CFL * dx / max_speed if max_speed > 0 else self.CFL * dx / 1e-3
+            reached = t + dt >= t_stop
+            if reached:
+                dt = t_stop - t
+            state.U = self.step(state.U, dt, U_ext)
+            t = t_stop if reached else t + dt
+            n += 1
+
+            if output_times is not None:
+                record = reached and k_out < len(output_times)
+                if record:
+                    k_out += 1
+            else:
+                record = self.output.should_record_step(n, finished=t >= total_time)
+            if record:
+                results.append(t, state.head(), state.hu, state.area())
+
+            # Logging
+            if n % 20 == 0:
+                logger.info(f"Network step {n}, Time {t:.2f}s, Max Speed {max_speed:.2f} m/s, Reaches {len(self.reaches)}")
+
+        if write_back:
+            state.write_back(self.nodes)
+        return results, self.x
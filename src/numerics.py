@@ -1,9 +1,8 @@
 # src/numerics.py
 
 import numpy as np
-from typing import Dict
-from src.models import Node, OpenChannel
-from src.constants import G
+from src.constants import G, H_DRY
+from src.state import ChannelState, PreissmannSlot
 import logging
 
 logger = logging.getLogger(__name__)
@@ -59,9 +58,241 @@ def hll_flux(U_left, U_right):
     else:
         return (S_R * F_L - S_L * F_R + S_L * S_R * (U_right - U_left)) / (S_R - S_L)
 
+def _velocity_array(h, hu):
+    """
+    Velocity u = hu / h for an array of states, zero where the cell is dry.
+    """
+    return np.divide(hu, h, out=np.zeros_like(hu, dtype=float), where=h > 0)
+
+def compute_flux_array(U, slot=None):
+    """
+    Vectorized physical flux for an array of conserved variables with shape (..., 2).
+
+    With a PreissmannSlot aligned with U, the pressure term of surcharged pipe
+    cells includes the head in the slot.
+    """
+    h = U[..., 0]
+    hu = U[..., 1]
+    u = _velocity_array(h, hu)
+    F = np.empty(U.shape, dtype=float)
+    F[..., 0] = hu
+    if slot is None:
+        F[..., 1] = hu * u + 0.5 * G * h ** 2
+    else:
+        F[..., 1] = hu * u + G * slot.pressure(h)
+    return F
+
+def compute_source_array(U, S0, n, friction=True, slot=None):
+    """
+    Vectorized source term for an array of conserved variables with shape (..., 2).
+
+    S0 and n may be scalars or arrays broadcastable to U[..., 0]. With
+    friction=False only the bed slope term is returned, for use with
+    apply_implicit_friction. With a PreissmannSlot, the friction depth of pipe
+    cells is capped at the crown.
+    """
+    h = U[..., 0]
+    hu = U[..., 1]
+    S = np.zeros(U.shape, dtype=float)
+    if not friction:
+        S[..., 1] = -G * h * S0
+        return S
+    u = _velocity_array(h, hu)
+    wet = h > 0
+    radius = h if slot is None else np.minimum(h, slot.crown)
+    h_43 = np.power(radius, 4 / 3, out=np.ones_like(h, dtype=float), where=wet)
+    Sf = np.where(wet, n ** 2 * u * np.abs(u) / h_43, 0.0)
+    S[..., 1] = -G * h * (S0 + Sf)
+    return S
+
+def apply_implicit_friction(U, n, dt, h_dry=H_DRY, slot=None):
+    """
+    Integrates the Manning friction term exactly over dt, at fixed depth.
+
+    With h held constant, d(hu)/dt = -g n^2 hu|hu| / h^(7/3) has the closed-form
+    solution hu(dt) = hu / (1 + dt g n^2 |hu| / h^(7/3)). The update only ever
+    reduces |hu|, so it is unconditionally stable however shallow or rough the
+    cell is. Cells shallower than h_dry are treated as dry (h clipped at zero,
+    hu set to zero). With a PreissmannSlot, the friction depth of pipe cells is
+    capped at the crown, h^(7/3) becoming h * min(h, D)^(4/3).
+    """
+    U = np.array(U, dtype=float)
+    h = U[..., 0]
+    hu = U[..., 1]
+    wet = h > h_dry
+    if slot is None:
+        h_73 = np.power(h, 7 / 3, out=np.ones_like(h, dtype=float), where=wet)
+    else:
+        h_73 = h * np.power(np.minimum(h, slot.crown), 4 / 3, out=np.ones_like(h, dtype=float), where=wet)
+        h_73 = np.where(wet, h_73, 1.0)
+    decay = 1.0 + dt * G * n ** 2 * np.abs(hu) / h_73
+    U[..., 1] = np.where(wet, hu / decay, 0.0)
+    U[..., 0] = np.maximum(h, 0.0)
+    return U
+
+def hll_flux_array(U_left, U_right, slot_left=None, slot_right=None):
+    """
+    Vectorized HLL numerical flux for every interface at once.
+
+    U_left and U_right hold the states on either side of each interface,
+    both with shape (..., 2). Matches hll_flux applied interface by interface.
+    In a mixed system, slot_left and slot_right are the PreissmannSlot
+    geometry of the cells the two states come from.
+    """
+    h_L = U_left[..., 0]
+    h_R = U_right[..., 0]
+    u_L = _velocity_array(h_L, U_left[..., 1])
+    u_R = _velocity_array(h_R, U_right[..., 1])
+    if slot_left is None:
+        c_L = np.sqrt(G * np.where(h_L > 0, h_L, 0.0))
+        c_R = np.sqrt(G * np.where(h_R > 0, h_R, 0.0))
+    else:
+        c_L = slot_left.celerity(h_L)
+        c_R = slot_right.celerity(h_R)
+
+    # Wave speed estimates
+    S_L = np.minimum(u_L - c_L, u_R - c_R)[..., None]
+    S_R = np.maximum(u_L + c_L, u_R + c_R)[..., None]
+
+    F_L = compute_flux_array(U_left, slot_left)
+    F_R = compute_flux_array(U_right, slot_right)
+
+    # Only the subsonic branch divides; guard the denominator elsewhere
+    denom = np.where(S_R > S_L, S_R - S_L, 1.0)
+    F_hll = (S_R * F_L - S_L * F_R + S_L * S_R * (U_right - U_left)) / denom
+    return np.where(S_L >= 0, F_L, np.where(S_R <= 0, F_R, F_hll))
+
+def max_wave_speed(U, axis=None, slot=None):
+    """
+    Largest characteristic speed |u| + sqrt(g h) over the given axis.
+
+    With a PreissmannSlot, pipe cells count at the slot wave speed even while
+    they run part full, since they may surcharge within the step.
+    """
+    h = U[..., 0]
+    u = _velocity_array(h, U[..., 1])
+    if slot is None:
+        c = np.sqrt(G * np.where(h > 0, h, 0.0))
+    else:
+        c = slot.max_celerity(h)
+    return np.max(np.abs(u) + c, axis=axis)
+
+def slot_transition_fluxes(U_left, U_right, slot_left, slot_right):
+    """
+    Corrections at interfaces between cells of different geometry (channel to pipe, pipe to pipe).
+
+    Returns (mass, wall). ``mass`` is added to the HLL mass flux and replaces
+    its diffusion of the jump in area per width by the head jump times the
+    narrower free-surface width; the mean would over-diffuse into a
+    surcharged pipe, whose head moves by 1 / ratio per unit area. ``wall`` is
+    half the difference between the two sides' pressure integrals at the mean
+    head: the reaction of the pipe's soffit or headwall. The left cell sees
+    the momentum flux F + wall and the right cell F - wall, so a level water
+    surface across the transition stays at rest.
+    """
+    h_L = U_left[..., 0]
+    h_R = U_right[..., 0]
+    u_L = _velocity_array(h_L, U_left[..., 1])
+    u_R = _velocity_array(h_R, U_right[..., 1])
+    c_L = slot_left.celerity(h_L)
+    c_R = slot_right.celerity(h_R)
+    S_L = np.minimum(u_L - c_L, u_R - c_R)
+    S_R = np.maximum(u_L + c_L, u_R + c_R)
+
+    head_L = slot_left.head(h_L)
+    head_R = slot_right.head(h_R)
+    width = np.minimum(np.where(h_L > slot_left.crown, slot_left.ratio, 1.0),
+                       np.where(h_R > slot_right.crown, slot_right.ratio, 1.0))
+    subsonic = (S_L < 0) & (S_R > 0)
+    denom = np.where(subsonic, S_R - S_L, 1.0)
+    mass = np.where(subsonic, S_L * S_R * (width * (head_R - head_L) - (h_R - h_L)) / denom, 0.0)
+
+    head = 0.5 * (head_L + head_R)
+    wall = 0.5 * G * (slot_left.pressure(slot_left.depth(head)) - slot_right.pressure(slot_right.depth(head)))
+    return mass, wall
+
+class SlotInterfaces:
+    """
+    PreissmannSlot geometry on both sides of the interfaces of a ghosted state array.
+
+    ``fluxes`` computes the HLL flux with the slot geometry, corrected by
+    slot_transition_fluxes at the few interfaces where the geometry changes.
+    The wall reactions of the last call are kept in ``wall`` (zero elsewhere)
+    for the update: a cell's momentum changes by -dt/dx (wall[right face] +
+    wall[left face]) on top of the flux difference.
+    """
+
+    def __init__(self, left: PreissmannSlot, right: PreissmannSlot):
+        self.left = left
+        self.right = right
+        self.transitions = np.flatnonzero((left.crown != right.crown) | (left.ratio != right.ratio))
+        self._transition_left = left[self.transitions]
+        self._transition_right = right[self.transitions]
+        self.wall = np.zeros(len(left.crown))
+
+    def fluxes(self, U_left, U_right):
+        F = hll_flux_array(U_left, U_right, self.left, self.right)
+        k = self.transitions
+        if len(k):
+            mass, wall = slot_transition_fluxes(U_left[k], U_right[k], self._transition_left, self._transition_right)
+            F[k, 0] += mass
+            self.wall[k] = wall
+        return F
+
+def minmod(a, b):
+    """
+    Minmod slope limiter.
+    """
+    return np.where(a * b > 0, np.sign(a) * np.minimum(np.abs(a), np.abs(b)), 0.0)
+
+def van_leer(a, b):
+    """
+    Van Leer (harmonic mean) slope limiter.
+    """
+    ab = a * b
+    denom = np.where(ab > 0, a + b, 1.0)
+    return np.where(ab > 0, 2.0 * ab / denom, 0.0)
+
+def monotonized_central(a, b):
+    """
+    Monotonized central (MC) slope limiter.
+    """
+    limited = np.minimum(np.minimum(2.0 * np.abs(a), 2.0 * np.abs(b)), 0.5 * np.abs(a + b))
+    return np.where(a * b > 0, np.sign(a) * limited, 0.0)
+
+LIMITERS = {
+    "minmod": minmod,
+    "van_leer": van_leer,
+    "mc": monotonized_central,
+}
+
+def muscl_interface_states(U_ext, limiter="minmod"):
+    """
+    Second-order MUSCL reconstruction of the interface states.
+
+    U_ext holds the cells with two ghost cells on each side, shape (..., N + 4, 2).
+    Returns the left and right states at the N + 1 interfaces of the interior
+    cells, ready for hll_flux_array. Slopes are zeroed in cells where the
+    reconstructed depth would become negative.
+    """
+    limit = LIMITERS[limiter]
+    centre = U_ext[..., 1:-1, :]
+    slope = limit(centre - U_ext[..., :-2, :], U_ext[..., 2:, :] - centre)
+
+    # Keep both face depths non-negative
+    unsafe = 0.5 * np.abs(slope[..., 0]) > centre[..., 0]
+    slope = np.where(unsafe[..., None], 0.0, slope)
+
+    U_left = centre[..., :-1, :] + 0.5 * slope[..., :-1, :]
+    U_right = centre[..., 1:, :] - 0.5 * slope[..., 1:, :]
+    return U_left, U_right
+
 def apply_fvm(system):
     """
     Applies the Finite Volume Method to update the hydraulic system.
+
+    Returns:
+        int: Number of time steps taken.
     """
     nodes = system.nodes
     delta_x = system.delta_x
@@ -71,24 +302,20 @@ def apply_fvm(system):
     u_in = system.u_in
     h_out = system.h_out
 
-    num_cells = len(nodes)
-    U = np.zeros((num_cells, 2))  # Conserved variables [h, hu]
-
     # Initialize conditions
-    for i, node in nodes.items():
-        h = node.flow.h
-        u = node.flow.Q / node.flow.A if node.flow.A > 0 else 0.0
-        U[i, 0] = h
-        U[i, 1] = h * u
+    state = ChannelState.from_nodes(nodes)
+    num_cells = state.num_cells
+    U = state.U  # Conserved variables [h, hu]
 
     t = 0.0  # Initialize time
     n = 0    # Time step counter
 
-    while t < total_time:
-        U_old = U.copy()
+    # Work buffers reused across steps
+    U_ext = np.zeros((num_cells + 2, 2))
+    dF = np.empty((num_cells, 2))
 
+    while t < total_time:
         # Apply boundary conditions
-        U_ext = np.zeros((num_cells + 2, 2))
         U_ext[1:-1] = U
 
         # Upstream boundary (Inflow)
@@ -100,33 +327,22 @@ def apply_fvm(system):
         hu_out = U_ext[-2, 1]  # Assuming Neumann for momentum
         U_ext[-1, 1] = h_out * (hu_out / U_ext[-2, 0]) if U_ext[-2, 0] > 0 else 0.0
 
-        # Compute fluxes at interfaces
-        F = np.zeros((num_cells + 1, 2))
-        for i in range(num_cells + 1):
-            F[i] = hll_flux(U_ext[i], U_ext[i + 1])
+        # Compute fluxes at all interfaces in one sweep
+        F = hll_flux_array(U_ext[:-1], U_ext[1:])
 
         # Update time step based on CFL condition
-        h = U[:, 0]
-        hu = U[:, 1]
-        u = hu / h
-        c = np.sqrt(G * h)
-        max_speed = np.max(np.abs(u) + c)
+        max_speed = max_wave_speed(U)
         dt = CFL * delta_x / max_speed if max_speed > 0 else CFL * delta_x / 1e-3
         if t + dt > total_time:
             dt = total_time - t
 
-        # Update conserved variables
-        for i in range(num_cells):
-            node = nodes[i]
-            S0 = node.flow.S0 if isinstance(node.flow, OpenChannel) else 0.0
-            n_manning = node.flow.n if isinstance(node.flow, OpenChannel) else 0.0
-            S = compute_source(U_ext[i + 1], S0, n_manning)
-            U[i] = U_old[i] - (dt / delta_x) * (F[i + 1] - F[i]) + dt * S
-
-            # Update node properties
-            node.flow.h = U[i, 0]
-            node.flow.Q = U[i, 1]
-            node.flow.A = node.flow.b * node.flow.h if isinstance(node.flow, OpenChannel) else node.flow.A
+        # Update conserved variables in place
+        S = compute_source_array(U, state.S0, state.n)
+        np.subtract(F[1:], F[:-1], out=dF)
+        dF *= dt / delta_x
+        U -= dF
+        S *= dt
+        U += S
 
         t += dt
         n += 1
@@ -136,7 +352,5 @@ def apply_fvm(system):
             logger.info(f"Time step {n}, Time {t:.2f}s, Max Speed {max_speed:.2f} m/s")
 
     # Update the system's nodes with final values
-    for i, node in nodes.items():
-        node.flow.h = U[i, 0]
-        node.flow.Q = U[i, 1]
-        node.flow.A = node.flow.b * node.flow.h if isinstance(node.flow, OpenChannel) else node.flow.A
+    state.write_back(nodes)
+    return n
@@ -0,0 +1,155 @@
+# src/profiling.py
+
+import time
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+# Phases of the time loop, in the order they run within a step
+PHASES = ("cfl", "boundary", "flux", "update", "solver", "record", "checkpoint")
+
+@dataclass
+class SolverStats:
+    """
+    Cumulative counters of one run.
+
+    ``phase_seconds`` holds wall-clock seconds per phase: the CFL reduction,
+    ghost-cell filling, interface fluxes, conservative update, recording of
+    output, and checkpoints. "solver" is time inside a step that no finer phase
+    covers; for the JIT, Preissmann and domain-decomposed backends that is the
+    whole step, since their inner loops are not instrumented.
+    """
+    steps: int = 0
+    records: int = 0               # Scheduled snapshots handed to the consumer of the loop
+    dt_min: float = np.inf
+    dt_max: float = 0.0
+    cfl_limited_steps: int = 0     # Steps taken at the full stable dt (fixed delta_t for Preissmann)
+    output_limited_steps: int = 0  # Steps whose dt was cut to land on an output time or the end
+    wall_seconds: float = 0.0
+    phase_seconds: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def unaccounted_seconds(self) -> float:
+        """
+        Wall-clock time outside all phases: loop bookkeeping, steady-state checks and consumers of iter_steps.
+        """
+        return max(self.wall_seconds - sum(self.phase_seconds.values()), 0.0)
+
+    def as_dict(self) -> Dict:
+        return {
+            "steps": self.steps, "records": self.records,
+            "dt_min": self.dt_min if self.steps else None, "dt_max": self.dt_max if self.steps else None,
+            "cfl_limited_steps": self.cfl_limited_steps, "output_limited_steps": self.output_limited_steps,
+            "wall_seconds": self.wall_seconds, "steps_per_second": self.steps_per_second,
+            "phase_seconds": dict(self.phase_seconds), "unaccounted_seconds": self.unaccounted_seconds,
+        }
+
+    def summary(self) -> str:
+        """
+        Table of time per phase, largest first.
+        """
+        lines = [f"{self.steps} steps in {self.wall_seconds:.3f}s ({self.steps_per_second:.1f} steps/s), "
+                 f"dt {self.dt_min:.4g}..{self.dt_max:.4g}s, "
+                 f"{self.cfl_limited_steps} CFL-limited / {self.output_limited_steps} output-limited"]
+        total = self.wall_seconds or 1.0
+        rows = sorted(self.phase_seconds.items(), key=lambda item: -item[1])
+        rows.append(("(other)", self.unaccounted_seconds))
+        for name, seconds in rows:
+            lines.append(f"  {name:<11} {seconds:9.4f}s {seconds / total:6.1%}")
+        return "\n".join(lines)
+
+class StepProfiler:
+    """
+    Opt-in instrumentation of HydraulicSystem's time loop.
+
+    Pass to ``HydraulicSystem(..., profiler=StepProfiler())``; ``stats`` is
+    reset at the start of every run. Phases are timed with laps: ``mark()``
+    sets the reference time and ``lap(phase)`` adds the time since the last
+    mark or lap to that phase, so each boundary costs one perf_counter call.
+    Without a profiler the solver skips all of this behind a single None check.
+
+    Args:
+        callback (callable, optional): Called with the SolverStats every
+            ``every`` steps (after each segment for backends that run several
+            steps per call), e.g. to log or plot phase times while running.
+        every (int): Steps between callbacks.
+    """
+
+    def __init__(self, callback: Optional[Callable[[SolverStats], None]] = None, every: int = 1):
+        if every < 1:
+            raise ValueError("every must be at least 1.")
+        self.callback = callback
+        self.every = every
+        self.reset()
+
+    def reset(self) -> None:
+        self.stats = SolverStats()
+        self._phases = self.stats.phase_seconds
+        self._started = time.perf_counter()
+        self._last = self._started
+        self._next_callback = self.every
+
+    def mark(self) -> None:
+        self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self._phases[phase] += now - self._last
+        self._last = now
+
+    def step(self, dt: float, output_limited: bool) -> None:
+        """
+        Counts one solver step of size dt.
+        """
+        stats = self.stats
+        stats.steps += 1
+        if dt < stats.dt_min:
+            stats.dt_min = dt
+        if dt > stats.dt_max:
+            stats.dt_max = dt
+        if output_limited:
+            stats.output_limited_steps += 1
+        else:
+            stats.cfl_limited_steps += 1
+        if self.callback is not None and stats.steps >= self._next_callback:
+            self._notify()
+
+    def segment(self, t_start: float, t_end: float, steps: int, reached: bool) -> None:
+        """
+        Counts the steps of a backend that advances several steps per call.
+
+        Only the mean dt of the segment is known, and only its last step can
+        have been cut to reach the stop time.
+        """
+        if steps == 0:
+            return
+        stats = self.stats
+        dt = (t_end - t_start) / steps
+        stats.steps += steps
+        stats.dt_min = min(stats.dt_min, dt)
+        stats.dt_max = max(stats.dt_max, dt)
+        stats.output_limited_steps += int(reached)
+        stats.cfl_limited_steps += steps - int(reached)
+        if self.callback is not None and stats.steps >= self._next_callback:
+            self._notify()
+
+    def before_yield(self, recorded: bool) -> None:
+        """
+        Called by the time loop before it hands a state to its consumer.
+        """
+        self.stats.records += int(recorded)
+        self.stats.wall_seconds = time.perf_counter() - self._started
+
+    def _notify(self) -> None:
+        self.stats.wall_seconds = time.perf_counter() - self._started
+        self._next_callback = (self.stats.steps // self.every + 1) * self.every
+        self.callback(self.stats)
+        # Time spent in the callback is not charged to the next phase
+        self._last = time.perf_counter()
+
+    def finish(self) -> None:
+        self.stats.wall_seconds = time.perf_counter() - self._started
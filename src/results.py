@@ -0,0 +1,211 @@
+# src/results.py
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+
+# Column names used by the results DataFrame and the visualization functions
+COLUMNS = ["Time", "Node", "x", "Depth (h)", "Flow Rate (Q)", "Area (A)"]
+
+class SimulationResults:
+    """
+    Columnar store of solver snapshots backed by contiguous NumPy arrays.
+
+    Snapshots are kept as a time vector plus 2-D (snapshot, cell) arrays for
+    h, Q and A. Storage grows in chunks of ``chunk_size`` snapshots, so
+    appending never allocates per cell.
+    """
+
+    def __init__(self, x: np.ndarray, chunk_size: int = 256, capacity: int = 0):
+        self.x = np.asarray(x, dtype=float)
+        self.num_cells = len(self.x)
+        self.chunk_size = max(int(chunk_size), 1)
+        self._size = 0
+        self._time = np.empty(0)
+        self._h = np.empty((0, self.num_cells))
+        self._Q = np.empty((0, self.num_cells))
+        self._A = np.empty((0, self.num_cells))
+        if capacity > 0:
+            self._grow(capacity)
+
+    @classmethod
+    def from_arrays(cls, x: np.ndarray, time: np.ndarray, h: np.ndarray, Q: np.ndarray, A: np.ndarray) -> 'SimulationResults':
+        """
+        Wraps existing (snapshot, cell) arrays without appending row by row.
+        """
+        results = cls(x)
+        results._time = np.asarray(time, dtype=float)
+        results._h = np.asarray(h, dtype=float)
+        results._Q = np.asarray(Q, dtype=float)
+        results._A = np.asarray(A, dtype=float)
+        results._size = len(results._time)
+        return results
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Reallocate the backing arrays to hold at least ``capacity`` snapshots.
+        """
+        capacity = -(-capacity // self.chunk_size) * self.chunk_size
+        for name in ("_h", "_Q", "_A"):
+            old = getattr(self, name)
+            new = np.empty((capacity, self.num_cells))
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+        time = np.empty(capacity)
+        time[:self._size] = self._time[:self._size]
+        self._time = time
+
+    def append(self, t: float, h: np.ndarray, Q: np.ndarray, A: np.ndarray) -> None:
+        """
+        Record one snapshot of the per-cell state at time t.
+        """
+        if self._size == len(self._time):
+            self._grow(self._size + self.chunk_size)
+        i = self._size
+        self._time[i] = t
+        self._h[i] = h
+        self._Q[i] = Q
+        self._A[i] = A
+        self._size += 1
+
+    @property
+    def time(self) -> np.ndarray:
+        return self._time[:self._size]
+
+    @property
+    def h(self) -> np.ndarray:
+        return self._h[:self._size]
+
+    @property
+    def Q(self) -> np.ndarray:
+        return self._Q[:self._size]
+
+    @property
+    def A(self) -> np.ndarray:
+        return self._A[:self._size]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Long-format DataFrame with one row per (time, node).
+
+        The h, Q and A columns are flattened views of the backing arrays and
+        are passed to pandas without copying.
+        """
+        n = self._size
+        data = {
+            "Time": np.repeat(self.time, self.num_cells),
+            "Node": np.tile(np.arange(self.num_cells), n),
+            "x": np.tile(self.x, n),
+            "Depth (h)": self.h.reshape(-1),
+            "Flow Rate (Q)": self.Q.reshape(-1),
+            "Area (A)": self.A.reshape(-1),
+        }
+        return pd.DataFrame(data, columns=COLUMNS, copy=False)
+
+    def to_records(self) -> List[Dict]:
+        """
+        Compatibility view: the list of per-cell dicts run_simulation used to return.
+        """
+        records = []
+        for k in range(self._size):
+            for i in range(self.num_cells):
+                records.append({
+                    "Time": self._time[k],
+                    "Node": i,
+                    "x": self.x[i],
+                    "Depth (h)": self._h[k, i],
+                    "Flow Rate (Q)": self._Q[k, i],
+                    "Area (A)": self._A[k, i]
+                })
+        return records
+
+
+class OutputSchedule:
+    """
+    Decides which solver states are recorded as snapshots.
+
+    Exactly one mode is active:
+        - every step (the default when no argument is given),
+        - ``interval``: every ``interval`` seconds of simulated time,
+        - ``times``: an explicit list of output times,
+        - ``every_n_steps``: every N solver steps (plus the final state),
+        - ``final_only``: only the state at ``total_time``.
+
+    For the time-based modes the solver shortens the step that would cross an
+    output time so that the snapshot is taken exactly at that time.
+    """
+
+    def __init__(self, interval: Optional[float] = None, times: Optional[Sequence[float]] = None,
+                 every_n_steps: Optional[int] = None, final_only: bool = False):
+        modes = [interval is not None, times is not None, every_n_steps is not None, final_only]
+        if sum(modes) > 1:
+            raise ValueError("OutputSchedule accepts only one of interval, times, every_n_steps or final_only.")
+        if interval is not None and interval <= 0:
+            raise ValueError("Output interval must be positive.")
+        if every_n_steps is not None and every_n_steps < 1:
+            raise ValueError("every_n_steps must be at least 1.")
+        self.interval = interval
+        self.times = None if times is None else np.unique(np.asarray(times, dtype=float))
+        self.every_n_steps = every_n_steps
+        self.final_only = final_only
+
+    @classmethod
+    def every_step(cls) -> 'OutputSchedule':
+        return cls()
+
+    @classmethod
+    def at_interval(cls, interval: float) -> 'OutputSchedule':
+        return cls(interval=interval)
+
+    @classmethod
+    def at_times(cls, times: Sequence[float]) -> 'OutputSchedule':
+        return cls(times=times)
+
+    @classmethod
+    def every(cls, n_steps: int) -> 'OutputSchedule':
+        return cls(every_n_steps=n_steps)
+
+    @classmethod
+    def final(cls) -> 'OutputSchedule':
+        return cls(final_only=True)
+
+    @property
+    def is_time_based(self) -> bool:
+        return self.interval is not None or self.times is not None or self.final_only
+
+    def output_times(self, total_time: float) -> Optional[np.ndarray]:
+        """
+        Sorted output times within [0, total_time], or None for step-based modes.
+        """
+        if self.final_only:
+            return np.array([total_time])
+        if self.interval is not None:
+            count = int(np.floor(total_time / self.interval + 1e-9))
+            times = self.interval * np.arange(1, count + 1)
+            if count == 0 or times[-1] < total_time * (1 - 1e-12):
+                times = np.append(times, total_time)
+            return np.minimum(times, total_time)
+        if self.times is not None:
+            return self.times[(self.times >= 0) & (self.times <= total_time)]
+        return None
+
+    def steps_until_record(self, n: int) -> Optional[int]:
+        """
+        Solver steps from step n to the next recorded step, or None for time-based modes.
+        """
+        if self.is_time_based:
+            return None
+        if self.every_n_steps is not None:
+            return self.every_n_steps - n % self.every_n_steps
+        return 1
+
+    def should_record_step(self, n: int, finished: bool) -> bool:
+        """
+        Whether the state after solver step n is recorded, for step-based modes.
+        """
+        if self.every_n_steps is not None:
+            return n % self.every_n_steps == 0 or finished
+        return True
@@ -1,13 +1,38 @@
 # src/solver.py
 
 import numpy as np
-from typing import Dict
-from src.models import Node, OpenChannel, PressurizedPipe
+from contextlib import closing
+from typing import Callable, Dict, Iterator, Optional, Union
+from src.models import Node, PressurizedPipe
 from src.constants import G
+from src.numerics import (
+    hll_flux_array, compute_source_array, max_wave_speed, muscl_interface_states, LIMITERS,
+    apply_implicit_friction, SlotInterfaces
+)
+from src.results import SimulationResults, OutputSchedule
+from src.state import ChannelState, PreissmannSlot, StepView
+from src.jit import JIT_AVAILABLE, advance as jit_advance
+from src.implicit import advance_preissmann
+from src.convergence import SteadyStateMonitor
+from src.steady import fvm_equilibrium_discharge, initialize_steady_nodes
+from src.decomposition import SubdomainPool
+from src.checkpoint import CheckpointWriter, load_checkpoint
+from src.streaming import ChunkedResultWriter, ChunkedResults
+from src.profiling import StepProfiler
+from src.hydrographs import DischargeInflow, StageInflow, StageOutflow, RatingCurveOutflow
 import logging
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("numpy", "jit")
+RECONSTRUCTIONS = ("constant", "muscl")
+TIME_INTEGRATIONS = ("euler", "ssp_rk2", "ssp_rk3")
+FRICTION_TREATMENTS = ("explicit", "implicit")
+SCHEMES = ("fvm", "preissmann")
+
+UpstreamBoundary = Union[DischargeInflow, StageInflow]
+DownstreamBoundary = Union[StageOutflow, RatingCurveOutflow]
+
 def compute_flux(U):
     """
     Compute the physical flux for the given conserved variables U.
@@ -60,7 +85,72 @@ def hll_flux(U_left, U_right):
         return (S_R * F_L - S_L * F_R + S_L * S_R * (U_right - U_left)) / (S_R - S_L)
 
 class HydraulicSystem:
-    def __init__(self, nodes: Dict[int, Node], delta_x: float, total_time: float, CFL: float, h_in: float, u_in: float, h_out: float):
+    def __init__(self, nodes: Dict[int, Node], delta_x: float, total_time: float, CFL: float, h_in: float, u_in: float, h_out: float,
+                 output: Optional[OutputSchedule] = None, backend: str = "numpy",
+                 reconstruction: str = "constant", limiter: str = "minmod", time_integration: str = "euler",
+                 friction: str = "explicit", scheme: str = "fvm", delta_t: Optional[float] = None,
+                 theta: float = 0.6, steady_state: Optional[SteadyStateMonitor] = None, subdomains: int = 1,
+                 checkpoint: Optional[CheckpointWriter] = None, profiler: Optional[StepProfiler] = None,
+                 upstream: Optional[UpstreamBoundary] = None, downstream: Optional[DownstreamBoundary] = None,
+                 slot_celerity: Optional[float] = None):
+        """
+        Args:
+            output (OutputSchedule, optional): Which states to record. Defaults to every solver step.
+            backend (str): "numpy" for the vectorized kernels, or "jit" for the compiled time loop.
+                Falls back to "numpy" when no JIT compiler is installed.
+            reconstruction (str): "constant" (first-order Godunov) or "muscl" (second order).
+            limiter (str): MUSCL slope limiter: "minmod", "van_leer" or "mc".
+            time_integration (str): "euler", "ssp_rk2" or "ssp_rk3".
+            friction (str): "explicit" Manning source term, or "implicit" for the split exact
+                friction integrator, which keeps shallow rough cells stable at the wave-speed CFL limit.
+            scheme (str): "fvm" (explicit finite volume) or "preissmann" (implicit four-point box scheme).
+            delta_t (float, optional): Fixed time step for the Preissmann scheme (s).
+            theta (float): Preissmann time weighting, between 0.5 and 1.
+            steady_state (SteadyStateMonitor, optional): Stops the run early once the solution
+                stops changing; its residual history is kept on the monitor.
+            subdomains (int): Split the cells across this many worker processes (finite volume
+                scheme with the NumPy backend). Results are identical to the serial run.
+            checkpoint (CheckpointWriter, optional): Periodically saves the solver state so
+                the run can be continued with ``run_simulation(resume_from=...)``.
+            profiler (StepProfiler, optional): Times the phases of every step and counts steps
+                and dt limits; read ``profiler.stats`` after the run. Costs nothing when None.
+            upstream (DischargeInflow or StageInflow, optional): Time-varying upstream
+                condition; replaces h_in and u_in.
+            downstream (StageOutflow or RatingCurveOutflow, optional): Time-varying or
+                rating-curve downstream condition; replaces h_out.
+            slot_celerity (float, optional): Wave speed of surcharged PressurizedPipe cells.
+                Their Preissmann slots are widened to B = g Af / slot_celerity² where the
+                pipe's own B (from Cp) is narrower, so pressure waves do not force a
+                tiny time step; see slot_celerity_for_time_step.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}.")
+        if reconstruction not in RECONSTRUCTIONS:
+            raise ValueError(f"Unknown reconstruction {reconstruction!r}; expected one of {RECONSTRUCTIONS}.")
+        if limiter not in LIMITERS:
+            raise ValueError(f"Unknown limiter {limiter!r}; expected one of {tuple(LIMITERS)}.")
+        if time_integration not in TIME_INTEGRATIONS:
+            raise ValueError(f"Unknown time integration {time_integration!r}; expected one of {TIME_INTEGRATIONS}.")
+        if friction not in FRICTION_TREATMENTS:
+            raise ValueError(f"Unknown friction treatment {friction!r}; expected one of {FRICTION_TREATMENTS}.")
+        if scheme not in SCHEMES:
+            raise ValueError(f"Unknown scheme {scheme!r}; expected one of {SCHEMES}.")
+        if scheme == "preissmann":
+            if delta_t is None or delta_t <= 0:
+                raise ValueError("The Preissmann scheme needs a positive delta_t.")
+            if not (0.5 <= theta <= 1.0):
+                raise ValueError("Parameter theta must be between 0.5 and 1 for a stable Preissmann scheme.")
+        if subdomains < 1:
+            raise ValueError("subdomains must be at least 1.")
+        if subdomains > 1 and scheme != "fvm":
+            raise ValueError("Domain decomposition is only available for the finite volume scheme.")
+        if subdomains > 1 and (upstream is not None or downstream is not None):
+            raise ValueError("Domain decomposition only supports constant boundary values.")
+        if slot_celerity is not None and slot_celerity <= 0:
+            raise ValueError("slot_celerity must be positive.")
+        has_pipes = any(isinstance(node.flow, PressurizedPipe) for node in nodes.values())
+        if has_pipes and (scheme != "fvm" or subdomains > 1):
+            raise ValueError("Pressurized pipes are only supported by the serial finite volume scheme.")
         self.nodes = nodes
         self.delta_x = delta_x
         self.total_time = total_time
@@ -68,86 +158,503 @@ class HydraulicSystem:
         self.h_in = h_in
         self.u_in = u_in
         self.h_out = h_out
+        self.output = output if output is not None else OutputSchedule()
+        self.backend = backend
+        self.reconstruction = reconstruction
+        self.limiter = limiter
+        self.time_integration = time_integration
+        self.friction = friction
+        self.scheme = scheme
+        self.delta_t = delta_t
+        self.theta = theta
+        self.steady_state = steady_state
+        self.subdomains = subdomains
+        self.checkpoint = checkpoint
+        self.profiler = profiler
+        self.upstream = upstream
+        self.downstream = downstream
+        self.slot_celerity = slot_celerity
+        self.has_pipes = has_pipes
+        self._slot: Optional[PreissmannSlot] = None  # Slot geometry of the cells in a mixed system
+        self._slot_faces: Optional[SlotInterfaces] = None  # The same for the two sides of every interface
+        # Ghost-cell values (h, hu) upstream and h downstream, refreshed once per step
+        self._upstream_ghost = (h_in, h_in * u_in)
+        self._downstream_ghost = h_out
+        self._inflow_mass_flux: Optional[float] = None  # Imposed on the first interface by discharge inflows
+        self.n_steps = 0  # Solver steps taken by the last run_simulation
+        self.state: Optional[ChannelState] = None
 
-    def run_simulation(self):
+    @property
+    def active_backend(self) -> str:
         """
-        Run the simulation using the Finite Volume Method with HLL Riemann Solver.
+        The backend actually used, after falling back when JIT is unavailable.
+
+        The compiled loop implements the first-order scheme with explicit friction,
+        constant boundary values and open channels only.
+        """
+        first_order = self.reconstruction == "constant" and self.time_integration == "euler"
+        serial = self.subdomains == 1 and not self.varying_boundaries and not self.has_pipes
+        if self.backend == "jit" and not (JIT_AVAILABLE and first_order and self.friction == "explicit" and serial):
+            return "numpy"
+        return self.backend
+
+    @property
+    def varying_boundaries(self) -> bool:
+        return self.upstream is not None or self.downstream is not None
+
+    def _update_boundaries(self, t: float, U: np.ndarray, b: np.ndarray) -> None:
+        """
+        Evaluate the boundary conditions at time t for the next step's ghost cells.
+        """
+        # Only a discharge inflow imposes the mass flux; clear one left by an earlier run
+        self._inflow_mass_flux = None
+        if self.upstream is not None:
+            self._upstream_ghost = self.upstream(t, U, b)
+            if self.upstream.kind == "discharge":
+                self._inflow_mass_flux = self._upstream_ghost[1]
+        else:
+            self._upstream_ghost = (self.h_in, self.h_in * self.u_in)
+        if self.downstream is not None:
+            self._downstream_ghost = self.downstream(t, U, b)
+        else:
+            self._downstream_ghost = self.h_out
+
+    def _interface_fluxes(self, U: np.ndarray, U_ext: np.ndarray) -> np.ndarray:
+        """
+        Fill the ghost cells around U and compute the HLL flux at every interface.
+        """
+        self._fill_ghosts(U, U_ext)
+        F = self._ghosted_fluxes(U_ext)
+        if self._inflow_mass_flux is not None:
+            F[0, 0] = self._inflow_mass_flux
+        return F
+
+    def _fill_ghosts(self, U: np.ndarray, U_ext: np.ndarray) -> None:
+        ng = (len(U_ext) - len(U)) // 2
+        U_ext[ng:-ng] = U
+        self._fill_upstream_ghosts(U_ext, ng)
+        self._fill_downstream_ghosts(U_ext, ng, U[-1, 1])
+        if self._slot is not None:
+            # Boundary depths are piezometric heads; pipe ghosts store area per width
+            U_ext[:ng, 0] = self._slot[0].depth(U_ext[:ng, 0])
+            U_ext[-ng:, 0] = self._slot[-1].depth(U_ext[-ng:, 0])
+
+    def _prepare_slot(self, state: ChannelState, num_ghost: int) -> None:
+        """
+        Widen the pipes' slots for slot_celerity and align their geometry with the interfaces.
+        """
+        if self.slot_celerity is not None:
+            state.widen_slots(self.slot_celerity)
+        self._slot = state.slot()
+        if self._slot is None:
+            self._slot_faces = None
+            return
+        # Ghost cells take the geometry of the end cells
+        cells = np.concatenate([np.zeros(num_ghost, dtype=int), np.arange(state.num_cells),
+                                np.full(num_ghost, state.num_cells - 1)])
+        ext = self._slot[cells]
+        left = slice(num_ghost - 1, len(cells) - num_ghost)
+        right = slice(num_ghost, len(cells) - num_ghost + 1)
+        self._slot_faces = SlotInterfaces(ext[left], ext[right])
+
+    def _fill_upstream_ghosts(self, U_ext: np.ndarray, ng: int) -> None:
+        # Upstream boundary (Inflow)
+        h, hu = self._upstream_ghost
+        U_ext[:ng, 0] = h
+        U_ext[:ng, 1] = hu
+
+    def _fill_downstream_ghosts(self, U_ext: np.ndarray, ng: int, hu_last: float) -> None:
+        # Downstream boundary (Specified depth)
+        U_ext[-ng:, 0] = self._downstream_ghost
+        U_ext[-ng:, 1] = hu_last  # Assuming zero gradient for momentum
+
+    def _ghosted_fluxes(self, U_ext: np.ndarray) -> np.ndarray:
+        """
+        HLL flux at every interior interface of an array whose ghost cells are already filled.
+        """
+        if self.reconstruction == "muscl":
+            U_left, U_right = muscl_interface_states(U_ext, self.limiter)
+        else:
+            U_left, U_right = U_ext[:-1], U_ext[1:]
+        if self._slot_faces is not None:
+            return self._slot_faces.fluxes(U_left, U_right)
+        return hll_flux_array(U_left, U_right)
+
+    def _finite_volume_update(self, U: np.ndarray, F: np.ndarray, S0: np.ndarray, n: np.ndarray, dt: float) -> np.ndarray:
+        """
+        Flux-difference and source update of the cells U given their interface fluxes F.
+
+        With implicit friction the update is split: the flux and bed slope update
+        is followed by the exact friction integrator on the new state.
+        """
+        explicit_friction = self.friction == "explicit"
+        S = compute_source_array(U, S0, n, friction=explicit_friction, slot=self._slot)
+        dF = F[1:] - F[:-1]
+        if self._slot_faces is not None:
+            # Wall reactions where a pipe starts, ends or changes size
+            wall = self._slot_faces.wall
+            dF[:, 1] += wall[1:] + wall[:-1]
+        U_new = U - (dt / self.delta_x) * dF + dt * S
+        if not explicit_friction:
+            U_new = apply_implicit_friction(U_new, n, dt, slot=self._slot)
+        return U_new
+
+    def _euler_stage(self, state: ChannelState, U: np.ndarray, dt: float, U_ext: np.ndarray) -> np.ndarray:
+        """
+        One forward-Euler stage of the finite volume update starting from U.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            F = self._interface_fluxes(U, U_ext)
+            return self._finite_volume_update(U, F, state.S0, state.n, dt)
+
+        # The Runge-Kutta combination of the previous stage belongs to the update
+        profiler.lap("update")
+        self._fill_ghosts(U, U_ext)
+        profiler.lap("boundary")
+        F = self._ghosted_fluxes(U_ext)
+        if self._inflow_mass_flux is not None:
+            F[0, 0] = self._inflow_mass_flux
+        profiler.lap("flux")
+        U_new = self._finite_volume_update(U, F, state.S0, state.n, dt)
+        profiler.lap("update")
+        return U_new
+
+    def _advance_numpy(self, state: ChannelState, t: float, t_stop: float, max_steps: int, n: int):
+        """
+        Advance the state with the vectorized kernels until t_stop or max_steps steps.
         """
-        num_cells = len(self.nodes)
         dx = self.delta_x
-        total_time = self.total_time
         CFL = self.CFL
+        num_ghost = 2 if self.reconstruction == "muscl" else 1
+        U_ext = np.zeros((state.num_cells + 2 * num_ghost, 2))
+        profiler = self.profiler
+        varying = self.varying_boundaries
+        steps = 0
+        while t < t_stop and steps < max_steps:
+            U_old = state.U
+            if varying:
+                self._update_boundaries(t, U_old, state.b)
+                if profiler is not None:
+                    profiler.lap("boundary")
+
+            # Update time step based on CFL condition, cut to hit t_stop exactly
+            max_speed = max_wave_speed(U_old, slot=self._slot)
+            dt = CFL * dx / max_speed if max_speed > 0 else CFL * dx / 1e-3
+            reached = t + dt >= t_stop
+            if reached:
+                dt = t_stop - t
+            if profiler is not None:
+                profiler.lap("cfl")
+
+            # Update conserved variables (SSP Runge-Kutta as convex combinations of Euler stages)
+            U1 = self._euler_stage(state, U_old, dt, U_ext)
+            if self.time_integration == "ssp_rk2":
+                U1 = 0.5 * U_old + 0.5 * self._euler_stage(state, U1, dt, U_ext)
+            elif self.time_integration == "ssp_rk3":
+                U2 = 0.75 * U_old + 0.25 * self._euler_stage(state, U1, dt, U_ext)
+                U1 = U_old / 3.0 + (2.0 / 3.0) * self._euler_stage(state, U2, dt, U_ext)
+            state.U = U1
+            if profiler is not None:
+                profiler.lap("update")
+                profiler.step(dt, reached)
+
+            t = t_stop if reached else t + dt
+            steps += 1
+
+            # Logging
+            if (n + steps) % 20 == 0:
+                logger.info(f"Time step {n + steps}, Time {t:.2f}s, Max Speed {max_speed:.2f} m/s")
+        return t, steps
+
+    def _advance_jit(self, state: ChannelState, t: float, t_stop: float, max_steps: int, n: int):
+        """
+        Advance the state with the compiled time loop until t_stop or max_steps steps.
+        """
+        U = np.ascontiguousarray(state.U)
+        t, steps, max_speed = jit_advance(U, state.S0, state.n, float(self.delta_x), float(self.CFL),
+                                          float(self.h_in), float(self.u_in), float(self.h_out),
+                                          float(t), float(t_stop), int(max_steps))
+        state.U = U
+
+        # Logging
+        if (n + steps) // 20 > n // 20:
+            logger.info(f"Time step {n + steps}, Time {t:.2f}s, Max Speed {max_speed:.2f} m/s")
+        return t, steps
+
+    def _advance_preissmann(self, state: ChannelState, t: float, t_stop: float, max_steps: int, n: int):
+        """
+        Advance the state with the implicit Preissmann scheme until t_stop or max_steps steps.
+        """
+        boundaries = None
+        if self.varying_boundaries:
+            def boundaries(t_new: float, U: np.ndarray):
+                # The implicit step imposes the boundary values at the end of the step
+                self._update_boundaries(t_new, U, state.b)
+                return self._upstream_ghost[1], self._downstream_ghost
+        t, steps = advance_preissmann(state, self.delta_x, self.delta_t, self.theta,
+                                      self.h_in, self.u_in, self.h_out, t, t_stop, max_steps,
+                                      boundaries=boundaries)
+        if (n + steps) // 20 > n // 20:
+            logger.info(f"Time step {n + steps}, Time {t:.2f}s (Preissmann)")
+        return t, steps
+
+    def initialize_steady_state(self) -> np.ndarray:
+        """
+        Replace the nodes' initial conditions with the steady gradually-varied-flow profile.
 
-        U = np.zeros((num_cells, 2))  # Conserved variables [h, hu]
-        x = np.array([i * dx for i in range(num_cells)])
+        The discharge is chosen to match this system's boundary treatment
+        (h_in * u_in for the Preissmann scheme, the boundary flux equilibrium for
+        the finite volume scheme), so transient runs start near equilibrium.
+        Hydrograph boundaries are taken at t = 0: a discharge inflow sets the
+        discharge directly, and a rating curve is read at the current discharge
+        of the last cell.
 
-        # Initialize conditions
-        for i, node in enumerate(self.nodes.values()):
-            h = node.flow.h
-            u = node.flow.Q / node.flow.A if node.flow.A > 0 else 0.0
-            U[i, 0] = h
-            U[i, 1] = h * u
+        Returns:
+            np.ndarray: The steady depth profile written to the nodes.
+        """
+        state = ChannelState.from_nodes(self.nodes)
+        self._update_boundaries(0.0, state.U, state.b)
+        for boundary in (self.upstream, self.downstream):
+            if boundary is not None:
+                boundary.reset()
+        h_in, hu_in = self._upstream_ghost
+        h_out = self._downstream_ghost
+        if self.upstream is None:
+            u_in = self.u_in
+        else:
+            u_in = hu_in / h_in if h_in > 0 else 0.0
+        if self.scheme == "preissmann" or (self.upstream is not None and self.upstream.kind == "discharge"):
+            q = hu_in
+        else:
+            q = fvm_equilibrium_discharge(state.num_cells, self.delta_x, state.S0, state.n, h_in, u_in, h_out)
+        h, hu = initialize_steady_nodes(self.nodes, self.delta_x, q, h_out, h_in=h_in)
+        logger.info(f"Initialized steady profile with q = {q:.4f} m²/s")
+        return h
+
+    def _time_loop(self, resume_from: Optional[str] = None, every_step: bool = False,
+                   before_checkpoint: Optional[Callable[[], None]] = None):
+        """
+        The time loop behind run_simulation, iter_steps and iter_snapshots.
 
+        Builds self.state, then advances it in segments that end at the next
+        scheduled output, so all backends hit output times exactly. Yields
+        ``(t, n, record)`` after every segment (and, with every_step, after every
+        solver step inside it), where record marks the scheduled snapshots. The
+        initial state is yielded first when it is scheduled. Worker processes and
+        checkpoint writers are released when the generator finishes or is closed.
+        Checkpoints are taken after the snapshot at the same time has been
+        yielded, so everything recorded up to a checkpoint's time precedes it;
+        before_checkpoint is called just before one is written.
+        """
         t = 0.0  # Initialize time
         n = 0    # Time step counter
-        results = []
-
-        while t < total_time:
-            U_old = U.copy()
-
-            # Apply boundary conditions
-            U_ext = np.zeros((num_cells + 2, 2))
-            U_ext[1:-1] = U
-            # Upstream boundary (Inflow)
-            U_ext[0, 0] = self.h_in
-            U_ext[0, 1] = self.h_in * self.u_in
-            # Downstream boundary (Specified depth)
-            U_ext[-1, 0] = self.h_out
-            U_ext[-1, 1] = U_ext[-2, 1]  # Assuming zero gradient for momentum
-
-            # Compute fluxes at interfaces
-            F = np.zeros((num_cells + 1, 2))
-            for i in range(num_cells + 1):
-                F[i] = hll_flux(U_ext[i], U_ext[i + 1])
-
-            # Update time step based on CFL condition
-            h = U[:, 0]
-            hu = U[:, 1]
-            u = hu / h
-            c = np.sqrt(G * h)
-            max_speed = np.max(np.abs(u) + c)
-            dt = CFL * dx / max_speed if max_speed > 0 else CFL * dx / 1e-3
-            if t + dt > total_time:
-                dt = total_time - t
-
-            # Update conserved variables
-            for i in range(num_cells):
-                node = self.nodes[i]
-                S0 = node.flow.S0 if isinstance(node.flow, OpenChannel) else 0.0
-                n_manning = node.flow.n if isinstance(node.flow, OpenChannel) else 0.0
-                S = compute_source(U_ext[i + 1], S0, n_manning)
-                U[i] = U_old[i] - (dt / dx) * (F[i + 1] - F[i]) + dt * S
-
-            t += dt
-            n += 1
-
-            # Store results for visualization
-            for i in range(num_cells):
-                node = self.nodes[i]
-                node.flow.h = U[i, 0]
-                node.flow.Q = U[i, 1]
-                node.flow.A = node.flow.b * node.flow.h if isinstance(node.flow, OpenChannel) else node.flow.A
-                results.append({
-                    "Time": t,
-                    "Node": i,
-                    "x": i * dx,
-                    "Depth (h)": node.flow.h,
-                    "Flow Rate (Q)": node.flow.Q,
-                    "Area (A)": node.flow.A
-                })
+        if resume_from is not None:
+            checkpoint = load_checkpoint(resume_from)
+            if len(checkpoint.U) != len(self.nodes) or checkpoint.delta_x != self.delta_x:
+                raise ValueError(f"Checkpoint {resume_from} does not match this system's grid.")
+            state = checkpoint.to_state()
+            self.h_in, self.u_in, self.h_out = checkpoint.h_in, checkpoint.u_in, checkpoint.h_out
+            t, n = checkpoint.t, checkpoint.n_steps
+            logger.info(f"Resuming from {resume_from} at t = {t:.2f}s, step {n}")
+        else:
+            state = ChannelState.from_nodes(self.nodes)
+        self.state = state
+        total_time = self.total_time
+        for boundary in (self.upstream, self.downstream):
+            if boundary is not None:
+                boundary.reset()
+        self._update_boundaries(t, state.U, state.b)
+        self._prepare_slot(state, 2 if self.reconstruction == "muscl" else 1)
 
-            # Logging
-            if n % 20 == 0:
-                logger.info(f"Time step {n}, Time {t:.2f}s, Max Speed {max_speed:.2f} m/s")
+        backend = self.active_backend
+        if backend != self.backend and self.scheme == "fvm":
+            reason = "numba is not installed" if not JIT_AVAILABLE else "it only supports the serial first-order explicit scheme"
+            logger.warning(f"JIT backend requested but {reason}; using the NumPy backend.")
+        pool = None
+        if self.scheme == "preissmann":
+            advance = self._advance_preissmann
+        elif self.subdomains > 1:
+            pool = SubdomainPool(self, state, self.subdomains)
+            advance = pool.advance
+        else:
+            advance = self._advance_jit if backend == "jit" else self._advance_numpy
+        # The NumPy loop times its own phases and counts its steps one by one
+        profiler = self.profiler
+        profiled_steps = advance == self._advance_numpy
+        if profiler is not None:
+            profiler.reset()
+
+        writer = self.checkpoint
+        if writer is not None:
+            writer.start(n)
+        monitor = self.steady_state
+        if monitor is not None:
+            monitor.reset()
+
+        # Output times are visited in order with a cursor; step-based schedules have none
+        output_times = self.output.output_times(total_time)
+        k_out = 0
+        try:
+            if output_times is not None and t > 0.0:
+                # Outputs up to the checkpoint time were recorded by the interrupted run
+                k_out = int(np.searchsorted(output_times, t, side="right"))
+            elif output_times is not None:
+                while k_out < len(output_times) and output_times[k_out] <= 0.0:
+                    k_out += 1
+                    if profiler is not None:
+                        profiler.before_yield(True)
+                    yield 0.0, 0, True
+
+            while t < total_time:
+                if output_times is not None:
+                    t_stop = output_times[k_out] if k_out < len(output_times) else total_time
+                    max_steps = np.iinfo(np.int64).max
+                else:
+                    t_stop = total_time
+                    max_steps = self.output.steps_until_record(n)
+                if monitor is not None:
+                    max_steps = min(max_steps, monitor.check_every)
+                    U_check, t_check = state.U.copy(), t
+                if writer is not None:
+                    max_steps = min(max_steps, writer.steps_until_due(n))
+
+                # Splitting a segment into single steps does not change dt
+                segment_steps = 0
+                while True:
+                    if profiler is not None:
+                        profiler.mark()
+                        t_start = t
+                    t, steps = advance(state, t, t_stop, 1 if every_step else max_steps - segment_steps, n)
+                    if profiler is not None:
+                        profiler.lap("solver")
+                        if not profiled_steps:
+                            profiler.segment(t_start, t, steps, reached=t >= t_stop)
+                    n += steps
+                    segment_steps += steps
+                    if t >= t_stop or segment_steps >= max_steps:
+                        break
+                    if profiler is not None:
+                        profiler.before_yield(False)
+                    yield t, n, False
+
+                # Store results for visualization
+                if output_times is not None:
+                    record = k_out < len(output_times) and t >= output_times[k_out]
+                    if record:
+                        k_out += 1
+                else:
+                    record = self.output.should_record_step(n, finished=t >= total_time)
+
+                # Early termination once the solution is steady
+                steady = monitor is not None and monitor.update(t, t - t_check, U_check, state.U)
+                if profiler is not None:
+                    profiler.before_yield(record or steady)
+                yield t, n, record or steady
+                if writer is not None:
+                    if profiler is not None:
+                        profiler.mark()
+                    if before_checkpoint is not None and writer.due(n):
+                        before_checkpoint()
+                    writer.maybe_write(self, state, t, n)
+                    if profiler is not None:
+                        profiler.lap("checkpoint")
+                if steady:
+                    break
+        finally:
+            if pool is not None:
+                pool.close()
+            if writer is not None:
+                writer.close()
+            if profiler is not None:
+                profiler.finish()
+
+    def iter_steps(self, resume_from: Optional[str] = None) -> Iterator[StepView]:
+        """
+        Advance the simulation one solver step at a time.
+
+        Yields a read-only StepView of the state after every step, without
+        copying or recording anything; stop iterating to stop the run. Views of
+        states scheduled by the output schedule have ``recorded`` set. The view
+        is only guaranteed to be current until the generator is resumed. The
+        nodes are not updated; use ``system.state.write_back(nodes)`` if needed.
+        """
+        with closing(self._time_loop(resume_from, every_step=True)) as loop:
+            for t, n, record in loop:
+                yield StepView.of(self.state, t, n, record)
+
+    def iter_snapshots(self, resume_from: Optional[str] = None) -> Iterator[StepView]:
+        """
+        Like iter_steps, but yields only the states scheduled by the output schedule.
+        """
+        with closing(self._time_loop(resume_from)) as loop:
+            for t, n, record in loop:
+                if record:
+                    yield StepView.of(self.state, t, n, True)
+
+    def run_simulation(self, write_back: bool = True, resume_from: Optional[str] = None,
+                       stream_to: Optional[str] = None):
+        """
+        Run the simulation using the Finite Volume Method with HLL Riemann Solver.
+
+        The time loop works on a ChannelState built once from the nodes; the
+        Node/Flow objects are only updated at the end of the run. The run
+        consumes the same loop as iter_snapshots and stores each snapshot.
+        With subdomains > 1 the state is advanced by a SubdomainPool of worker
+        processes kept alive for the run.
+
+        Args:
+            write_back (bool): Copy the final state onto the nodes when the run ends.
+            resume_from (str, optional): Checkpoint file to continue from. The state,
+                time, step count, boundary values and geometry are taken from the file,
+                and the run continues bit-for-bit as if it had never stopped. Only
+                snapshots after the checkpoint time are recorded.
+            stream_to (str, optional): Directory to stream snapshots to in chunks from a
+                background thread instead of keeping them in memory. With resume_from,
+                the snapshots already streamed up to the checkpoint time are kept and
+                the run appends to them.
+
+        Returns:
+            Tuple[SimulationResults, np.ndarray]: Recorded snapshots and cell positions.
+            Use ``results.to_dataframe()`` for plotting, or ``results.to_records()``
+            for the legacy list-of-dicts shape. With ``stream_to`` the snapshots are
+            returned as a lazy ChunkedResults reader instead.
+        """
+        x = np.arange(len(self.nodes)) * self.delta_x
+        output_times = self.output.output_times(self.total_time)
+        if stream_to is not None:
+            # A resumed run continues the stream after the snapshots taken up to its checkpoint
+            resume_after = load_checkpoint(resume_from).t if resume_from is not None else None
+            results = ChunkedResultWriter(stream_to, x, resume_after=resume_after)
+        else:
+            results = SimulationResults(x, capacity=len(output_times) if output_times is not None else 0)
+
+        try:
+            profiler = self.profiler
+            # Streamed snapshots reach the disk before each checkpoint, so a resumed run continues them
+            flush = results.flush if stream_to is not None else None
+            for t, n, record in self._time_loop(resume_from, before_checkpoint=flush):
+                self.n_steps = n
+                if record:
+                    if profiler is not None:
+                        profiler.mark()
+                    state = self.state
+                    results.append(t, state.head(), state.hu, state.area())
+                    if profiler is not None:
+                        profiler.lap("record")
+        except BaseException:
+            if stream_to is not None:
+                # Keep what was streamed, but never hide the solver's own error
+                try:
+                    results.close()
+                except Exception:
+                    logger.exception(f"Closing the result stream in {stream_to} failed")
+            raise
+        if stream_to is not None:
+            results.close()
+            results = ChunkedResults(stream_to)
+
+        if write_back:
+            self.state.write_back(self.nodes)
 
         return results, x
@@ -0,0 +1,224 @@
+# src/state.py
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from src.constants import G
+from src.models import Node, OpenChannel, PressurizedPipe
+from src.utilities import compute_free_surface_width
+
+@dataclass(frozen=True)
+class PreissmannSlot:
+    """
+    Closed-conduit geometry of the cells of a mixed system, per unit conduit width.
+
+    A pipe is a rectangular conduit of width Af / D whose crown at height D
+    continues upward as a narrow open slot; ``ratio`` is the slot width B over
+    the conduit width. While the pipe is surcharged the slot's gravity wave
+    speed sqrt(g h / ratio) plays the pressure wave speed, and the water level
+    in the slot is the piezometric head. Open channels have an infinite crown
+    and ratio 1, so every formula reduces to the free-surface one.
+    """
+    crown: np.ndarray  # Conduit height per cell (m), inf for open channels
+    ratio: np.ndarray  # Slot width over conduit width per cell
+
+    def __getitem__(self, index) -> 'PreissmannSlot':
+        return PreissmannSlot(self.crown[index], self.ratio[index])
+
+    def surcharge(self, h: np.ndarray) -> np.ndarray:
+        """
+        Piezometric head above the crown for area-per-width depths h.
+        """
+        return np.maximum(h - self.crown, 0.0) / self.ratio
+
+    def head(self, h: np.ndarray) -> np.ndarray:
+        return np.minimum(h, self.crown) + self.surcharge(h)
+
+    def depth(self, head: np.ndarray) -> np.ndarray:
+        """
+        Area-per-width depth for piezometric heads (the inverse of head).
+        """
+        return np.minimum(head, self.crown) + self.ratio * np.maximum(head - self.crown, 0.0)
+
+    def pressure(self, h: np.ndarray) -> np.ndarray:
+        """
+        Hydrostatic pressure integral per unit width over g; h²/2 below the crown.
+        """
+        free = np.minimum(h, self.crown)
+        y = self.surcharge(h)
+        return 0.5 * free * free + free * y + 0.5 * self.ratio * y * y
+
+    def celerity(self, h: np.ndarray) -> np.ndarray:
+        """
+        sqrt(g A / T): the gravity wave speed below the crown and the slot wave speed above it.
+        """
+        width = np.where(h > self.crown, self.ratio, 1.0)
+        return np.sqrt(G * np.maximum(h, 0.0) / width)
+
+    def max_celerity(self, h: np.ndarray) -> np.ndarray:
+        """
+        Wave speed bound for the time step. A pipe may fill within any step, so pipes count at the slot wave speed.
+        """
+        pipe = np.isfinite(self.crown)
+        h_bound = np.where(pipe, np.maximum(h, self.crown), h)
+        return np.sqrt(G * np.maximum(h_bound, 0.0) / np.where(pipe, self.ratio, 1.0))
+
+@dataclass
+class ChannelState:
+    """
+    Struct-of-arrays view of a hydraulic system used inside the time loop.
+
+    Built once from the node dictionary; the solver then works only on these
+    contiguous per-cell arrays and writes back to the Node/Flow objects on request.
+    """
+    U: np.ndarray          # Conserved variables [h, hu], shape (num_cells, 2)
+    b: np.ndarray          # Channel or conduit width per cell (m), zero for cells without a width
+    S0: np.ndarray         # Bed slope per cell
+    n: np.ndarray          # Manning's roughness per cell
+    A_fixed: np.ndarray    # Cross-sectional area of cells whose geometry does not depend on h (m²)
+    is_open: np.ndarray    # True where the cell is an OpenChannel
+    node_ids: List[int]    # Node id of each cell, in cell order
+    crown: Optional[np.ndarray] = None       # Conduit height of pipe cells (m), inf elsewhere
+    slot_ratio: Optional[np.ndarray] = None  # Preissmann slot width over conduit width, 1 elsewhere
+
+    def __post_init__(self):
+        if self.crown is None:
+            self.crown = np.full(len(self.U), np.inf)
+        if self.slot_ratio is None:
+            self.slot_ratio = np.ones(len(self.U))
+
+    @classmethod
+    def from_nodes(cls, nodes: Dict[int, Node]) -> 'ChannelState':
+        """
+        Gathers the per-cell state and geometry from the nodes in dictionary order.
+
+        Pipe cells store the area per unit conduit width, which equals the
+        depth below the crown; their flow.h is read as the piezometric head.
+        """
+        num_cells = len(nodes)
+        U = np.zeros((num_cells, 2))
+        b = np.zeros(num_cells)
+        S0 = np.zeros(num_cells)
+        n = np.zeros(num_cells)
+        A_fixed = np.zeros(num_cells)
+        is_open = np.zeros(num_cells, dtype=bool)
+        crown = np.full(num_cells, np.inf)
+        slot_ratio = np.ones(num_cells)
+        for i, node in enumerate(nodes.values()):
+            flow = node.flow
+            u = flow.Q / flow.A if flow.A > 0 else 0.0
+            U[i, 0] = flow.h
+            if isinstance(flow, OpenChannel):
+                b[i] = flow.b
+                S0[i] = flow.S0
+                n[i] = flow.n
+                is_open[i] = True
+            elif isinstance(flow, PressurizedPipe):
+                D = flow.D if flow.D is not None else float(np.sqrt(4.0 * flow.Af / np.pi))
+                b[i] = flow.Af / D
+                S0[i] = flow.S0
+                n[i] = flow.n
+                crown[i] = D
+                B = flow.B if flow.B > 0 else compute_free_surface_width(flow.Af, flow.Cp)
+                slot_ratio[i] = B / b[i]
+                U[i, 0] = min(flow.h, D) + slot_ratio[i] * max(flow.h - D, 0.0)
+            else:
+                A_fixed[i] = flow.A
+            U[i, 1] = U[i, 0] * u
+        return cls(U=U, b=b, S0=S0, n=n, A_fixed=A_fixed, is_open=is_open, node_ids=list(nodes.keys()),
+                   crown=crown, slot_ratio=slot_ratio)
+
+    @property
+    def num_cells(self) -> int:
+        return len(self.U)
+
+    @property
+    def h(self) -> np.ndarray:
+        return self.U[:, 0]
+
+    @property
+    def hu(self) -> np.ndarray:
+        return self.U[:, 1]
+
+    @property
+    def has_pipes(self) -> bool:
+        return bool(np.isfinite(self.crown).any())
+
+    def slot(self) -> Optional[PreissmannSlot]:
+        """
+        Slot geometry of the cells, or None when there are no pipes.
+        """
+        return PreissmannSlot(self.crown, self.slot_ratio) if self.has_pipes else None
+
+    def widen_slots(self, celerity: float) -> None:
+        """
+        Widen the pipes' slots to B = g Af / celerity² where they are narrower, keeping the heads.
+
+        The slot wave speed sqrt(g Af / B) then stays at or below celerity, so
+        surcharged pipes allow a time step of about CFL * dx / celerity.
+        """
+        if not self.has_pipes:
+            return
+        head = self.head()
+        pipes = np.isfinite(self.crown)
+        self.slot_ratio[pipes] = np.maximum(self.slot_ratio[pipes], G * self.crown[pipes] / celerity ** 2)
+        self.U[:, 0] = self.slot().depth(head)
+
+    def head(self) -> np.ndarray:
+        """
+        Depth for open channels and piezometric head for pipes.
+        """
+        if not self.has_pipes:
+            return self.U[:, 0]
+        return self.slot().head(self.U[:, 0])
+
+    def area(self) -> np.ndarray:
+        """
+        Cross-sectional area per cell (rectangular for open channels and pipes).
+        """
+        return np.where(self.b > 0, self.b * self.U[:, 0], self.A_fixed)
+
+    def write_back(self, nodes: Dict[int, Node]) -> None:
+        """
+        Copies the current state onto the Node/Flow objects.
+
+        Pipes also get their free-surface width as ``top_width``: the conduit
+        width while the pipe runs partly full, the slot width while it is
+        surcharged. The slot width B itself is geometry and is left alone.
+        """
+        A = self.area()
+        head = self.head()
+        for i, node_id in enumerate(self.node_ids):
+            flow = nodes[node_id].flow
+            flow.h = float(head[i])
+            flow.Q = float(self.U[i, 1])
+            flow.A = float(A[i])
+            if isinstance(flow, PressurizedPipe):
+                surcharged = self.U[i, 0] > self.crown[i]
+                flow.top_width = float(self.b[i] * (self.slot_ratio[i] if surcharged else 1.0))
+
+@dataclass(frozen=True)
+class StepView:
+    """
+    Read-only view of the solver state at one time, as yielded by the step iterators.
+
+    ``U`` shares memory with the solver state instead of copying it.
+    """
+    t: float           # Simulated time (s)
+    step: int          # Solver steps taken so far
+    U: np.ndarray      # Conserved variables [h, hu], read-only, shape (num_cells, 2)
+    recorded: bool = False  # True when the output schedule asks for this state
+
+    @classmethod
+    def of(cls, state: ChannelState, t: float, step: int, recorded: bool = False) -> 'StepView':
+        U = state.U.view()
+        U.flags.writeable = False
+        return cls(t=float(t), step=int(step), U=U, recorded=bool(recorded))
+
+    @property
+    def h(self) -> np.ndarray:
+        return self.U[:, 0]
+
+    @property
+    def hu(self) -> np.ndarray:
+        return self.U[:, 1]
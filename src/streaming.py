@@ -0,0 +1,250 @@
+# src/streaming.py
+
+import json
+import os
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Union
+from src.results import SimulationResults
+import logging
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("time", "h", "Q", "A")
+MANIFEST = "manifest.json"
+
+CellSelection = Union[slice, np.ndarray, List[int], None]
+
+def _chunk_path(directory: str, name: str, index: int) -> str:
+    return os.path.join(directory, f"{name}_{index:06d}.npy")
+
+class ChunkedResultWriter:
+    """
+    Streams snapshots to a directory of ``.npy`` chunks on a background thread.
+
+    Snapshots are buffered into a chunk of ``chunk_size`` rows; full chunks are
+    handed to a writer thread through a queue holding at most ``max_pending``
+    chunks, so memory stays bounded by (max_pending + 1) chunks however long
+    the run is. If the disk falls behind, append blocks until a chunk is
+    written. A JSON manifest listing the chunks and their time ranges is
+    replaced atomically after each chunk, so a crashed run leaves a readable
+    directory. Has the same ``append`` signature as SimulationResults.
+
+    Args:
+        directory (str): Output directory; chunks of a previous run in it are removed.
+        x (np.ndarray): Cell positions (m).
+        chunk_size (int, optional): Snapshots per chunk. Defaults to roughly
+            ``chunk_bytes`` of h, Q and A per chunk.
+        chunk_bytes (int): Target chunk size in bytes when chunk_size is not given.
+        max_pending (int): Full chunks that may wait for the writer thread.
+        resume_after (float, optional): Continue a previous run's stream instead
+            of replacing it: its snapshots up to this time (a checkpoint's time)
+            are kept and new snapshots are appended after them.
+    """
+
+    def __init__(self, directory: str, x: np.ndarray, chunk_size: Optional[int] = None,
+                 chunk_bytes: int = 64 * 2 ** 20, max_pending: int = 2, resume_after: Optional[float] = None):
+        self.directory = directory
+        self.x = np.asarray(x, dtype=float)
+        self.num_cells = len(self.x)
+        if chunk_size is None:
+            chunk_size = chunk_bytes // (3 * 8 * max(self.num_cells, 1))
+        self.chunk_size = max(int(chunk_size), 1)
+
+        os.makedirs(directory, exist_ok=True)
+        old_manifest = os.path.join(directory, MANIFEST)
+        old_chunks: List[Dict] = []
+        if os.path.exists(old_manifest):
+            with open(old_manifest) as f:
+                manifest = json.load(f)
+            old_chunks = manifest["chunks"]
+            if resume_after is not None and old_chunks and manifest["num_cells"] != self.num_cells:
+                raise ValueError(f"{directory} holds results for {manifest['num_cells']} cells, "
+                                 f"not {self.num_cells}; cannot resume into it.")
+        self._chunks: List[Dict] = []
+        if resume_after is not None:
+            self._chunks = self._keep_until(old_chunks, resume_after)
+        for k in range(len(self._chunks), len(old_chunks)):
+            for name in FIELDS:
+                path = _chunk_path(directory, name, k)
+                if os.path.exists(path):
+                    os.remove(path)
+        np.save(os.path.join(directory, "x.npy"), self.x)
+        self._write_manifest()
+
+        self._size = sum(chunk["rows"] for chunk in self._chunks)
+        self._fill = 0
+        self._new_buffer()
+        self._error: Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max(int(max_pending), 1))
+        self._thread = threading.Thread(target=self._drain, name="result-writer", daemon=True)
+        self._thread.start()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _keep_until(self, chunks: List[Dict], t_end: float) -> List[Dict]:
+        """
+        The leading chunks holding snapshots with t <= t_end; a chunk straddling t_end is truncated.
+        """
+        kept = []
+        for k, chunk in enumerate(chunks):
+            if chunk["t_min"] > t_end:
+                break
+            if chunk["t_max"] > t_end:
+                time = np.load(_chunk_path(self.directory, "time", k))
+                rows = int(np.searchsorted(time, t_end, side="right"))
+                for name in FIELDS:
+                    path = _chunk_path(self.directory, name, k)
+                    np.save(path, np.load(path)[:rows])
+                kept.append({"rows": rows, "t_min": chunk["t_min"], "t_max": float(time[rows - 1])})
+                break
+            kept.append(chunk)
+        return kept
+
+    def _new_buffer(self) -> None:
+        self._time = np.empty(self.chunk_size)
+        self._h = np.empty((self.chunk_size, self.num_cells))
+        self._Q = np.empty((self.chunk_size, self.num_cells))
+        self._A = np.empty((self.chunk_size, self.num_cells))
+
+    def append(self, t: float, h: np.ndarray, Q: np.ndarray, A: np.ndarray) -> None:
+        """
+        Buffer one snapshot; hands the chunk to the writer thread when it is full.
+        """
+        if self._error is not None:
+            raise RuntimeError(f"Writing results to {self.directory} failed") from self._error
+        i = self._fill
+        self._time[i] = t
+        self._h[i] = h
+        self._Q[i] = Q
+        self._A[i] = A
+        self._fill += 1
+        self._size += 1
+        if self._fill == self.chunk_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._fill == 0:
+            return
+        n = self._fill
+        self._queue.put((self._time[:n], self._h[:n], self._Q[:n], self._A[:n]))
+        self._fill = 0
+        self._new_buffer()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered snapshots as a (possibly short) chunk and waits until every chunk is on disk.
+        """
+        self._flush()
+        self._queue.join()
+        if self._error is not None:
+            raise RuntimeError(f"Writing results to {self.directory} failed") from self._error
+
+    def _drain(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                self._queue.task_done()
+                break
+            if self._error is not None:
+                self._queue.task_done()
+                continue
+            try:
+                index = len(self._chunks)
+                for name, array in zip(FIELDS, chunk):
+                    np.save(_chunk_path(self.directory, name, index), array)
+                time = chunk[0]
+                self._chunks.append({"rows": len(time), "t_min": float(time[0]), "t_max": float(time[-1])})
+                self._write_manifest()
+            except BaseException as e:
+                self._error = e
+                logger.error(f"Writing result chunk to {self.directory} failed: {e}")
+            self._queue.task_done()
+
+    def _write_manifest(self) -> None:
+        path = os.path.join(self.directory, MANIFEST)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"num_cells": self.num_cells, "chunks": self._chunks}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def close(self) -> None:
+        """
+        Writes the partial last chunk and waits for the writer thread.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._flush()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f"Writing results to {self.directory} failed") from self._error
+
+class ChunkedResults:
+    """
+    Lazy reader for a directory written by ChunkedResultWriter.
+
+    Only the chunks overlapping a requested time window are opened, and they
+    are memory-mapped, so selecting a cell range reads just those columns.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        self.chunks: List[Dict] = manifest["chunks"]
+        self.x = np.load(os.path.join(directory, "x.npy"))
+        self.num_cells = len(self.x)
+
+    def __len__(self) -> int:
+        return sum(chunk["rows"] for chunk in self.chunks)
+
+    @property
+    def time(self) -> np.ndarray:
+        """
+        All snapshot times (small: one float per snapshot).
+        """
+        if not self.chunks:
+            return np.empty(0)
+        return np.concatenate([np.load(_chunk_path(self.directory, "time", k)) for k in range(len(self.chunks))])
+
+    def read(self, t_start: Optional[float] = None, t_end: Optional[float] = None,
+             cells: CellSelection = None) -> SimulationResults:
+        """
+        Snapshots with t_start <= t <= t_end for the selected cells, as an in-memory SimulationResults.
+
+        Args:
+            t_start, t_end (float, optional): Time window; open-ended when None.
+            cells (slice or index array, optional): Cells to read; all cells when None.
+        """
+        lo = -np.inf if t_start is None else t_start
+        hi = np.inf if t_end is None else t_end
+        cells = slice(None) if cells is None else cells
+        parts = {name: [] for name in FIELDS}
+        for k, chunk in enumerate(self.chunks):
+            if chunk["t_max"] < lo or chunk["t_min"] > hi:
+                continue
+            time = np.load(_chunk_path(self.directory, "time", k))
+            # Times are sorted, so the selected rows are one contiguous block
+            rows = np.flatnonzero((time >= lo) & (time <= hi))
+            if len(rows) == 0:
+                continue
+            rows = slice(rows[0], rows[-1] + 1)
+            parts["time"].append(time[rows])
+            for name in FIELDS[1:]:
+                data = np.load(_chunk_path(self.directory, name, k), mmap_mode="r")
+                parts[name].append(np.array(data[rows][:, cells]))
+        x = self.x[cells]
+        if not parts["time"]:
+            return SimulationResults(x)
+        return SimulationResults.from_arrays(x, *(np.concatenate(parts[name]) for name in FIELDS))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Loads everything; use read() with a window for large runs.
+        """
+        return self.read().to_dataframe()
@@ -0,0 +1,178 @@
+# src/sweep.py
+
+import itertools
+import json
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Run status codes stored in status.npy
+PENDING = 0
+DONE = 1
+FAILED = 2
+
+def parameter_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Expands a dict of parameter lists into the list of all combinations.
+    """
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+@dataclass
+class SweepResult:
+    directory: str
+    samples: List[Dict[str, Any]]
+    status: np.ndarray   # PENDING / DONE / FAILED per run
+    h: np.ndarray        # Final depth per run, memory-mapped, shape (runs, num_cells)
+    hu: np.ndarray       # Final unit discharge per run, memory-mapped, shape (runs, num_cells)
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> List[int]:
+        return [int(i) for i in np.flatnonzero(self.status == FAILED)]
+
+def _build_system(params: Dict[str, Any]) -> HydraulicSystem:
+    """
+    Builds a HydraulicSystem from a flat parameter dict (initialize_nodes + solver arguments).
+    """
+    nodes = initialize_nodes(
+        int(params["num_nodes"]),
+        channel_type=params.get("channel_type", "OpenChannel"),
+        h0=params.get("h0", 2.0),
+        u0=params.get("u0", 0.0),
+        b=params.get("b", 5.0),
+        S0=params.get("S0", 0.001),
+        n=params.get("n", 0.03)
+    )
+    return HydraulicSystem(
+        nodes=nodes,
+        delta_x=params["delta_x"],
+        total_time=params["total_time"],
+        CFL=params["CFL"],
+        h_in=params["h_in"],
+        u_in=params["u_in"],
+        h_out=params["h_out"],
+        output=OutputSchedule.final()
+    )
+
+def _run_one(directory: str, index: int, params: Dict[str, Any]) -> Optional[str]:
+    """
+    Worker entry point: runs one sample and writes its final state into the shared memmaps.
+
+    Returns None on success or the error message; exceptions never escape the worker.
+    """
+    try:
+        system = _build_system(params)
+        results, x = system.run_simulation(write_back=False)
+        h = np.load(os.path.join(directory, "h.npy"), mmap_mode="r+")
+        hu = np.load(os.path.join(directory, "hu.npy"), mmap_mode="r+")
+        h[index] = results.h[-1]
+        hu[index] = results.Q[-1]
+        h.flush()
+        hu.flush()
+        del h, hu
+        return None
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+def run_sweep(samples: Sequence[Dict[str, Any]], base: Dict[str, Any], directory: str,
+              workers: Optional[int] = None,
+              progress: Optional[Callable[[int, int], None]] = None) -> SweepResult:
+    """
+    Runs one HydraulicSystem per sample across a process pool.
+
+    Each sample overrides keys of ``base`` (num_nodes, delta_x, total_time, CFL,
+    h_in, u_in, h_out and the initialize_nodes arguments). Workers write the final
+    h/hu of their run into memory-mapped arrays in ``directory`` instead of
+    returning results to the parent, and a per-run status file records which
+    runs finished. Calling run_sweep again on the same directory resumes: runs
+    already marked DONE are skipped, failed and pending ones are retried.
+
+    Args:
+        samples: Parameter overrides, e.g. from parameter_grid().
+        base: Parameters shared by all runs.
+        directory: Output directory for the memmaps, status and error log.
+        workers: Number of worker processes (defaults to os.cpu_count()).
+        progress: Called as progress(completed, total) after each run.
+
+    Returns:
+        SweepResult: Memory-mapped final states plus status and errors.
+    """
+    os.makedirs(directory, exist_ok=True)
+    samples = [dict(sample) for sample in samples]
+    all_params = [{**base, **sample} for sample in samples]
+    num_runs = len(samples)
+    num_cells = {int(p["num_nodes"]) for p in all_params}
+    if len(num_cells) != 1:
+        raise ValueError("All runs in a sweep must have the same num_nodes.")
+    num_cells = num_cells.pop()
+
+    manifest_path = os.path.join(directory, "manifest.json")
+    status_path = os.path.join(directory, "status.npy")
+    manifest = {"samples": samples, "base": base, "num_cells": num_cells}
+    resuming = os.path.exists(manifest_path) and os.path.exists(status_path)
+    if resuming:
+        with open(manifest_path) as f:
+            if json.load(f) != json.loads(json.dumps(manifest)):
+                raise ValueError(f"Directory {directory} holds a different sweep; cannot resume.")
+    else:
+        for name in ("h.npy", "hu.npy"):
+            np.lib.format.open_memmap(os.path.join(directory, name), mode="w+",
+                                      dtype=float, shape=(num_runs, num_cells)).flush()
+        np.save(status_path, np.full(num_runs, PENDING, dtype=np.int8))
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+    status = np.load(status_path, mmap_mode="r+")
+    errors_path = os.path.join(directory, "errors.json")
+    errors = {}
+    if os.path.exists(errors_path):
+        with open(errors_path) as f:
+            errors = {int(k): v for k, v in json.load(f).items()}
+
+    todo = [i for i in range(num_runs) if status[i] != DONE]
+    completed = num_runs - len(todo)
+    if resuming:
+        logger.info(f"Resuming sweep in {directory}: {completed}/{num_runs} runs already done")
+    if progress is not None:
+        progress(completed, num_runs)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_run_one, directory, i, all_params[i]): i for i in todo}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                error = future.result()
+            except Exception as e:  # Worker process died
+                error = f"{type(e).__name__}: {e}"
+            if error is None:
+                status[i] = DONE
+                errors.pop(i, None)
+            else:
+                status[i] = FAILED
+                errors[i] = error
+                logger.warning(f"Sweep run {i} failed: {error}")
+            # Persist progress after every run so a crash loses at most the runs in flight
+            status.flush()
+            with open(errors_path, "w") as f:
+                json.dump(errors, f)
+            completed += 1
+            if progress is not None:
+                progress(completed, num_runs)
+
+    return SweepResult(
+        directory=directory,
+        samples=samples,
+        status=np.array(status),
+        h=np.load(os.path.join(directory, "h.npy"), mmap_mode="r"),
+        hu=np.load(os.path.join(directory, "hu.npy"), mmap_mode="r"),
+        errors=errors
+    )
@@ -1,5 +1,6 @@
 # src/utilities.py
 
+import numpy as np
 from typing import Dict, Tuple
 from src.models import Node, Flow, OpenChannel, PressurizedPipe
 from src.constants import G
@@ -36,18 +37,21 @@ def validate_parameters(parameters: Dict, channel_type: str) -> Tuple[bool, str]
             return False, "Parameter theta must be between 0 and 1 (exclusive of 0)."
     return True, ""
 
-def initialize_nodes(num_nodes: int, channel_type: str = 'OpenChannel', h0: float = 2.0, u0: float = 0.0, b: float = 5.0, S0: float = 0.001, n: float = 0.03) -> Dict[int, Node]:
+def initialize_nodes(num_nodes: int, channel_type: str = 'OpenChannel', h0: float = 2.0, u0: float = 0.0, b: float = 5.0, S0: float = 0.001, n: float = 0.03,
+                     Af: float = 5.0, Cp: float = 1000.0) -> Dict[int, Node]:
     """
     Initializes nodes with default Flow values based on channel type.
 
     Args:
         num_nodes (int): Number of nodes to initialize.
         channel_type (str): Type of channel ('OpenChannel' or 'PressurizedPipe').
-        h0 (float): Initial depth.
+        h0 (float): Initial depth, or piezometric head above the invert for pipes.
         u0 (float): Initial velocity.
         b (float): Channel width (for OpenChannel).
         S0 (float): Bed slope.
         n (float): Manning's roughness coefficient.
+        Af (float): Full cross-sectional area (for PressurizedPipe).
+        Cp (float): Pressure wave speed (for PressurizedPipe).
 
     Returns:
         Dict[int, Node]: Dictionary of initialized nodes.
@@ -69,20 +73,20 @@ def initialize_nodes(num_nodes: int, channel_type: str = 'OpenChannel', h0: floa
             )
             nodes[i] = Node(id=i, flow=flow)
         elif channel_type == 'PressurizedPipe':
-            # Implement PressurizedPipe initialization if needed
-            # Placeholder implementation
-            Af = 5.0  # Full cross-sectional area
-            Cp = 1000.0  # Pressure wave speed
+            D = float(np.sqrt(4.0 * Af / np.pi))  # Circular pipe of area Af
             B = compute_free_surface_width(Af, Cp)
-            A = Af  # Assume pipe is initially full
-            Q = 20.0  # Flow rate (m³/s)
+            # Part full below the crown, full plus the water stored in the slot above it
+            A = Af * min(h0, D) / D + B * max(h0 - D, 0.0)
+            Q = A * u0  # Flow rate (m³/s)
             flow = PressurizedPipe(
                 Q=Q,
                 A=A,
                 h=h0,
                 Af=Af,
                 Cp=Cp,
-                B=B
+                B=B,
+                S0=S0,
+                n=n
             )
             nodes[i] = Node(id=i, flow=flow)
     return nodes
@@ -116,6 +120,28 @@ def compute_free_surface_width(Af: float, Cp: float, G: float = 9.81) -> float:
     """
     return (G * Af) / (Cp ** 2)
 
+def slot_celerity_for_time_step(delta_x: float, delta_t: float, CFL: float = 0.9, velocity: float = 0.0) -> float:
+    """
+    Slot wave speed at which surcharged pipes allow a time step of delta_t.
+
+    Pass the result as HydraulicSystem(..., slot_celerity=...): pipes whose Cp
+    is faster get a wider Preissmann slot, so the CFL limit of the surcharged
+    cells, CFL * delta_x / (|u| + c), is no smaller than delta_t.
+
+    Args:
+        delta_x (float): Spatial step size (m).
+        delta_t (float): Desired time step (s).
+        CFL (float): Target CFL number.
+        velocity (float): Largest expected flow velocity in the pipes (m/s).
+
+    Returns:
+        float: Slot wave speed (m/s).
+    """
+    celerity = CFL * delta_x / delta_t - velocity
+    if celerity <= 0:
+        raise ValueError("delta_t is too long for the given CFL and velocity.")
+    return celerity
+
 def check_cfl_condition(Cp: float, delta_t: float, delta_x: float, cfl_max: float = 1.0) -> bool:
     """
     Checks if the CFL condition is satisfied.
@@ -1,107 +1,191 @@
 # src/visualization.py
 
+import numpy as np
 import plotly.graph_objects as go
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
-def plot_flow_rate(df: pd.DataFrame) -> go.Figure:
+# Largest number of points sent to the browser per line trace
+MAX_POINTS = 2000
+
+# Result arrays and axis labels per variable, for the space-time views
+VARIABLES = {
+    "h": ("h", "Depth (h)", "Hydraulic Head (h) [m]"),
+    "Q": ("Q", "Flow Rate (Q)", "Flow Rate (Q) [m³/s]"),
+    "A": ("A", "Area (A)", "Cross-Sectional Area (A) [m²]"),
+}
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
     """
-    Plots the flow rate over space for each node at the final time step.
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most max_points samples that keep the visual
+    shape of the line: the first and last points, plus from each bucket the
+    point forming the largest triangle with the previous pick and the mean of
+    the next bucket.
     """
-    # Extract the final time step
-    final_time = df['Time'].max()
-    df_final = df[df['Time'] == final_time]
-    
-    fig = go.Figure()
-    for _, row in df_final.iterrows():
-        fig.add_trace(go.Scatter(
-            x=[row['x']],
-            y=[row["Flow Rate (Q)"]],
-            mode='markers',
-            name=f'Node {row["Node"]} Q'
-        ))
-    
-    fig.update_layout(
-        title=f"Flow Rate at Final Time Step (t = {final_time:.2f} s)",
-        xaxis_title="Distance (m)",
-        yaxis_title="Flow Rate (Q) [m³/s]",
-        showlegend=True
-    )
-    return fig
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n) if max_points >= n else np.linspace(0, n - 1, max(max_points, 1)).astype(int)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    picked = np.empty(max_points, dtype=int)
+    picked[0] = 0
+    picked[-1] = n - 1
+    a = 0
+    for k in range(max_points - 2):
+        lo, hi = edges[k], edges[k + 1]
+        nxt_lo, nxt_hi = hi, edges[k + 2] if k + 2 < len(edges) else n
+        x_next = x[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else x[-1]
+        y_next = y[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else y[-1]
+        xs, ys = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - x_next) * (ys - y[a]) - (x[a] - xs) * (y_next - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[k + 1] = a
+    return picked
 
-def plot_hydraulic_head(df: pd.DataFrame) -> go.Figure:
+def _final_profile(df: pd.DataFrame, column: str) -> Tuple[float, np.ndarray, np.ndarray]:
     """
-    Plots the hydraulic head over space for each node at the final time step.
+    Final time and the (x, value) profile of one column at that time, sorted by x.
     """
-    # Extract the final time step
     final_time = df['Time'].max()
-    df_final = df[df['Time'] == final_time]
-    
+    mask = (df['Time'] == final_time).to_numpy()
+    x = df['x'].to_numpy()[mask]
+    y = df[column].to_numpy()[mask] if column in df.columns else np.empty(0)
+    order = np.argsort(x, kind="stable")
+    return final_time, x[order], y[order] if len(y) else y
+
+def _profile_figure(x: np.ndarray, y: np.ndarray, name: str, title: str, y_title: str,
+                    max_points: int) -> go.Figure:
+    """
+    One line trace of a spatial profile, downsampled to max_points with LTTB.
+    """
     fig = go.Figure()
-    for _, row in df_final.iterrows():
-        fig.add_trace(go.Scatter(
-            x=[row['x']],
-            y=[row["Depth (h)"]],
-            mode='markers',
-            name=f'Node {row["Node"]} h'
-        ))
-    
+    if len(y):
+        keep = lttb(x, y, max_points)
+        fig.add_trace(go.Scattergl(x=x[keep], y=y[keep], mode='lines', name=name))
     fig.update_layout(
-        title=f"Hydraulic Head at Final Time Step (t = {final_time:.2f} s)",
+        title=title,
         xaxis_title="Distance (m)",
-        yaxis_title="Hydraulic Head (h) [m]",
+        yaxis_title=y_title,
         showlegend=True
     )
     return fig
 
-def plot_cross_sectional_area(df: pd.DataFrame) -> go.Figure:
+def plot_flow_rate(df: pd.DataFrame, max_points: int = MAX_POINTS) -> go.Figure:
     """
-    Plots the cross-sectional area over space for each node at the final time step.
+    Plots the flow rate over space at the final time step.
     """
-    # Extract the final time step
-    final_time = df['Time'].max()
-    df_final = df[df['Time'] == final_time]
-    
-    fig = go.Figure()
-    for _, row in df_final.iterrows():
-        fig.add_trace(go.Scatter(
-            x=[row['x']],
-            y=[row["Area (A)"]],
-            mode='markers',
-            name=f'Node {row["Node"]} A'
-        ))
-    
+    final_time, x, y = _final_profile(df, "Flow Rate (Q)")
+    return _profile_figure(x, y, "Q", f"Flow Rate at Final Time Step (t = {final_time:.2f} s)",
+                           "Flow Rate (Q) [m³/s]", max_points)
+
+def plot_hydraulic_head(df: pd.DataFrame, max_points: int = MAX_POINTS) -> go.Figure:
+    """
+    Plots the hydraulic head over space at the final time step.
+    """
+    final_time, x, y = _final_profile(df, "Depth (h)")
+    return _profile_figure(x, y, "h", f"Hydraulic Head at Final Time Step (t = {final_time:.2f} s)",
+                           "Hydraulic Head (h) [m]", max_points)
+
+def plot_cross_sectional_area(df: pd.DataFrame, max_points: int = MAX_POINTS) -> go.Figure:
+    """
+    Plots the cross-sectional area over space at the final time step.
+    """
+    final_time, x, y = _final_profile(df, "Area (A)")
+    return _profile_figure(x, y, "A", f"Cross-Sectional Area at Final Time Step (t = {final_time:.2f} s)",
+                           "Cross-Sectional Area (A) [m²]", max_points)
+
+def plot_free_surface_width(df: pd.DataFrame, max_points: int = MAX_POINTS) -> go.Figure:
+    """
+    Plots the free surface width B for pressurized pipes at the final time step.
+    (Assuming 'B' is included in the DataFrame; the figure is empty otherwise)
+    """
+    final_time, x, y = _final_profile(df, "B")
+    return _profile_figure(x, y, "B", f"Free Surface Width (B) at Final Time Step (t = {final_time:.2f} s)",
+                           "Free Surface Width (B) [m]", max_points)
+
+def plot_profile(x: np.ndarray, values: np.ndarray, variable: str = "h", t: float = None,
+                 max_points: int = MAX_POINTS) -> go.Figure:
+    """
+    Plots one spatial profile given as arrays, e.g. the live state of a running job.
+    """
+    _, _, label = VARIABLES[variable]
+    title = f"{label} at t = {t:.2f} s" if t is not None else label
+    return _profile_figure(np.asarray(x), np.asarray(values), variable, title, label, max_points)
+
+def _decimate(count: int, max_count: int) -> np.ndarray:
+    """
+    Evenly spaced indices of at most max_count out of count, always keeping the first and last.
+    """
+    if count <= max_count:
+        return np.arange(count)
+    return np.unique(np.linspace(0, count - 1, max_count).round().astype(int))
+
+def _space_time_arrays(results, variable: str):
+    """
+    Time, x and the (snapshot, cell) array of a variable from SimulationResults or a results DataFrame.
+    """
+    if variable not in VARIABLES:
+        raise ValueError(f"Unknown variable {variable!r}; expected one of {tuple(VARIABLES)}.")
+    attribute, column, _ = VARIABLES[variable]
+    if isinstance(results, pd.DataFrame):
+        table = results.pivot_table(index="Time", columns="x", values=column, sort=True)
+        return table.index.to_numpy(), table.columns.to_numpy(), table.to_numpy()
+    return results.time, results.x, getattr(results, attribute)
+
+def plot_space_time(results, variable: str = "h", max_times: int = 400, max_cells: int = 400) -> go.Figure:
+    """
+    Space-time heatmap of one variable.
+
+    Accepts SimulationResults (or anything with time, x, h, Q and A arrays,
+    e.g. ChunkedResults.read()) or a results DataFrame. Rows and columns are
+    decimated on the server so at most max_times x max_cells values are sent.
+    """
+    time, x, values = _space_time_arrays(results, variable)
+    rows = _decimate(len(time), max_times)
+    cols = _decimate(len(x), max_cells)
+    _, _, label = VARIABLES[variable]
+    fig = go.Figure(go.Heatmap(x=x[cols], y=time[rows], z=values[np.ix_(rows, cols)],
+                               colorbar=dict(title=label)))
     fig.update_layout(
-        title=f"Cross-Sectional Area at Final Time Step (t = {final_time:.2f} s)",
+        title=f"{label} over Space and Time",
         xaxis_title="Distance (m)",
-        yaxis_title="Cross-Sectional Area (A) [m²]",
-        showlegend=True
+        yaxis_title="Time (s)"
     )
     return fig
 
-def plot_free_surface_width(df: pd.DataFrame) -> go.Figure:
+def plot_animation(results, variable: str = "h", max_frames: int = 100, max_points: int = MAX_POINTS) -> go.Figure:
     """
-    Plots the free surface width B for pressurized pipes at the final time step.
-    (Assuming 'B' is included in the DataFrame)
+    Animated spatial profile of one variable over time.
+
+    Only max_frames evenly spaced snapshots are sent as frames, each decimated
+    to max_points cells on a common set of positions.
     """
-    # Extract the final time step
-    final_time = df['Time'].max()
-    df_final = df[df['Time'] == final_time]
-    
-    fig = go.Figure()
-    for _, row in df_final.iterrows():
-        if 'B' in row:
-            fig.add_trace(go.Scatter(
-                x=[row['x']],
-                y=[row["B"]],
-                mode='markers',
-                name=f'Node {row["Node"]} B'
-            ))
-    
+    time, x, values = _space_time_arrays(results, variable)
+    rows = _decimate(len(time), max_frames)
+    cols = _decimate(len(x), max_points)
+    _, _, label = VARIABLES[variable]
+    x_plot = x[cols]
+    y_range = [float(np.nanmin(values[rows][:, cols])), float(np.nanmax(values[rows][:, cols]))] if len(rows) else None
+
+    frames = [go.Frame(data=[go.Scatter(x=x_plot, y=values[k, cols], mode='lines')], name=f"{time[k]:.2f}")
+              for k in rows]
+    fig = go.Figure(data=frames[0].data if frames else [], frames=frames)
     fig.update_layout(
-        title=f"Free Surface Width (B) at Final Time Step (t = {final_time:.2f} s)",
+        title=f"{label} over Time",
         xaxis_title="Distance (m)",
-        yaxis_title="Free Surface Width (B) [m]",
-        showlegend=True
+        yaxis_title=label,
+        yaxis_range=y_range,
+        updatemenus=[dict(type="buttons", showactive=False, buttons=[
+            dict(label="Play", method="animate",
+                 args=[None, dict(frame=dict(duration=50, redraw=False), fromcurrent=True)]),
+            dict(label="Pause", method="animate",
+                 args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")]),
+        ])],
+        sliders=[dict(currentvalue=dict(prefix="t = ", suffix=" s"), steps=[
+            dict(label=frame.name, method="animate",
+                 args=[[frame.name], dict(frame=dict(duration=0, redraw=False), mode="immediate")])
+            for frame in frames
+        ])]
     )
     return fig
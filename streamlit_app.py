@@ -1,25 +1,42 @@
 # streamlit_app.py
 
 import streamlit as st
-import numpy as np
-import pandas as pd
-from src.constants import G
-from src.models import OpenChannel, PressurizedPipe, Node
 from src.solver import HydraulicSystem
+from src.cache import ResultCache
+from src.jobs import JobManager, SimulationJob, DONE, CANCELLED
 from src.utilities import (
-    validate_parameters, initialize_nodes, add_connection,
-    compute_free_surface_width, check_cfl_condition
+    validate_parameters, initialize_nodes, slot_celerity_for_time_step
 )
 from src.visualization import (
     plot_flow_rate, plot_hydraulic_head,
-    plot_cross_sectional_area, plot_free_surface_width
+    plot_cross_sectional_area,
+    plot_space_time, plot_animation, plot_profile
 )
+import os
+import time
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+POLL_SECONDS = 0.5  # UI refresh interval while a run is in progress
+CACHE_DIR = os.environ.get("HYDRAULIC_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "results"))
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """
+    One result cache per server process, shared by all sessions.
+    """
+    return ResultCache(CACHE_DIR)
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """
+    One pool of simulation workers per server process, so users do not block each other.
+    """
+    return JobManager(max_workers=int(os.environ.get("HYDRAULIC_WORKERS", "4")), cache=get_result_cache())
+
 def main():
     st.title("Hydraulic System Simulation ICM 1D")
 
@@ -32,10 +49,18 @@ def main():
     CFL = st.sidebar.slider("CFL Number", 0.1, 1.0, 0.9, step=0.1)
 
     st.sidebar.header("Channel Geometry")
-    channel_type = st.sidebar.selectbox("Select Channel Type", ["OpenChannel"])  # Solver implemented for OpenChannel
+    channel_type = st.sidebar.selectbox("Select Channel Type", ["OpenChannel", "PressurizedPipe"])
 
     # Set initial parameters
-    b = st.sidebar.number_input("Channel Width (b) [m]", min_value=0.1, max_value=100.0, value=5.0, step=0.1)
+    Af = Cp = slot_celerity = None
+    if channel_type == "PressurizedPipe":
+        b = None
+        Af = st.sidebar.number_input("Full Pipe Area (Af) [m²]", min_value=0.01, max_value=100.0, value=5.0, step=0.1)
+        Cp = st.sidebar.number_input("Pressure Wave Speed (Cp) [m/s]", min_value=1.0, max_value=2000.0, value=1000.0, step=10.0)
+        target_dt = st.sidebar.number_input("Target Time Step While Surcharged [s]", min_value=0.001, max_value=100.0,
+                                            value=1.0, step=0.1)
+    else:
+        b = st.sidebar.number_input("Channel Width (b) [m]", min_value=0.1, max_value=100.0, value=5.0, step=0.1)
     S0 = st.sidebar.number_input("Bed Slope (S0)", min_value=0.0, max_value=0.1, value=0.001, step=0.0001)
     n_manning = st.sidebar.number_input("Manning's Roughness Coefficient (n)", min_value=0.01, max_value=0.1, value=0.03, step=0.001)
 
@@ -55,6 +80,8 @@ def main():
         "total_time": total_time,
         "CFL": CFL,
         "b": b,
+        "Af": Af,
+        "Cp": Cp,
         "S0": S0,
         "n": n_manning,
         "h_in": h_in,
@@ -69,6 +96,14 @@ def main():
         st.error(f"Invalid input parameters: {error_msg}")
         st.stop()
 
+    if channel_type == "PressurizedPipe":
+        # Widen the Preissmann slot so surcharged pipes keep the target time step
+        try:
+            slot_celerity = min(Cp, slot_celerity_for_time_step(delta_x, target_dt, CFL, velocity=max(u_in, u0)))
+        except ValueError as e:
+            st.error(f"Invalid input parameters: {e}")
+            st.stop()
+
     # Initialize nodes with the proper geometry type
     nodes = initialize_nodes(
         int(num_nodes),
@@ -77,7 +112,9 @@ def main():
         u0=u0,
         b=b,
         S0=S0,
-        n=n_manning
+        n=n_manning,
+        Af=Af,
+        Cp=Cp
     )
 
     # Create HydraulicSystem instance
@@ -88,66 +125,102 @@ def main():
         CFL=CFL,
         h_in=h_in,
         u_in=u_in,
-        h_out=h_out
+        h_out=h_out,
+        slot_celerity=slot_celerity
     )
 
     # Check CFL condition and notify the user if violated
     cfl_condition_met = True
     if channel_type == "OpenChannel":
-        # Estimate maximum wave speed
-        max_velocity = max((node.flow.Q / node.flow.A) if node.flow.A > 0 else 0.0 for node in nodes.values())
-        max_depth = max(node.flow.h for node in nodes.values())
-        c = np.sqrt(G * max_depth)
-        max_wave_speed = max_velocity + c
         cfl = CFL  # Since CFL = max_speed * dt / dx = 0.9, and dt is dynamically set
         if cfl >= 1:
             cfl_condition_met = False
             st.error(f"CFL condition not satisfied (CFL={cfl:.2f}). Adjust Δx or CFL number.")
     elif channel_type == "PressurizedPipe":
-        # Add CFL condition check for PressurizedPipe if implemented
-        pass  # Currently only handling OpenChannel
+        # The solver sizes dt from the slot wave speed, so only the CFL number itself can be wrong
+        if CFL >= 1:
+            cfl_condition_met = False
+            st.error(f"CFL condition not satisfied (CFL={CFL:.2f}). Adjust Δx or CFL number.")
+        elif slot_celerity < Cp:
+            st.info(f"Surcharged pipes run with a slot wave speed of {slot_celerity:.1f} m/s instead of "
+                    f"Cp = {Cp:.0f} m/s, for a time step of about {target_dt:g} s.")
 
     # Disable simulation button if conditions are not met
+    job = None
     if not cfl_condition_met:
         st.error("Simulation cannot proceed due to unsatisfied CFL condition.")
     else:
+        manager = get_job_manager()
         if st.button("Run Simulation"):
-            # Run simulation
-            try:
-                # Run simulation using the updated solver
-                results, x = system.run_simulation()
-
-                # Convert results to DataFrame
-                df_results = pd.DataFrame(results)
-                st.success("Simulation completed successfully!")
-                st.dataframe(df_results)
-
-                # Visualization
-                st.subheader("Flow Rate Over Distance")
-                flow_fig = plot_flow_rate(df_results)
-                st.plotly_chart(flow_fig)
-
-                st.subheader("Depth Over Distance")
-                depth_fig = plot_hydraulic_head(df_results)
-                st.plotly_chart(depth_fig)
-
-                st.subheader("Cross-Sectional Area Over Distance")
-                area_fig = plot_cross_sectional_area(df_results)
-                st.plotly_chart(area_fig)
-
-                # If using free surface width for PressurizedPipe
-                if channel_type == "PressurizedPipe":
-                    st.subheader("Free Surface Width Over Distance")
-                    # Assuming 'B' is part of the Node flow attributes
-                    # Add 'B' to results in run_simulation if not already present
-                    # Here, it's not included, so you might need to adjust your solver
-                    pass
-
-            except Exception as e:
-                st.error(f"An error occurred during simulation: {e}")
+            # Submit the run to the background workers; identical previous runs come from the cache
+            previous = st.session_state.get("job_id")
+            if previous is not None:
+                manager.forget(previous)
+            st.session_state["job_id"] = manager.submit(system).id
+
+        job_id = st.session_state.get("job_id")
+        job = manager.get(job_id) if job_id is not None else None
+        if job is not None:
+            show_job(job, manager, channel_type)
 
     st.sidebar.markdown("---")
     st.sidebar.markdown("Developed by Third Wish Group")
 
+    # Poll a running job by re-running the script
+    if job is not None and not job.finished:
+        time.sleep(POLL_SECONDS)
+        st.rerun()
+
+def show_job(job: SimulationJob, manager: JobManager, channel_type: str) -> None:
+    """
+    Shows the progress of a running job, or its results once it has finished.
+    """
+    progress = job.progress()
+    if not job.finished:
+        st.progress(progress.fraction, text=(
+            f"t = {progress.t:.1f} / {progress.total_time:.1f} s · "
+            f"{progress.steps_per_second:,.0f} steps/s · {progress.sim_seconds_per_second:.2f} simulated s/s"))
+        if st.button("Cancel"):
+            manager.cancel(job.id)
+        if progress.profile is not None:
+            st.plotly_chart(plot_profile(job.x, progress.profile[:, 0], "h", progress.profile_time))
+    elif job.status == DONE:
+        st.success(f"Simulation completed successfully! ({progress.steps} steps)")
+        show_results(job.results, channel_type)
+    elif job.status == CANCELLED:
+        st.warning(f"Simulation cancelled at t = {progress.t:.2f} s.")
+        if job.results is not None and len(job.results) > 0:
+            show_results(job.results, channel_type)
+    else:
+        st.error(f"An error occurred during simulation: {job.error}")
+
+def show_results(results, channel_type: str) -> None:
+    # Convert results to DataFrame
+    df_results = results.to_dataframe()
+    st.dataframe(df_results)
+
+    # Visualization
+    st.subheader("Flow Rate Over Distance")
+    flow_fig = plot_flow_rate(df_results)
+    st.plotly_chart(flow_fig)
+
+    st.subheader("Depth Over Distance")
+    depth_fig = plot_hydraulic_head(df_results)
+    st.plotly_chart(depth_fig)
+
+    st.subheader("Cross-Sectional Area Over Distance")
+    area_fig = plot_cross_sectional_area(df_results)
+    st.plotly_chart(area_fig)
+
+    st.subheader("Depth over Space and Time")
+    st.plotly_chart(plot_space_time(results, "h"))
+
+    st.subheader("Depth Animation")
+    st.plotly_chart(plot_animation(results, "h"))
+
+    # Pipes record the piezometric head, which rises above the crown while surcharged
+    if channel_type == "PressurizedPipe":
+        st.caption("In pipes, h is the piezometric head above the invert.")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,43 @@
+# tests/test_backends.py
+
+import unittest
+from unittest import mock
+import numpy as np
+from src import solver
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def make_system(backend, output=None):
+    nodes = initialize_nodes(50, h0=1.5, u0=0.5)
+    return HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=40.0, CFL=0.9,
+                           h_in=2.0, u_in=2.0, h_out=1.5, output=output, backend=backend)
+
+
+class TestBackends(unittest.TestCase):
+    def test_rejects_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            make_system("fortran")
+
+    @unittest.skipUnless(solver.JIT_AVAILABLE, "numba not installed")
+    def test_jit_matches_numpy(self):
+        for output in (None, OutputSchedule.at_interval(10.0), OutputSchedule.every(7)):
+            expected, _ = make_system("numpy", output).run_simulation()
+            results, _ = make_system("jit", output).run_simulation()
+            np.testing.assert_allclose(results.time, expected.time, rtol=1e-12)
+            np.testing.assert_allclose(results.h, expected.h, rtol=1e-12)
+            np.testing.assert_allclose(results.Q, expected.Q, rtol=1e-10, atol=1e-12)
+
+    def test_falls_back_without_jit(self):
+        with mock.patch.object(solver, "JIT_AVAILABLE", False):
+            system = make_system("jit", OutputSchedule.final())
+            self.assertEqual(system.active_backend, "numpy")
+            with self.assertLogs(solver.logger, level="WARNING"):
+                results, _ = system.run_simulation()
+        expected, _ = make_system("numpy", OutputSchedule.final()).run_simulation()
+        np.testing.assert_array_equal(results.h, expected.h)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_benchmark.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from dataclasses import replace
+from unittest import mock
+from src.benchmark import (
+    BenchmarkResult, benchmark_case, compare, format_table, load_baseline, machine_tag, run_suite, save_baseline
+)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_suite_reports_rates(self):
+        results = run_suite(cells=[50], durations=[2.0], targets=["system", "apply_fvm"],
+                            backends=["numpy"], repeat=1)
+        self.assertEqual([(r.target, r.backend) for r in results], [("system", "numpy"), ("apply_fvm", "numpy")])
+        for row in results:
+            self.assertGreater(row.steps, 0)
+            self.assertAlmostEqual(row.cell_updates_per_second, row.steps_per_second * 50)
+            self.assertGreater(row.peak_memory_bytes, 0)
+        # Both targets run the same first-order scheme
+        self.assertEqual(results[0].steps, results[1].steps)
+
+    def test_baseline_round_trip_and_compare(self):
+        row = benchmark_case("system", 20, 1.0, repeat=1, measure_memory=False)
+        self.assertIsNone(row.peak_memory_bytes)
+        with tempfile.TemporaryDirectory() as directory:
+            path = save_baseline([row], directory)
+            self.assertEqual(os.path.basename(path), f"{machine_tag()}.json")
+            self.assertEqual(load_baseline(path), [row])
+
+        slower = replace(row, cell_updates_per_second=row.cell_updates_per_second * 0.5)
+        [verdict] = compare([slower], [row], tolerance=0.2)
+        self.assertTrue(verdict["regression"])
+        self.assertAlmostEqual(verdict["ratio"], 0.5)
+        self.assertFalse(compare([row], [row])[0]["regression"])
+        other = replace(row, num_cells=40)
+        self.assertEqual(compare([other], [row]), [])
+
+    def test_scheme_and_subdomain_variants(self):
+        results = run_suite(cells=[40], durations=[60.0], targets=["system"],
+                            backends=["numpy", "preissmann", "subdomains"], repeat=1, measure_memory=False)
+        self.assertEqual([r.backend for r in results], ["numpy", "preissmann", "subdomains"])
+        for row in results:
+            self.assertIsNone(row.failed)
+            self.assertGreater(row.steps, 0)
+        # The subdomain engine runs the same explicit scheme; Preissmann takes fixed 30 s steps
+        self.assertEqual(results[2].steps, results[0].steps)
+        self.assertEqual(results[1].steps, 2)
+
+    def test_blown_up_run_is_not_a_baseline(self):
+        def prepare(num_cells, total_time, backend):
+            return lambda: (1, np.full((num_cells, 2), np.nan))
+
+        with mock.patch.dict("src.benchmark._PREPARE", {"system": prepare}):
+            [failed] = run_suite(cells=[20], durations=[1.0], targets=["system"], backends=["numpy"])
+        self.assertIn("non-finite", failed.failed)
+        self.assertIsNone(failed.peak_memory_bytes)
+        self.assertIn("FAILED", format_table([failed]))
+
+        row = benchmark_case("system", 20, 1.0, repeat=1, measure_memory=False)
+        self.assertIsNone(row.failed)
+        self.assertEqual(compare([failed], [row]), [])
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(load_baseline(save_baseline([row, failed], directory)), [row])
+
+    def test_unknown_target(self):
+        with self.assertRaises(ValueError):
+            run_suite(targets=["fortran"])
+        with self.assertRaises(ValueError):
+            run_suite(backends=["fortran"])
+
+
+if __name__ == '__main__':
+    unittest.main()
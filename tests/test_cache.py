@@ -0,0 +1,69 @@
+# tests/test_cache.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from src.cache import ResultCache, cache_key, run_cached
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def make_system(h_in=2.5, **options):
+    nodes = initialize_nodes(20, h0=1.5, u0=0.5)
+    return HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=5.0, CFL=0.9, h_in=h_in, u_in=1.0,
+                           h_out=1.5, output=OutputSchedule.at_interval(1.0), **options)
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_is_stable_and_input_sensitive(self):
+        self.assertEqual(cache_key(make_system()), cache_key(make_system()))
+        self.assertEqual(cache_key(make_system()), cache_key(make_system(subdomains=2)))
+        self.assertNotEqual(cache_key(make_system()), cache_key(make_system(h_in=2.6)))
+        self.assertNotEqual(cache_key(make_system()), cache_key(make_system(friction="implicit")))
+        system = make_system()
+        system.nodes[3].flow.n = 0.05
+        self.assertNotEqual(cache_key(system), cache_key(make_system()))
+
+    def test_memory_and_disk_tiers(self):
+        cache = ResultCache(self.directory)
+        expected, _ = run_cached(make_system(), cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        again, _ = run_cached(make_system(), cache)
+        self.assertIs(again, expected)
+
+        fresh = ResultCache(self.directory)
+        loaded, x = run_cached(make_system(), fresh)
+        self.assertEqual(fresh.hits, 1)
+        np.testing.assert_array_equal(loaded.h, expected.h)
+        np.testing.assert_array_equal(x, expected.x)
+
+    def test_concurrent_puts_of_one_key(self):
+        # Sessions share one cache; identical jobs may finish together
+        cache = ResultCache(self.directory)
+        results, _ = make_system().run_simulation(write_back=False)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for future in [pool.submit(cache.put, "same", results) for _ in range(64)]:
+                future.result()
+        self.assertEqual(os.listdir(self.directory), ["same.npz"])
+        np.testing.assert_array_equal(ResultCache(self.directory).get("same").h, results.h)
+
+    def test_size_based_eviction(self):
+        cache = ResultCache(self.directory, memory_items=1, disk_bytes=1)
+        run_cached(make_system(h_in=2.0), cache)
+        run_cached(make_system(h_in=2.2), cache)
+        self.assertLessEqual(len(os.listdir(self.directory)), 1)
+        self.assertEqual(len(cache._memory), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
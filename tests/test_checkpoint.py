@@ -0,0 +1,89 @@
+# tests/test_checkpoint.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.checkpoint import CheckpointWriter, load_checkpoint
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+class Preempted(Exception):
+    pass
+
+
+class PreemptingWriter(CheckpointWriter):
+    """
+    Kills the run right after its third checkpoint has been queued.
+
+    Waits for the previous write so no checkpoint is skipped on a slow disk.
+    """
+
+    def maybe_write(self, system, state, t, n):
+        if self._pending is not None:
+            self._pending.result()
+        written = super().maybe_write(system, state, t, n)
+        if self.written == 3:
+            raise Preempted()
+        return written
+
+
+def make_system(**options):
+    nodes = initialize_nodes(40, h0=1.5, u0=0.5, S0=0.0005)
+    return HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=60.0, CFL=0.9, h_in=2.5, u_in=1.5,
+                           h_out=1.2, output=OutputSchedule.at_interval(5.0), **options)
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.ckpt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def resume_matches_uninterrupted(self, **options):
+        expected, _ = make_system(**options).run_simulation()
+
+        with self.assertRaises(Preempted):
+            make_system(checkpoint=PreemptingWriter(self.path, every_steps=7), **options).run_simulation()
+        checkpoint = load_checkpoint(self.path)
+        self.assertEqual(checkpoint.n_steps, 21)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+        resumed_system = make_system(**options)
+        results, x = resumed_system.run_simulation(resume_from=self.path)
+        self.assertGreater(results.time[0], checkpoint.t)
+        k = len(expected) - len(results)
+        np.testing.assert_array_equal(results.time, expected.time[k:])
+        np.testing.assert_array_equal(results.h, expected.h[k:])
+        np.testing.assert_array_equal(results.Q, expected.Q[k:])
+
+    def test_resume_is_bit_for_bit(self):
+        self.resume_matches_uninterrupted()
+
+    def test_resume_second_order(self):
+        self.resume_matches_uninterrupted(reconstruction="muscl", time_integration="ssp_rk2")
+
+    def test_checkpoint_holds_boundaries_and_geometry(self):
+        writer = CheckpointWriter(self.path, every_steps=5)
+        system = make_system(checkpoint=writer)
+        system.run_simulation()
+        self.assertGreater(writer.written, 0)
+        checkpoint = load_checkpoint(self.path)
+        self.assertEqual((checkpoint.h_in, checkpoint.u_in, checkpoint.h_out), (2.5, 1.5, 1.2))
+        np.testing.assert_array_equal(checkpoint.S0, 0.0005)
+        self.assertEqual(checkpoint.node_ids, list(range(40)))
+
+    def test_resume_rejects_other_grid(self):
+        make_system(checkpoint=CheckpointWriter(self.path, every_steps=5)).run_simulation()
+        system = HydraulicSystem(initialize_nodes(10), delta_x=10.0, total_time=60.0, CFL=0.9,
+                                 h_in=2.0, u_in=1.0, h_out=2.0)
+        with self.assertRaises(ValueError):
+            system.run_simulation(resume_from=self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
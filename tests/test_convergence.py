@@ -0,0 +1,50 @@
+# tests/test_convergence.py
+
+import unittest
+import numpy as np
+from src.convergence import SteadyStateMonitor
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def make_system(monitor, **options):
+    nodes = initialize_nodes(50, h0=2.0, u0=1.0, S0=-0.0005, n=0.03)
+    return HydraulicSystem(nodes=nodes, delta_x=20.0, total_time=20000.0, CFL=0.9, h_in=2.0, u_in=1.0,
+                           h_out=2.0, output=OutputSchedule.at_interval(600.0), steady_state=monitor, **options)
+
+
+class TestSteadyStateMonitor(unittest.TestCase):
+    def test_window_must_be_consecutive(self):
+        monitor = SteadyStateMonitor(tol=1e-3, window=3, norm="l2")
+        U = np.ones((4, 2))
+        self.assertFalse(monitor.update(1.0, 1.0, U, U))
+        self.assertFalse(monitor.update(2.0, 1.0, U, U))
+        self.assertFalse(monitor.update(3.0, 1.0, U, U + 1.0))
+        for t in (4.0, 5.0):
+            self.assertFalse(monitor.update(t, 1.0, U, U))
+        self.assertTrue(monitor.update(6.0, 1.0, U, U))
+        self.assertEqual(monitor.converged_time, 6.0)
+        np.testing.assert_array_equal(monitor.history["Linf (h)"], [0, 0, 1, 0, 0, 0])
+
+    def test_run_stops_early_and_reports_history(self):
+        monitor = SteadyStateMonitor(tol=1e-6, window=20)
+        system = make_system(monitor)
+        results, x = system.run_simulation()
+        self.assertTrue(monitor.converged)
+        self.assertLess(results.time[-1], system.total_time / 2)
+        self.assertEqual(results.time[-1], monitor.converged_time)
+        history = monitor.history
+        self.assertEqual(len(history["Time"]), len(history["L2 (hu)"]))
+        self.assertLess(history["Linf (h)"][-1], 1e-6)
+        self.assertGreater(history["Linf (h)"].max(), 1e-6)
+
+    def test_works_with_jit_backend_and_sparse_checks(self):
+        monitor = SteadyStateMonitor(tol=1e-6, window=3, check_every=10)
+        results, x = make_system(monitor, backend="jit").run_simulation()
+        self.assertTrue(monitor.converged)
+        self.assertLess(results.time[-1], 20000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_decomposition.py
+
+import multiprocessing as mp
+import unittest
+import numpy as np
+from src.decomposition import SubdomainPool, split_cells, scaling_benchmark
+from src.state import ChannelState
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def run(subdomains, **options):
+    nodes = initialize_nodes(90, h0=1.5, u0=0.5, S0=0.0005)
+    system = HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=40.0, CFL=0.9, h_in=2.5, u_in=1.5,
+                             h_out=1.2, output=OutputSchedule.at_interval(10.0), subdomains=subdomains, **options)
+    results, x = system.run_simulation()
+    return results
+
+
+class TestDomainDecomposition(unittest.TestCase):
+    def test_split_cells(self):
+        self.assertEqual(split_cells(10, 3), [(0, 3), (3, 7), (7, 10)])
+        with self.assertRaises(ValueError):
+            split_cells(3, 2, min_cells=2)
+
+    def test_first_order_identical_to_serial(self):
+        serial = run(1)
+        parallel = run(3)
+        np.testing.assert_array_equal(parallel.time, serial.time)
+        np.testing.assert_array_equal(parallel.h, serial.h)
+        np.testing.assert_array_equal(parallel.Q, serial.Q)
+
+    def test_second_order_identical_to_serial(self):
+        options = dict(reconstruction="muscl", limiter="van_leer", time_integration="ssp_rk3", friction="implicit")
+        serial = run(1, **options)
+        parallel = run(4, **options)
+        np.testing.assert_array_equal(parallel.h, serial.h)
+        np.testing.assert_array_equal(parallel.Q, serial.Q)
+
+    def test_step_based_output(self):
+        serial = HydraulicSystem(initialize_nodes(20), delta_x=10.0, total_time=5.0, CFL=0.9, h_in=2.5, u_in=1.0,
+                                 h_out=2.0, output=OutputSchedule.every(3))
+        parallel = HydraulicSystem(initialize_nodes(20), delta_x=10.0, total_time=5.0, CFL=0.9, h_in=2.5, u_in=1.0,
+                                   h_out=2.0, output=OutputSchedule.every(3), subdomains=2)
+        expected, _ = serial.run_simulation()
+        results, _ = parallel.run_simulation()
+        np.testing.assert_array_equal(results.time, expected.time)
+        np.testing.assert_array_equal(results.h, expected.h)
+
+    def test_spawned_workers_match_serial(self):
+        system = HydraulicSystem(initialize_nodes(40, h0=1.5, u0=0.5), delta_x=10.0, total_time=5.0, CFL=0.9,
+                                 h_in=2.5, u_in=1.5, h_out=1.2, output=OutputSchedule.final())
+        expected, _ = system.run_simulation(write_back=False)
+        state = ChannelState.from_nodes(system.nodes)
+        with SubdomainPool(system, state, 2, context=mp.get_context("spawn")) as pool:
+            t, steps = pool.advance(state, 0.0, 5.0, 10 ** 9, 0)
+        self.assertEqual(t, 5.0)
+        np.testing.assert_array_equal(state.h, expected.h[-1])
+
+    def test_dead_worker_raises_instead_of_hanging(self):
+        system = HydraulicSystem(initialize_nodes(40), delta_x=10.0, total_time=5.0, CFL=0.9, h_in=2.5, u_in=1.0,
+                                 h_out=2.0)
+        state = ChannelState.from_nodes(system.nodes)
+        with SubdomainPool(system, state, 2, poll_interval=0.05) as pool:
+            pool._workers[1].kill()
+            pool._workers[1].join()
+            with self.assertRaises(RuntimeError):
+                pool.advance(state, 0.0, 5.0, 10 ** 9, 0)
+
+    def test_rejects_preissmann(self):
+        with self.assertRaises(ValueError):
+            HydraulicSystem(initialize_nodes(20), delta_x=10.0, total_time=5.0, CFL=0.9, h_in=2.0, u_in=1.0,
+                            h_out=2.0, scheme="preissmann", delta_t=10.0, subdomains=2)
+
+    def test_scaling_benchmark(self):
+        rows = scaling_benchmark(num_cells=2000, total_time=0.5, cores=[1, 2])
+        self.assertEqual([row["cores"] for row in rows], [1, 2])
+        self.assertAlmostEqual(rows[0]["speedup"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# tests/test_ensemble.py
+
+import unittest
+import numpy as np
+from src.ensemble import EnsembleSystem
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+class TestEnsembleSystem(unittest.TestCase):
+    def setUp(self):
+        self.h_in = np.array([1.5, 2.0, 2.5, 3.0])
+        self.n = np.array([0.02, 0.03, 0.04, 0.05])
+        self.output = OutputSchedule.at_interval(10.0)
+
+    def standalone(self, k):
+        nodes = initialize_nodes(30, n=self.n[k])
+        system = HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=30.0, CFL=0.9,
+                                 h_in=self.h_in[k], u_in=2.0, h_out=2.0, output=self.output)
+        results, x = system.run_simulation()
+        return results
+
+    def test_per_member_matches_standalone_runs(self):
+        ensemble = EnsembleSystem(initialize_nodes(30), delta_x=10.0, total_time=30.0, CFL=0.9,
+                                  h_in=self.h_in, u_in=2.0, h_out=2.0, n=self.n,
+                                  time_step="per_member", output=self.output)
+        results = ensemble.run()
+        self.assertEqual(results.h.shape, (3, 4, 30))
+        np.testing.assert_array_equal(results.time, [10.0, 20.0, 30.0])
+        for k in range(4):
+            expected = self.standalone(k)
+            np.testing.assert_allclose(results.h[:, k], expected.h, rtol=1e-12)
+            np.testing.assert_allclose(results.hu[:, k], expected.Q, rtol=1e-12, atol=1e-12)
+
+    def test_shared_time_step(self):
+        ensemble = EnsembleSystem(initialize_nodes(30), delta_x=10.0, total_time=30.0, CFL=0.9,
+                                  h_in=self.h_in, u_in=2.0, h_out=2.0, n=self.n)
+        results = ensemble.run()
+        self.assertEqual(len(set(results.steps)), 1)
+        np.testing.assert_array_equal(results.time, [30.0])
+        # A shared (smaller) time step stays close to the per-member solution
+        expected = self.standalone(0)
+        np.testing.assert_allclose(results.h[-1, 0], expected.h[-1], rtol=1e-2)
+
+    def test_per_cell_slope(self):
+        S0 = np.tile(np.linspace(0.0, 0.002, 30), (2, 1))
+        ensemble = EnsembleSystem(initialize_nodes(30), delta_x=10.0, total_time=5.0, CFL=0.9,
+                                  h_in=2.0, u_in=2.0, h_out=2.0, S0=S0)
+        self.assertEqual(ensemble.members, 2)
+        self.assertEqual(ensemble.run().h.shape, (1, 2, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
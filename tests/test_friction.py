@@ -0,0 +1,63 @@
+# tests/test_friction.py
+
+import unittest
+import warnings
+import numpy as np
+from src.numerics import apply_implicit_friction, compute_source_array
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def shallow_rough_run(friction):
+    # Thin sheet flow down a steep, rough reach (S0 < 0 is downhill in the solver's convention)
+    nodes = initialize_nodes(100, h0=0.02, u0=0.0, S0=-0.01, n=0.08)
+    system = HydraulicSystem(nodes=nodes, delta_x=2.0, total_time=100.0, CFL=0.9,
+                             h_in=0.02, u_in=1.0, h_out=0.02,
+                             output=OutputSchedule.at_interval(10.0), friction=friction)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        results, x = system.run_simulation()
+    return results
+
+
+class TestImplicitFriction(unittest.TestCase):
+    def test_exact_integrator(self):
+        U = np.array([[1.0, 2.0], [0.5, -1.0]])
+        n, dt = 0.03, 5.0
+        k = 9.81 * n ** 2 / U[:, 0] ** (7 / 3)
+        expected = U[:, 1] / (1 + k * np.abs(U[:, 1]) * dt)
+        np.testing.assert_allclose(apply_implicit_friction(U, n, dt)[:, 1], expected)
+        # Halving the step twice gives the same result as one full step
+        half = apply_implicit_friction(apply_implicit_friction(U, n, dt / 2), n, dt / 2)
+        np.testing.assert_allclose(half, apply_implicit_friction(U, n, dt))
+
+    def test_dry_cells(self):
+        U = np.array([[0.0, 1.0], [-1e-9, 0.0], [1.0, 1.0]])
+        out = apply_implicit_friction(U, 0.03, 1.0)
+        np.testing.assert_array_equal(out[:2], 0.0)
+        self.assertGreater(out[2, 1], 0.0)
+
+    def test_slope_only_source(self):
+        U = np.array([[2.0, 3.0]])
+        np.testing.assert_allclose(compute_source_array(U, 0.001, 0.03, friction=False), [[0.0, -9.81 * 2.0 * 0.001]])
+
+    def test_shallow_rough_reach_stable_at_cfl_09(self):
+        self.assertFalse(np.isfinite(shallow_rough_run("explicit").h).all())
+        results = shallow_rough_run("implicit")
+        self.assertTrue(np.isfinite(results.h).all())
+        self.assertTrue(np.all(results.h > 0.0))
+
+    def test_matches_explicit_in_deep_channel(self):
+        finals = []
+        for friction in ("explicit", "implicit"):
+            nodes = initialize_nodes(50, h0=2.0, u0=1.0)
+            system = HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=60.0, CFL=0.9, h_in=2.0, u_in=1.0,
+                                     h_out=2.0, output=OutputSchedule.final(), friction=friction)
+            results, x = system.run_simulation()
+            finals.append(results.Q[-1])
+        np.testing.assert_allclose(finals[1], finals[0], rtol=2e-2)
+
+
+if __name__ == '__main__':
+    unittest.main()
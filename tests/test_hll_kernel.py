@@ -0,0 +1,96 @@
+# tests/test_hll_kernel.py
+
+import unittest
+import numpy as np
+from src.models import OpenChannel
+from src.numerics import (
+    hll_flux, compute_flux, compute_source,
+    hll_flux_array, compute_flux_array, compute_source_array
+)
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def run_scalar_reference(system):
+    """
+    Interface-by-interface version of the solver loop, kept as the reference path.
+    """
+    num_cells = len(system.nodes)
+    dx = system.delta_x
+    U = np.zeros((num_cells, 2))
+    for i, node in enumerate(system.nodes.values()):
+        u = node.flow.Q / node.flow.A if node.flow.A > 0 else 0.0
+        U[i] = [node.flow.h, node.flow.h * u]
+
+    t = 0.0
+    while t < system.total_time:
+        U_old = U.copy()
+        U_ext = np.zeros((num_cells + 2, 2))
+        U_ext[1:-1] = U
+        U_ext[0] = [system.h_in, system.h_in * system.u_in]
+        U_ext[-1] = [system.h_out, U_ext[-2, 1]]
+
+        F = np.zeros((num_cells + 1, 2))
+        for i in range(num_cells + 1):
+            F[i] = hll_flux(U_ext[i], U_ext[i + 1])
+
+        u = U[:, 1] / U[:, 0]
+        max_speed = np.max(np.abs(u) + np.sqrt(9.81 * U[:, 0]))
+        dt = system.CFL * dx / max_speed
+        if t + dt > system.total_time:
+            dt = system.total_time - t
+
+        for i in range(num_cells):
+            flow = system.nodes[i].flow
+            S = compute_source(U_ext[i + 1], flow.S0, flow.n)
+            U[i] = U_old[i] - (dt / dx) * (F[i + 1] - F[i]) + dt * S
+        t += dt
+    return U
+
+
+class TestHLLKernel(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.U_left = np.column_stack([rng.uniform(0.0, 4.0, 200), rng.uniform(-20.0, 20.0, 200)])
+        self.U_right = np.column_stack([rng.uniform(0.0, 4.0, 200), rng.uniform(-20.0, 20.0, 200)])
+        # Include dry states on either side
+        self.U_left[:5] = 0.0
+        self.U_right[5:10] = 0.0
+
+    def test_flux_matches_scalar(self):
+        F = compute_flux_array(self.U_left)
+        for i in range(len(self.U_left)):
+            np.testing.assert_allclose(F[i], compute_flux(self.U_left[i]), rtol=1e-12)
+
+    def test_source_matches_scalar(self):
+        S = compute_source_array(self.U_left, 0.001, 0.03)
+        for i in range(len(self.U_left)):
+            np.testing.assert_allclose(S[i], compute_source(self.U_left[i], 0.001, 0.03), rtol=1e-12)
+
+    def test_hll_matches_scalar(self):
+        F = hll_flux_array(self.U_left, self.U_right)
+        for i in range(len(self.U_left)):
+            expected = hll_flux(self.U_left[i], self.U_right[i])
+            np.testing.assert_allclose(F[i], expected, rtol=1e-12, atol=1e-12)
+
+    def test_leading_axes_broadcast(self):
+        F = hll_flux_array(self.U_left.reshape(4, 50, 2), self.U_right.reshape(4, 50, 2))
+        np.testing.assert_array_equal(F.reshape(200, 2), hll_flux_array(self.U_left, self.U_right))
+
+
+class TestVectorizedSolver(unittest.TestCase):
+    def test_matches_scalar_path(self):
+        nodes = initialize_nodes(40, h0=1.5, u0=0.5, b=5.0, S0=0.001, n=0.03)
+        system = HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=20.0, CFL=0.9,
+                                 h_in=2.0, u_in=2.0, h_out=1.5)
+        expected = run_scalar_reference(system)
+
+        results, x = system.run_simulation()
+        h = np.array([node.flow.h for node in system.nodes.values()])
+        hu = np.array([node.flow.Q for node in system.nodes.values()])
+        np.testing.assert_allclose(h, expected[:, 0], rtol=1e-10)
+        np.testing.assert_allclose(hu, expected[:, 1], rtol=1e-10, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
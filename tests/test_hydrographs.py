@@ -0,0 +1,91 @@
+# tests/test_hydrographs.py
+
+import unittest
+import numpy as np
+from src.hydrographs import (
+    InterpolationTable, DischargeInflow, StageInflow, StageOutflow, RatingCurveOutflow
+)
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def make_system(num_cells=40, total_time=60.0, **options):
+    nodes = initialize_nodes(num_cells, h0=1.5, u0=0.5)
+    return HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=total_time, CFL=0.9, h_in=2.5, u_in=1.5,
+                           h_out=1.2, output=OutputSchedule.at_interval(10.0), **options)
+
+
+class TestInterpolationTable(unittest.TestCase):
+    def test_matches_interp_in_any_order(self):
+        rng = np.random.default_rng(0)
+        x = np.cumsum(rng.uniform(0.1, 2.0, 500))
+        y = np.sin(x)
+        table = InterpolationTable(x, y)
+        forward = np.linspace(x[0] - 5, x[-1] + 5, 3000)
+        for queries in (forward, rng.permutation(forward), forward[::-1]):
+            table.reset()
+            np.testing.assert_allclose([table(q) for q in queries], np.interp(queries, x, y), rtol=0, atol=1e-12)
+
+    def test_rejects_unsorted_positions(self):
+        with self.assertRaises(ValueError):
+            InterpolationTable([0.0, 2.0, 1.0], [1.0, 2.0, 3.0])
+
+
+class TestBoundaryHydrographs(unittest.TestCase):
+    def test_constant_series_reproduce_scalar_boundaries(self):
+        expected, _ = make_system().run_simulation()
+        times = [0.0, 1e4]
+        system = make_system(upstream=StageInflow(times, 2.5, velocity=1.5), downstream=StageOutflow(times, 1.2))
+        results, _ = system.run_simulation()
+        np.testing.assert_array_equal(results.h, expected.h)
+        np.testing.assert_array_equal(results.Q, expected.Q)
+
+    def test_discharge_hydrograph_drives_inflow(self):
+        times = np.linspace(0.0, 3600.0, 20001)
+        discharge = np.where(times < 100.0, 0.75, 3.0)
+        system = make_system(total_time=3600.0, upstream=DischargeInflow(times, discharge))
+        system.run_simulation()
+        # At steady state every face carries the imposed discharge
+        state = system.state
+        F = system._interface_fluxes(state.U, np.zeros((state.num_cells + 2, 2)))
+        self.assertEqual(F[0, 0], 3.0 / state.b[0])
+        np.testing.assert_allclose(F[:, 0] * state.b[0], 3.0, rtol=1e-3)
+
+    def test_reuse_without_discharge_inflow(self):
+        expected, _ = make_system().run_simulation(write_back=False)
+        system = make_system(upstream=DischargeInflow([0.0, 1e4], 3.0))
+        system.run_simulation(write_back=False)
+        # The scalar inflow takes over again once the hydrograph is removed
+        system.upstream = None
+        results, _ = system.run_simulation(write_back=False)
+        self.assertIsNone(system._inflow_mass_flux)
+        np.testing.assert_array_equal(results.h, expected.h)
+        np.testing.assert_array_equal(results.Q, expected.Q)
+
+    def test_rating_curve_sets_downstream_stage(self):
+        # Manning normal-depth rating of the 5 m wide channel
+        h = np.linspace(0.1, 5.0, 50)
+        Q = 5.0 * h / 0.03 * (5.0 * h / (5.0 + 2 * h)) ** (2 / 3) * np.sqrt(0.001)
+        system = make_system(total_time=1800.0, downstream=RatingCurveOutflow(h, Q))
+        system.run_simulation()
+        Q_last = system.state.hu[-1] * system.state.b[-1]
+        self.assertAlmostEqual(system.state.h[-1], np.interp(Q_last, Q, h), delta=0.05)
+
+    def test_preissmann_imposes_discharge_at_step_end(self):
+        times = [0.0, 60.0]
+        system = make_system(scheme="preissmann", delta_t=5.0,
+                             upstream=DischargeInflow(times, [1.0, 4.0]), downstream=StageOutflow(times, [1.2, 1.6]))
+        system.run_simulation()
+        self.assertAlmostEqual(system.state.hu[0], 4.0 / system.state.b[0])
+        self.assertAlmostEqual(system.state.h[-1], 1.6)
+
+    def test_backend_restrictions(self):
+        inflow = DischargeInflow([0.0, 1.0], [1.0, 1.0])
+        self.assertEqual(make_system(backend="jit", upstream=inflow).active_backend, "numpy")
+        with self.assertRaises(ValueError):
+            make_system(subdomains=2, upstream=inflow)
+
+
+if __name__ == '__main__':
+    unittest.main()
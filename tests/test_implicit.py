@@ -0,0 +1,66 @@
+# tests/test_implicit.py
+
+import unittest
+import numpy as np
+from src.implicit import preissmann_residual, preissmann_jacobian
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def run_preissmann(delta_t, total_time=3600.0, output=None):
+    nodes = initialize_nodes(50, h0=2.0, u0=1.0, S0=-0.0005, n=0.03)
+    system = HydraulicSystem(nodes=nodes, delta_x=20.0, total_time=total_time, CFL=0.9,
+                             h_in=2.0, u_in=1.0, h_out=2.0, output=output or OutputSchedule.final(),
+                             scheme="preissmann", delta_t=delta_t, theta=0.6)
+    results, x = system.run_simulation()
+    return results
+
+
+class TestPreissmann(unittest.TestCase):
+    def test_jacobian_matches_finite_differences(self):
+        rng = np.random.default_rng(1)
+        h = rng.uniform(1.0, 2.0, 6)
+        q = rng.uniform(-1.0, 3.0, 6)
+        h_old, q_old = h + 0.1, q - 0.2
+        S0, n = np.full(6, 0.001), np.full(6, 0.03)
+        args = (h_old, q_old, S0, n, 10.0, 30.0, 0.6, 2.0, 1.5)
+
+        ab = preissmann_jacobian(h, q, S0, n, 10.0, 30.0, 0.6)
+        dense = np.zeros((12, 12))
+        for col in range(12):
+            for row in range(max(0, col - 2), min(12, col + 3)):
+                dense[row, col] = ab[2 + row - col, col]
+
+        x = np.column_stack([h, q]).ravel()
+        eps = 1e-7
+        for col in range(12):
+            xp, xm = x.copy(), x.copy()
+            xp[col] += eps
+            xm[col] -= eps
+            fd = (preissmann_residual(xp[0::2], xp[1::2], *args) - preissmann_residual(xm[0::2], xm[1::2], *args)) / (2 * eps)
+            np.testing.assert_allclose(dense[:, col], fd, rtol=1e-5, atol=1e-6)
+
+    def test_large_steps_reach_steady_state(self):
+        results = run_preissmann(delta_t=600.0, total_time=6 * 3600.0)
+        self.assertTrue(np.isfinite(results.h).all())
+        np.testing.assert_allclose(results.Q[-1], 2.0, rtol=1e-4)
+        self.assertAlmostEqual(results.h[-1, -1], 2.0)
+
+    def test_step_size_convergence(self):
+        output = OutputSchedule.at_times([900.0])
+        coarse = run_preissmann(delta_t=60.0, total_time=900.0, output=output)
+        fine = run_preissmann(delta_t=5.0, total_time=900.0, output=output)
+        np.testing.assert_allclose(coarse.h[-1], fine.h[-1], rtol=1e-2)
+
+    def test_requires_delta_t(self):
+        with self.assertRaises(ValueError):
+            HydraulicSystem(nodes=initialize_nodes(4), delta_x=1.0, total_time=1.0, CFL=0.9,
+                            h_in=2.0, u_in=0.0, h_out=2.0, scheme="preissmann")
+        with self.assertRaises(ValueError):
+            HydraulicSystem(nodes=initialize_nodes(4), delta_x=1.0, total_time=1.0, CFL=0.9,
+                            h_in=2.0, u_in=0.0, h_out=2.0, scheme="preissmann", delta_t=1.0, theta=0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
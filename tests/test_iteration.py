@@ -0,0 +1,57 @@
+# tests/test_iteration.py
+
+import unittest
+import numpy as np
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def make_system(**options):
+    nodes = initialize_nodes(30, h0=1.5, u0=0.5)
+    options.setdefault("output", OutputSchedule.at_interval(5.0))
+    return HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=20.0, CFL=0.9, h_in=2.5, u_in=1.5,
+                           h_out=1.2, **options)
+
+
+class TestStepIterators(unittest.TestCase):
+    def test_iter_snapshots_matches_run_simulation(self):
+        expected, _ = make_system().run_simulation()
+        views = [(view.t, view.h.copy()) for view in make_system().iter_snapshots()]
+        np.testing.assert_array_equal([t for t, h in views], expected.time)
+        np.testing.assert_array_equal(np.array([h for t, h in views]), expected.h)
+
+    def test_iter_steps_visits_every_step(self):
+        expected, _ = make_system(output=OutputSchedule.every_step()).run_simulation()
+        steps = []
+        for view in make_system(output=OutputSchedule.every_step()).iter_steps():
+            steps.append(view.step)
+            last = view
+        self.assertEqual(steps, list(range(1, len(expected) + 1)))
+        self.assertEqual(last.t, 20.0)
+        np.testing.assert_array_equal(last.hu, expected.Q[-1])
+
+    def test_views_are_read_only_and_not_copied(self):
+        system = make_system()
+        view = next(system.iter_steps())
+        self.assertFalse(view.U.flags.writeable)
+        self.assertTrue(np.shares_memory(view.U, system.state.U))
+        with self.assertRaises(ValueError):
+            view.h[0] = 0.0
+
+    def test_early_stop_with_subdomains(self):
+        serial = make_system()
+        expected = [view.h.copy() for view, _ in zip(serial.iter_steps(), range(5))]
+        system = make_system(subdomains=2)
+        iterator = system.iter_steps()
+        for k, view in enumerate(iterator):
+            np.testing.assert_array_equal(view.h, expected[k])
+            if k == 4:
+                break
+        iterator.close()
+        # Stopping early leaves the nodes untouched
+        self.assertTrue(all(node.flow.h == 1.5 for node in system.nodes.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
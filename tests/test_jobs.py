@@ -0,0 +1,75 @@
+# tests/test_jobs.py
+
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from src.cache import ResultCache
+from src.jobs import JobManager, DONE, CANCELLED
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def make_system(total_time=10.0):
+    nodes = initialize_nodes(50, h0=1.5, u0=0.5)
+    return HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=total_time, CFL=0.9, h_in=2.5, u_in=1.0,
+                           h_out=1.5, output=OutputSchedule.at_interval(2.0))
+
+
+def wait(job, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = JobManager(max_workers=2, cache=ResultCache(os.path.join(self.tmp.name, "cache")))
+
+    def tearDown(self):
+        self.manager.shutdown()
+        self.tmp.cleanup()
+
+    def test_background_run_matches_direct_run(self):
+        expected, _ = make_system().run_simulation()
+        job = wait(self.manager.submit(make_system()))
+        self.assertEqual(job.status, DONE)
+        np.testing.assert_array_equal(job.results.time, expected.time)
+        np.testing.assert_array_equal(job.results.h, expected.h)
+        progress = job.progress()
+        self.assertEqual(progress.fraction, 1.0)
+        self.assertGreater(progress.steps, 0)
+        np.testing.assert_array_equal(progress.profile[:, 0], expected.h[-1])
+
+        # The same inputs are served from the cache
+        again = wait(self.manager.submit(make_system()))
+        self.assertEqual(again.status, DONE)
+        self.assertEqual(self.manager.cache.hits, 1)
+
+    def test_cancel_stops_the_solver(self):
+        job = self.manager.submit(make_system(total_time=1e6))
+        while job.progress().steps < 5:
+            time.sleep(0.01)
+        self.manager.cancel(job.id)
+        wait(job)
+        self.assertEqual(job.status, CANCELLED)
+        self.assertLess(job.progress().t, 1e6)
+        self.assertIsNotNone(job.progress().profile)
+
+    def test_jobs_run_side_by_side(self):
+        slow = self.manager.submit(make_system(total_time=1e6))
+        fast = wait(self.manager.submit(make_system()))
+        self.assertEqual(fast.status, DONE)
+        self.assertFalse(slow.finished)
+        self.manager.forget(slow.id)
+        self.assertIsNone(self.manager.get(slow.id))
+        wait(slow)
+        self.assertEqual(slow.status, CANCELLED)
+
+
+if __name__ == '__main__':
+    unittest.main()
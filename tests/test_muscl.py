@@ -0,0 +1,77 @@
+# tests/test_muscl.py
+
+import unittest
+import numpy as np
+from src.numerics import minmod, van_leer, monotonized_central, muscl_interface_states
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+LENGTH = 1000.0
+
+
+def run_hump(num_cells, **options):
+    """
+    Smooth depth hump on a flat frictionless channel, stopped before waves reach the ends.
+    """
+    dx = LENGTH / num_cells
+    nodes = initialize_nodes(num_cells, h0=2.0, u0=0.0, S0=0.0, n=0.0)
+    xc = (np.arange(num_cells) + 0.5) * dx
+    for i, node in nodes.items():
+        node.flow.h = 2.0 + 0.2 * np.exp(-((xc[i] - LENGTH / 2) / (LENGTH / 12)) ** 2)
+        node.flow.A = node.flow.b * node.flow.h
+        node.flow.Q = 0.0
+    system = HydraulicSystem(nodes=nodes, delta_x=dx, total_time=20.0, CFL=0.8, h_in=2.0, u_in=0.0, h_out=2.0,
+                             output=OutputSchedule.final(), **options)
+    results, x = system.run_simulation()
+    return results.h[-1]
+
+
+class TestLimiters(unittest.TestCase):
+    def test_limiter_values(self):
+        a = np.array([1.0, 1.0, -2.0, 1.0])
+        b = np.array([3.0, -1.0, -1.0, 0.0])
+        np.testing.assert_allclose(minmod(a, b), [1.0, 0.0, -1.0, 0.0])
+        np.testing.assert_allclose(van_leer(a, b), [1.5, 0.0, -4.0 / 3.0, 0.0])
+        np.testing.assert_allclose(monotonized_central(a, b), [2.0, 0.0, -1.5, 0.0])
+
+    def test_reconstruction_is_exact_for_linear_data(self):
+        U_ext = np.column_stack([np.arange(8.0) + 1.0, np.zeros(8)])
+        U_left, U_right = muscl_interface_states(U_ext, "minmod")
+        np.testing.assert_allclose(U_left[:, 0], np.arange(5.0) + 2.5)
+        np.testing.assert_allclose(U_right[:, 0], np.arange(5.0) + 2.5)
+
+    def test_reconstruction_keeps_depth_positive(self):
+        U_ext = np.column_stack([[0.0, 0.0, 0.01, 2.0, 4.0, 4.0], np.zeros(6)])
+        U_left, U_right = muscl_interface_states(U_ext, "mc")
+        self.assertTrue(np.all(U_left[:, 0] >= 0.0))
+        self.assertTrue(np.all(U_right[:, 0] >= 0.0))
+
+
+class TestSecondOrderScheme(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = run_hump(1024, reconstruction="muscl", time_integration="ssp_rk3")
+
+    def error(self, num_cells, **options):
+        exact = self.reference.reshape(num_cells, -1).mean(axis=1)
+        return np.abs(run_hump(num_cells, **options) - exact).mean()
+
+    def test_second_order_convergence(self):
+        options = dict(reconstruction="muscl", limiter="van_leer", time_integration="ssp_rk2")
+        order = np.log2(self.error(64, **options) / self.error(128, **options))
+        self.assertGreater(order, 1.5)
+
+    def test_coarse_second_order_beats_fine_first_order(self):
+        options = dict(reconstruction="muscl", limiter="mc", time_integration="ssp_rk3")
+        self.assertLess(self.error(64, **options), self.error(128))
+        self.assertLess(self.error(128, **options), self.error(256))
+
+    def test_rejects_unknown_limiter(self):
+        with self.assertRaises(ValueError):
+            HydraulicSystem(nodes=initialize_nodes(4), delta_x=1.0, total_time=1.0, CFL=0.9,
+                            h_in=2.0, u_in=0.0, h_out=2.0, limiter="superbee")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+# tests/test_network.py
+
+import unittest
+import numpy as np
+from src.models import Node, OpenChannel
+from src.network import NetworkSystem, build_reaches, reach_levels
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes, add_connection
+
+
+def make_nodes(count, h0=2.0, u0=0.0, S0=0.0, n=0.03):
+    nodes = {}
+    for i in range(count):
+        flow = OpenChannel(Q=5.0 * h0 * u0, A=5.0 * h0, h=h0, b=5.0, theta=0.0, S0=S0, K=50.0, n=n)
+        nodes[i] = Node(id=i, flow=flow)
+    return nodes
+
+
+def chain(beta, ids):
+    for u, v in zip(ids[:-1], ids[1:]):
+        add_connection(beta, u, v, 1.0)
+
+
+class TestReachTopology(unittest.TestCase):
+    def test_dendritic_reaches_and_levels(self):
+        # Two tributaries (0-2, 3-5) join into a main stem (6-9) that splits into 10-11 and 12-13
+        beta = {}
+        chain(beta, [0, 1, 2]); chain(beta, [3, 4, 5]); chain(beta, [6, 7, 8, 9])
+        chain(beta, [10, 11]); chain(beta, [12, 13])
+        add_connection(beta, 2, 6, 1.0)
+        add_connection(beta, 5, 6, 1.0)
+        add_connection(beta, 9, 10, 0.7)
+        add_connection(beta, 9, 12, 0.3)
+        reaches = build_reaches(make_nodes(14), beta)
+        self.assertEqual([r.node_ids for r in reaches], [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9], [10, 11], [12, 13]])
+        self.assertEqual(sorted(reaches[2].upstream), [0, 1])
+        self.assertEqual(reaches[2].downstream, {3: 0.7, 4: 0.3})
+        self.assertEqual(reach_levels(reaches), [[0, 1], [2], [3, 4]])
+
+    def test_side_channel_splits_reaches(self):
+        # 0 -> 3 -> 1 bypasses the link 0 -> 1, so node 1 starts a new reach
+        beta = {}
+        chain(beta, [0, 1, 2])
+        add_connection(beta, 0, 3, 1.0)
+        add_connection(beta, 3, 1, 1.0)
+        reaches = build_reaches(make_nodes(4), beta)
+        self.assertEqual([r.node_ids for r in reaches], [[0], [1, 2], [3]])
+        self.assertEqual(reaches[0].downstream, {1: 1.0, 2: 1.0})
+        self.assertEqual(reach_levels(reaches), [[0], [2], [1]])
+
+    def test_reads_node_connections(self):
+        nodes = make_nodes(3)
+        nodes[0].connections[1] = 1.0
+        nodes[1].connections[2] = 1.0
+        self.assertEqual([r.node_ids for r in build_reaches(nodes)], [[0, 1, 2]])
+
+
+class TestNetworkSystem(unittest.TestCase):
+    def test_single_reach_matches_hydraulic_system(self):
+        nodes = initialize_nodes(30, h0=1.5, u0=0.5)
+        for i in range(29):
+            nodes[i].connections[i + 1] = 1.0
+        output = OutputSchedule.at_interval(10.0)
+        network = NetworkSystem(nodes, delta_x=10.0, total_time=30.0, CFL=0.9, h_in=2.0, u_in=2.0,
+                                h_out=1.5, output=output)
+        results, x = network.run_simulation(write_back=False)
+        system = HydraulicSystem(initialize_nodes(30, h0=1.5, u0=0.5), delta_x=10.0, total_time=30.0, CFL=0.9,
+                                 h_in=2.0, u_in=2.0, h_out=1.5, output=output)
+        expected, _ = system.run_simulation()
+        np.testing.assert_allclose(results.h, expected.h, rtol=1e-12)
+        np.testing.assert_allclose(results.Q, expected.Q, rtol=1e-12, atol=1e-12)
+
+    def test_closed_looped_network_conserves_volume(self):
+        # 0-3 splits into parallel branches 4-7 and 8-11, which rejoin at 12-15 and loop back to 0
+        beta = {}
+        chain(beta, [0, 1, 2, 3]); chain(beta, [4, 5, 6, 7]); chain(beta, [8, 9, 10, 11]); chain(beta, [12, 13, 14, 15])
+        add_connection(beta, 3, 4, 0.6)
+        add_connection(beta, 3, 8, 0.4)
+        add_connection(beta, 7, 12, 1.0)
+        add_connection(beta, 11, 12, 1.0)
+        add_connection(beta, 15, 0, 1.0)
+        nodes = make_nodes(16, u0=0.5)
+        for i in range(4):
+            nodes[i].flow.h = 3.0
+        network = NetworkSystem(nodes, delta_x=10.0, total_time=60.0, CFL=0.9, h_in=2.0, u_in=0.0,
+                                h_out=2.0, beta=beta, output=OutputSchedule.at_interval(20.0))
+        self.assertEqual([r.node_ids[0] for r in network.reaches], [4, 8, 12])
+        self.assertEqual(network.levels, [[0, 1, 2]])
+        volume0 = network.total_volume(network.base.U)
+        results, x = network.run_simulation()
+        for h in results.h:
+            self.assertAlmostEqual(5.0 * 10.0 * h.sum(), volume0, places=8)
+
+    def test_lake_at_rest_in_dendritic_network(self):
+        beta = {}
+        chain(beta, [0, 1, 2]); chain(beta, [3, 4, 5]); chain(beta, [6, 7, 8])
+        add_connection(beta, 2, 6, 1.0)
+        add_connection(beta, 5, 6, 1.0)
+        network = NetworkSystem(make_nodes(9), delta_x=10.0, total_time=20.0, CFL=0.9,
+                                h_in=2.0, u_in=0.0, h_out=2.0, beta=beta, output=OutputSchedule.final())
+        results, x = network.run_simulation()
+        np.testing.assert_allclose(results.h[-1], 2.0, atol=1e-12)
+        np.testing.assert_allclose(results.Q[-1], 0.0, atol=1e-12)
+
+    def test_bifurcation_splits_discharge_by_beta(self):
+        beta = {}
+        chain(beta, list(range(0, 10))); chain(beta, list(range(10, 20))); chain(beta, list(range(20, 30)))
+        add_connection(beta, 9, 10, 0.7)
+        add_connection(beta, 9, 20, 0.3)
+        network = NetworkSystem(make_nodes(30, u0=0.5, n=0.02), delta_x=20.0, total_time=3600.0, CFL=0.9,
+                                h_in={0: 2.0}, u_in={0: 0.5}, h_out={19: 2.0, 29: 2.0}, beta=beta,
+                                output=OutputSchedule.final())
+        network.run_simulation()
+        q_a = network.reach_state(1)[:, 1].mean()
+        q_b = network.reach_state(2)[:, 1].mean()
+        self.assertAlmostEqual(q_a / (q_a + q_b), 0.7, places=2)
+
+    def test_missing_boundary_value(self):
+        beta = {}
+        chain(beta, [0, 1])
+        add_connection(beta, 1, 2, 0.5)
+        add_connection(beta, 1, 3, 0.5)
+        with self.assertRaises(ValueError):
+            NetworkSystem(make_nodes(4), delta_x=10.0, total_time=1.0, CFL=0.9, h_in=2.0, u_in=0.0,
+                          h_out={2: 2.0}, beta=beta)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# tests/test_pipes.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.checkpoint import CheckpointWriter, load_checkpoint
+from src.network import NetworkSystem
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes, add_connection, slot_celerity_for_time_step
+
+D = float(np.sqrt(4.0 * 5.0 / np.pi))  # Crown of the default 5 m² pipe
+
+
+def mixed_nodes(channel_cells, pipe_cells, h0, u0=0.0, n=0.0):
+    """
+    An open channel draining into a storm sewer, as one chain of nodes.
+    """
+    nodes = initialize_nodes(channel_cells, h0=h0, u0=u0, b=2.0, S0=0.0, n=n)
+    pipes = initialize_nodes(pipe_cells, channel_type='PressurizedPipe', h0=h0, u0=u0, S0=0.0, n=n)
+    for i, node in pipes.items():
+        node.id = channel_cells + i
+        nodes[node.id] = node
+    return nodes
+
+
+class TestPreissmannSlot(unittest.TestCase):
+    def test_surcharged_pipe_stays_at_rest(self):
+        nodes = initialize_nodes(30, channel_type='PressurizedPipe', h0=D + 3.0, S0=0.0, n=0.013)
+        system = HydraulicSystem(nodes, delta_x=10.0, total_time=5.0, CFL=0.9, h_in=D + 3.0, u_in=0.0,
+                                 h_out=D + 3.0, output=OutputSchedule.final())
+        results, _ = system.run_simulation()
+        np.testing.assert_allclose(results.h[-1], D + 3.0, atol=1e-10)
+        np.testing.assert_allclose(results.Q[-1], 0.0, atol=1e-10)
+        self.assertAlmostEqual(nodes[0].flow.h, D + 3.0)
+        self.assertAlmostEqual(nodes[0].flow.top_width, 9.81 * 5.0 / 1000.0 ** 2)
+
+    def test_rerun_on_written_back_nodes_is_identical(self):
+        # Writing back the free-surface width must not widen the slot of the next run
+        nodes = initialize_nodes(20, channel_type='PressurizedPipe', h0=1.0, u0=0.5)
+        slot_width = nodes[0].flow.B
+        initial = {i: (node.flow.h, node.flow.Q, node.flow.A) for i, node in nodes.items()}
+        runs = []
+        for _ in range(2):
+            for i, node in nodes.items():
+                node.flow.h, node.flow.Q, node.flow.A = initial[i]
+            system = HydraulicSystem(nodes, delta_x=10.0, total_time=5.0, CFL=0.9, h_in=D + 1.0, u_in=0.5,
+                                     h_out=D + 0.5, output=OutputSchedule.final())
+            results, _ = system.run_simulation()
+            runs.append((system.n_steps, results.h[-1], results.Q[-1]))
+            self.assertEqual(nodes[0].flow.B, slot_width)
+        self.assertEqual(runs[0][0], runs[1][0])
+        np.testing.assert_array_equal(runs[0][1], runs[1][1])
+        np.testing.assert_array_equal(runs[0][2], runs[1][2])
+
+    def test_channel_to_pipe_transition_stays_at_rest(self):
+        for h0 in (0.5 * D, D + 1.0):
+            system = HydraulicSystem(mixed_nodes(20, 20, h0), delta_x=10.0, total_time=60.0, CFL=0.9,
+                                     h_in=h0, u_in=0.0, h_out=h0, output=OutputSchedule.final(), slot_celerity=30.0)
+            results, _ = system.run_simulation()
+            np.testing.assert_allclose(results.h[-1], h0, atol=1e-10)
+            np.testing.assert_allclose(results.Q[-1], 0.0, atol=1e-10)
+
+    def test_slot_celerity_keeps_time_step_practical(self):
+        options = dict(delta_x=10.0, total_time=1200.0, CFL=0.9, h_in=D + 1.0, u_in=0.5, h_out=D + 0.5)
+        celerity = slot_celerity_for_time_step(10.0, 0.5, CFL=0.9, velocity=2.0)
+        heads, discharges = [], []
+        for slot_celerity in (celerity, 2 * celerity):
+            system = HydraulicSystem(mixed_nodes(20, 40, 0.8 * D, n=0.015), slot_celerity=slot_celerity, **options)
+            for view in system.iter_steps():
+                steps = view.step
+            heads.append(system.state.head())
+            discharges.append(system.state.hu * system.state.b)
+            # About 0.5 s per step, where the 1000 m/s pressure wave speed alone would allow 0.009 s
+            self.assertLess(steps, 1.1 * 1200.0 / 0.5 * slot_celerity / celerity)
+            self.assertTrue(np.all(np.isfinite(heads[-1])))
+        self.assertGreater(heads[0][-40:].max(), D)
+        # The slot only slows the pressure waves down; the flow settles to the same state
+        np.testing.assert_allclose(heads[0], heads[1], atol=0.05)
+        np.testing.assert_allclose(discharges[0], discharges[1], rtol=0.05, atol=0.05)
+
+    def test_pipes_need_the_serial_finite_volume_scheme(self):
+        nodes = initialize_nodes(10, channel_type='PressurizedPipe', h0=1.0)
+        options = dict(delta_x=10.0, total_time=1.0, CFL=0.9, h_in=1.0, u_in=0.0, h_out=1.0)
+        with self.assertRaises(ValueError):
+            HydraulicSystem(nodes, scheme="preissmann", delta_t=1.0, **options)
+        with self.assertRaises(ValueError):
+            HydraulicSystem(nodes, subdomains=2, **options)
+        with self.assertRaises(ValueError):
+            HydraulicSystem(nodes, slot_celerity=0.0, **options)
+        self.assertEqual(HydraulicSystem(nodes, backend="jit", **options).active_backend, "numpy")
+
+    def test_checkpoint_keeps_slot_geometry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.npz")
+            system = HydraulicSystem(mixed_nodes(5, 5, D + 0.5), delta_x=10.0, total_time=5.0, CFL=0.9,
+                                     h_in=D + 0.5, u_in=0.0, h_out=D + 0.5, slot_celerity=20.0,
+                                     checkpoint=CheckpointWriter(path, every_steps=1))
+            system.run_simulation()
+            checkpoint = load_checkpoint(path)
+            np.testing.assert_allclose(checkpoint.crown, system.state.crown)
+            np.testing.assert_allclose(checkpoint.slot_ratio, system.state.slot_ratio)
+            np.testing.assert_allclose(checkpoint.to_state().head(), system.state.head())
+
+
+class TestPipeNetwork(unittest.TestCase):
+    def test_channels_join_into_a_sewer(self):
+        # Two open-channel tributaries (0-9, 10-19) surcharge a pipe (20-39)
+        nodes = mixed_nodes(20, 20, 0.8 * D, n=0.015)
+        beta = {}
+        for u in list(range(9)) + list(range(10, 19)) + list(range(20, 39)):
+            add_connection(beta, u, u + 1, 1.0)
+        add_connection(beta, 9, 20, 1.0)
+        add_connection(beta, 19, 20, 1.0)
+        at_rest = NetworkSystem(nodes, delta_x=10.0, total_time=30.0, CFL=0.9, h_in=0.8 * D, u_in=0.0,
+                                h_out=0.8 * D, beta=beta, output=OutputSchedule.final(), slot_celerity=30.0)
+        results, _ = at_rest.run_simulation(write_back=False)
+        np.testing.assert_allclose(results.h[-1], 0.8 * D, atol=1e-10)
+
+        system = NetworkSystem(nodes, delta_x=10.0, total_time=300.0, CFL=0.9, h_in=D + 1.0, u_in=1.0,
+                               h_out=D, beta=beta, output=OutputSchedule.final(), slot_celerity=30.0)
+        volume = system.total_volume(system.base.U)
+        results, _ = system.run_simulation()
+        self.assertTrue(np.all(np.isfinite(results.h)))
+        self.assertGreater(system.total_volume(), volume)
+        # The sewer surcharges: its head rises above the crown
+        self.assertGreater(results.h[-1, system.reaches[-1].cells].max(), D)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_profiling.py
+
+import unittest
+import numpy as np
+from src.profiling import PHASES, StepProfiler
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+def make_system(**options):
+    nodes = initialize_nodes(40, h0=1.5, u0=0.5)
+    return HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=30.0, CFL=0.9, h_in=2.5, u_in=1.5,
+                           h_out=1.2, output=OutputSchedule.at_interval(5.0), **options)
+
+
+class TestProfiling(unittest.TestCase):
+    def test_stats_of_numpy_run(self):
+        calls = []
+        profiler = StepProfiler(callback=lambda stats: calls.append(stats.steps), every=10)
+        system = make_system(profiler=profiler)
+        results, _ = system.run_simulation()
+        stats = profiler.stats
+
+        self.assertEqual(stats.steps, system.n_steps)
+        self.assertEqual(stats.records, len(results))
+        # Six output times and the end are hit by cutting dt, the rest are CFL-limited
+        self.assertEqual(stats.output_limited_steps, 6)
+        self.assertEqual(stats.cfl_limited_steps, stats.steps - 6)
+        self.assertLess(stats.dt_min, stats.dt_max)
+        for phase in ("cfl", "boundary", "flux", "update", "record"):
+            self.assertGreater(stats.phase_seconds[phase], 0.0)
+        self.assertLessEqual(sum(stats.phase_seconds.values()), stats.wall_seconds)
+        self.assertEqual(calls, list(range(10, stats.steps + 1, 10)))
+        self.assertEqual(set(stats.as_dict()["phase_seconds"]), set(PHASES))
+
+    def test_results_unchanged_and_reset_per_run(self):
+        expected, _ = make_system(time_integration="ssp_rk2").run_simulation()
+        system = make_system(time_integration="ssp_rk2", profiler=StepProfiler())
+        results, _ = system.run_simulation()
+        np.testing.assert_array_equal(results.h, expected.h)
+        steps = system.profiler.stats.steps
+        system.run_simulation()
+        self.assertEqual(system.profiler.stats.steps, steps)
+
+    def test_segment_backends_count_steps(self):
+        profiler = StepProfiler()
+        system = make_system(scheme="preissmann", delta_t=2.5, profiler=profiler)
+        system.run_simulation()
+        stats = profiler.stats
+        self.assertEqual(stats.steps, 12)
+        self.assertAlmostEqual(stats.dt_min, 2.5)
+        self.assertGreater(stats.phase_seconds["solver"], 0.0)
+        self.assertEqual(stats.phase_seconds["flux"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# tests/test_results.py
+
+import unittest
+import numpy as np
+from src.results import SimulationResults, OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+class TestSimulationResults(unittest.TestCase):
+    def setUp(self):
+        self.results = SimulationResults(np.array([0.0, 10.0, 20.0]), chunk_size=2)
+        for k in range(5):
+            self.results.append(0.5 * (k + 1), np.full(3, k + 1.0), np.full(3, 2.0 * k), np.full(3, 5.0 * (k + 1)))
+
+    def test_grows_in_chunks(self):
+        self.assertEqual(len(self.results), 5)
+        self.assertEqual(self.results.h.shape, (5, 3))
+        self.assertEqual(len(self.results._time) % 2, 0)
+        np.testing.assert_array_equal(self.results.time, [0.5, 1.0, 1.5, 2.0, 2.5])
+
+    def test_dataframe_shares_memory(self):
+        df = self.results.to_dataframe()
+        self.assertEqual(len(df), 15)
+        self.assertTrue(np.shares_memory(df["Depth (h)"].to_numpy(), self.results._h))
+        self.assertEqual(df.iloc[4]["Node"], 1)
+        self.assertEqual(df.iloc[4]["Time"], 1.0)
+
+    def test_records_view(self):
+        records = self.results.to_records()
+        self.assertEqual(len(records), 15)
+        self.assertEqual(records[-1], {
+            "Time": 2.5, "Node": 2, "x": 20.0,
+            "Depth (h)": 5.0, "Flow Rate (Q)": 8.0, "Area (A)": 25.0
+        })
+
+    def test_run_simulation_returns_store(self):
+        nodes = initialize_nodes(10)
+        system = HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=5.0, CFL=0.9,
+                                 h_in=2.0, u_in=2.0, h_out=2.0)
+        results, x = system.run_simulation()
+        self.assertIsInstance(results, SimulationResults)
+        self.assertAlmostEqual(results.time[-1], 5.0)
+        np.testing.assert_allclose(results.A[-1], 5.0 * results.h[-1])
+        np.testing.assert_array_equal(results.h[-1], [node.flow.h for node in nodes.values()])
+
+
+class TestOutputSchedule(unittest.TestCase):
+    def run_with(self, output):
+        nodes = initialize_nodes(20, h0=1.0, u0=0.0)
+        system = HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=30.0, CFL=0.9,
+                                 h_in=2.0, u_in=2.0, h_out=1.0, output=output)
+        results, x = system.run_simulation()
+        return results, nodes
+
+    def test_interval_hits_times_exactly(self):
+        results, _ = self.run_with(OutputSchedule.at_interval(7.0))
+        np.testing.assert_array_equal(results.time, [7.0, 14.0, 21.0, 28.0, 30.0])
+
+    def test_explicit_times_include_initial_state(self):
+        results, _ = self.run_with(OutputSchedule.at_times([12.5, 0.0, 3.0, 99.0]))
+        np.testing.assert_array_equal(results.time, [0.0, 3.0, 12.5])
+        np.testing.assert_array_equal(results.h[0], np.ones(20))
+
+    def test_every_n_steps_keeps_final_state(self):
+        every, _ = self.run_with(None)
+        decimated, nodes = self.run_with(OutputSchedule.every(4))
+        expected = list(every.time[3::4])
+        if expected[-1] != every.time[-1]:
+            expected.append(every.time[-1])
+        np.testing.assert_array_equal(decimated.time, expected)
+        np.testing.assert_array_equal(decimated.h[-1], [node.flow.h for node in nodes.values()])
+
+    def test_final_only(self):
+        results, nodes = self.run_with(OutputSchedule.final())
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results.time[0], 30.0)
+        np.testing.assert_array_equal(results.h[0], [node.flow.h for node in nodes.values()])
+
+    def test_rejects_multiple_modes(self):
+        with self.assertRaises(ValueError):
+            OutputSchedule(interval=1.0, final_only=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# tests/test_sections.py
+
+import unittest
+import numpy as np
+from src.hydrographs import DischargeInflow
+from src.results import OutputSchedule
+from src.sections import CrossSection, SectionTable, IrregularChannelSystem, AREA, PRESSURE
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+
+
+class TestCrossSection(unittest.TestCase):
+    def test_trapezoid_matches_formulas(self):
+        section = CrossSection.trapezoidal(4.0, 1.5, height=5.0)
+        h = np.array([0.25, 1.0, 3.0, 5.0])
+        props = section.properties(h)
+        np.testing.assert_allclose(props["A"], (4.0 + 1.5 * h) * h)
+        np.testing.assert_allclose(props["T"], 4.0 + 3.0 * h)
+        np.testing.assert_allclose(props["P"], 4.0 + 2.0 * h * np.sqrt(1 + 1.5 ** 2))
+
+    def test_walls_above_the_lower_bank(self):
+        section = CrossSection([0.0, 10.0, 20.0], [3.0, 0.0, 2.0])
+        props = section.properties([1.0, 4.0])
+        self.assertAlmostEqual(props["A"][0], 0.5 * (10 / 3 + 5.0) * 1.0)
+        # Level 4 is above both ends: full width, and 1 m and 2 m of wall
+        self.assertAlmostEqual(props["T"][1], 20.0)
+        self.assertAlmostEqual(props["A"][1], 10 * (4 - 1.5) + 10 * (4 - 1.0))
+        self.assertAlmostEqual(props["P"][1], np.hypot(10, 3) + np.hypot(10, 2) + 1.0 + 2.0)
+
+    def test_rejects_bad_surveys(self):
+        with self.assertRaises(ValueError):
+            CrossSection([0.0, 2.0, 1.0], [1.0, 0.0, 1.0])
+        with self.assertRaises(ValueError):
+            CrossSection([0.0, 1.0], [1.0])
+
+
+class TestSectionTable(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        station = np.linspace(0.0, 40.0, 25)
+        self.sections = [CrossSection(station, 4.0 - 3.0 * np.sin(np.pi * station / 40) + rng.uniform(0, 0.3, 25))
+                         for _ in range(3)]
+        self.table = SectionTable([self.sections[i % 3] for i in range(12)], max_depth=6.0, levels=1024)
+
+    def test_lookup_matches_exact_properties(self):
+        h = np.linspace(0.05, 5.5, 12)
+        props = self.table.lookup(h)
+        for i in range(12):
+            exact = self.sections[i % 3].properties([h[i]])
+            np.testing.assert_allclose(props[i, :3], [exact["A"][0], exact["T"][0], exact["P"][0]], rtol=1e-2)
+        self.assertEqual(self.table.num_sections, 3)
+        self.assertFalse(self.table.prismatic)
+
+    def test_tables_are_monotone_and_invertible(self):
+        by_depth = self.table.by_depth.reshape(3, -1, 4)
+        self.assertTrue(np.all(np.diff(by_depth[..., AREA], axis=1) >= 0))
+        self.assertTrue(np.all(np.diff(by_depth[..., PRESSURE], axis=1) >= 0))
+        h = np.linspace(0.1, 5.9, 12)
+        np.testing.assert_allclose(self.table.depth(self.table.area(h)), h, atol=5e-3)
+
+
+class TestIrregularChannelSystem(unittest.TestCase):
+    def test_rectangle_matches_rectangular_solver(self):
+        b = 5.0
+        options = dict(delta_x=10.0, total_time=120.0, CFL=0.5, h_in=1.5, u_in=0.8, h_out=1.0,
+                       output=OutputSchedule.at_interval(40.0))
+        reference, _ = HydraulicSystem(initialize_nodes(60, h0=1.0, u0=0.5, b=b, n=0.0), **options).run_simulation()
+        system = IrregularChannelSystem(initialize_nodes(60, h0=1.0, u0=0.5, b=b, n=0.0),
+                                        CrossSection.rectangular(b, 10.0), **options)
+        results, _ = system.run_simulation()
+        np.testing.assert_allclose(results.time, reference.time)
+        np.testing.assert_allclose(results.h, reference.h, atol=1e-3)
+        np.testing.assert_allclose(results.Q, reference.Q * b, atol=1e-2)
+
+    def test_lake_at_rest_in_changing_sections(self):
+        num_cells = 30
+        sections = [CrossSection.trapezoidal(2.0 + 0.1 * i, 1.0 + 0.05 * i, height=5.0) for i in range(num_cells)]
+        nodes = initialize_nodes(num_cells, h0=2.0, u0=0.0, S0=0.0)
+        system = IrregularChannelSystem(nodes, sections, delta_x=10.0, total_time=60.0, CFL=0.8,
+                                        h_in=2.0, u_in=0.0, h_out=2.0, output=OutputSchedule.final())
+        results, _ = system.run_simulation()
+        np.testing.assert_allclose(results.h[-1], 2.0, atol=1e-4)
+        self.assertLess(np.abs(results.Q[-1]).max(), 1e-2)
+
+    def test_still_pool_with_default_section_height(self):
+        # The factories build 100 m deep sections; the tables must still resolve a 2 m pool
+        for section in (CrossSection.trapezoidal(2.0, 1.0), CrossSection.rectangular(5.0)):
+            nodes = initialize_nodes(30, h0=2.0, u0=0.0, S0=0.0)
+            system = IrregularChannelSystem(nodes, section, delta_x=10.0, total_time=300.0, CFL=0.8,
+                                            h_in=2.0, u_in=0.0, h_out=2.0, output=OutputSchedule.final())
+            self.assertEqual(system.n_steps, 0)
+            np.testing.assert_allclose(system.table.depth(system.initial_state()[:, 0]), 2.0, atol=1e-4)
+            results, _ = system.run_simulation()
+            self.assertGreater(system.n_steps, 0)
+            np.testing.assert_allclose(results.h[-1], 2.0, atol=1e-4)
+            self.assertLess(np.abs(results.Q[-1]).max(), 1e-6)
+
+    def test_non_finite_areas_give_nan_depths(self):
+        table = SectionTable.prismatic_channel(CrossSection.rectangular(5.0), 3, max_depth=4.0)
+        h = table.depth(np.array([np.nan, 10.0, 100.0]))
+        self.assertTrue(np.isnan(h[0]))
+        np.testing.assert_allclose(h[1:], [2.0, 20.0], atol=1e-4)
+
+    def test_discharge_inflow_reaches_steady_state(self):
+        Q = 12.0
+        nodes = initialize_nodes(40, h0=1.0, u0=0.0, S0=0.0, n=0.03)
+        system = IrregularChannelSystem(nodes, CrossSection([0, 5, 10, 15], [3, 0, 0.5, 3]), delta_x=10.0,
+                                        total_time=1500.0, CFL=0.8, h_in=1.0, u_in=0.0, h_out=1.0,
+                                        output=OutputSchedule.final(), upstream=DischargeInflow([0.0], [Q]))
+        results, _ = system.run_simulation()
+        # Steady: every face carries the inflow, so no cell's area changes
+        rate, _ = system.step(system.state, system.total_time)
+        self.assertLess(np.abs(rate[:, 0]).max() * system.delta_x, 1e-3 * Q)
+        self.assertAlmostEqual(nodes[0].flow.Q, results.Q[-1, 0])
+
+    def test_section_count_must_match(self):
+        with self.assertRaises(ValueError):
+            IrregularChannelSystem(initialize_nodes(5), [CrossSection.rectangular(5.0)] * 4, delta_x=10.0,
+                                   total_time=1.0, CFL=0.5, h_in=1.0, u_in=0.0, h_out=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
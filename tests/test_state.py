@@ -0,0 +1,50 @@
+# tests/test_state.py
+
+import unittest
+import numpy as np
+from src.models import Node, OpenChannel, PressurizedPipe
+from src.solver import HydraulicSystem
+from src.state import ChannelState
+from src.utilities import initialize_nodes
+
+
+class TestChannelState(unittest.TestCase):
+    def setUp(self):
+        self.nodes = {
+            0: Node(id=0, flow=OpenChannel(Q=10.0, A=10.0, h=2.0, b=5.0, theta=0.0, S0=0.001, K=50.0, n=0.03)),
+            1: Node(id=1, flow=OpenChannel(Q=6.0, A=6.0, h=2.0, b=3.0, theta=0.0, S0=0.002, K=50.0, n=0.02)),
+            2: Node(id=2, flow=PressurizedPipe(Q=4.0, A=4.0, h=2.0, Af=4.0, Cp=300.0, B=0.01, D=2.0)),
+        }
+
+    def test_from_nodes_gathers_per_cell_arrays(self):
+        state = ChannelState.from_nodes(self.nodes)
+        np.testing.assert_array_equal(state.U, [[2.0, 2.0], [2.0, 2.0], [2.0, 2.0]])
+        np.testing.assert_array_equal(state.b, [5.0, 3.0, 2.0])
+        np.testing.assert_array_equal(state.S0, [0.001, 0.002, 0.0])
+        np.testing.assert_array_equal(state.n, [0.03, 0.02, 0.0])
+        np.testing.assert_array_equal(state.is_open, [True, True, False])
+        np.testing.assert_array_equal(state.area(), [10.0, 6.0, 4.0])
+
+    def test_write_back(self):
+        state = ChannelState.from_nodes(self.nodes)
+        state.U = np.array([[1.0, 0.5], [1.5, 0.25], [3.0, 1.0]])
+        state.write_back(self.nodes)
+        self.assertEqual(self.nodes[0].flow.h, 1.0)
+        self.assertEqual(self.nodes[1].flow.A, 4.5)
+        self.assertEqual(self.nodes[1].flow.Q, 0.25)
+        # The pipe is surcharged: its area includes the slot and its free surface is the slot
+        self.assertEqual(self.nodes[2].flow.A, 6.0)
+        self.assertAlmostEqual(self.nodes[2].flow.top_width, 0.01)
+        self.assertEqual(self.nodes[2].flow.B, 0.01)
+
+    def test_nodes_untouched_without_write_back(self):
+        nodes = initialize_nodes(10, h0=1.0)
+        system = HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=5.0, CFL=0.9,
+                                 h_in=2.0, u_in=2.0, h_out=1.0)
+        results, x = system.run_simulation(write_back=False)
+        self.assertTrue(all(node.flow.h == 1.0 for node in nodes.values()))
+        np.testing.assert_array_equal(system.state.h, results.h[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# tests/test_steady.py
+
+import unittest
+import numpy as np
+from src.hydrographs import DischargeInflow, StageOutflow
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.state import ChannelState
+from src.steady import critical_depth, gvf_profile, initialize_steady_nodes
+from src.utilities import initialize_nodes
+
+
+def make_system(**options):
+    nodes = initialize_nodes(50, h0=2.0, u0=1.0, S0=-0.0005, n=0.03)
+    return HydraulicSystem(nodes=nodes, delta_x=20.0, total_time=300.0, CFL=0.9, h_in=2.0, u_in=1.0,
+                           h_out=2.0, output=OutputSchedule.at_times([0.0, 300.0]), **options)
+
+
+class TestGVFProfile(unittest.TestCase):
+    def test_uniform_flow_at_normal_depth(self):
+        # Normal depth on a downhill reach (S0 < 0 in the solver's convention): S0 + Sf = 0
+        q, n, S0 = 2.0, 0.03, -0.001
+        h_normal = (n ** 2 * q ** 2 / -S0) ** (3 / 10)
+        h = gvf_profile(40, 10.0, q, S0, n, h_out=h_normal)
+        np.testing.assert_allclose(h, h_normal, rtol=1e-8)
+
+    def test_backwater_curve_rises_toward_control(self):
+        h = gvf_profile(40, 10.0, 2.0, -0.001, 0.03, h_out=3.0)
+        self.assertTrue(np.all(np.diff(h) > 0))
+        self.assertTrue(np.all(h > critical_depth(2.0)))
+
+    def test_supercritical_needs_upstream_depth(self):
+        with self.assertRaises(ValueError):
+            gvf_profile(10, 10.0, 5.0, -0.01, 0.01, h_out=0.5)
+        h = gvf_profile(10, 10.0, 5.0, -0.01, 0.01, h_out=0.5, h_in=0.6)
+        self.assertTrue(np.all(h < critical_depth(5.0)))
+
+    def test_march_stops_once_the_depth_is_uniform(self):
+        # Varying roughness near the control, then a long uniform reach at normal depth
+        q, S0 = 2.0, -0.001
+        n = np.full(2000, 0.03)
+        n[-5:] = 0.05
+        h = gvf_profile(2000, 10.0, q, S0, n, h_out=2.5)
+        h_normal = (0.03 ** 2 * q ** 2 / -S0) ** (3 / 10)
+        np.testing.assert_allclose(h[:1000], h[0])
+        np.testing.assert_allclose(h[0], h_normal, rtol=1e-8)
+
+    def test_nodes_round_trip(self):
+        nodes = initialize_nodes(20, S0=-0.0005)
+        h, hu = initialize_steady_nodes(nodes, 20.0, 1.5, 2.0)
+        state = ChannelState.from_nodes(nodes)
+        np.testing.assert_allclose(state.h, h)
+        np.testing.assert_allclose(state.hu, 1.5)
+
+
+class TestWarmStart(unittest.TestCase):
+    def drift(self, system):
+        results, x = system.run_simulation()
+        return np.abs(results.h[1] - results.h[0]).max()
+
+    def test_fvm_warm_start_is_near_equilibrium(self):
+        cold = self.drift(make_system())
+        warm_system = make_system()
+        warm_system.initialize_steady_state()
+        self.assertLess(self.drift(warm_system), cold / 20)
+
+    def test_warm_start_uses_hydrographs_at_time_zero(self):
+        upstream = DischargeInflow([0.0, 600.0], [7.5, 20.0])
+        downstream = StageOutflow([0.0, 600.0], [2.5, 1.0])
+        system = make_system(upstream=upstream, downstream=downstream)
+        h = system.initialize_steady_state()
+        state = ChannelState.from_nodes(system.nodes)
+        np.testing.assert_allclose(state.hu, 7.5 / 5.0)
+        np.testing.assert_allclose(h, gvf_profile(50, 20.0, 1.5, -0.0005, 0.03, h_out=2.5))
+
+    def test_matches_preissmann_steady_state(self):
+        system = make_system(scheme="preissmann", delta_t=600.0)
+        h = system.initialize_steady_state()
+        system.total_time = 6 * 3600.0
+        system.output = OutputSchedule.final()
+        results, x = system.run_simulation()
+        np.testing.assert_allclose(results.h[-1], h, rtol=5e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# tests/test_streaming.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from unittest import mock
+from src.checkpoint import CheckpointWriter
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.streaming import ChunkedResultWriter, ChunkedResults
+from src.utilities import initialize_nodes
+
+
+def make_system():
+    nodes = initialize_nodes(25, h0=1.5, u0=0.5)
+    return HydraulicSystem(nodes=nodes, delta_x=10.0, total_time=20.0, CFL=0.9, h_in=2.5, u_in=1.5,
+                           h_out=1.2, output=OutputSchedule.at_interval(0.5))
+
+
+class Preempted(Exception):
+    pass
+
+
+class PreemptingWriter(CheckpointWriter):
+    """
+    Kills the run right after its second checkpoint has been written.
+    """
+
+    def maybe_write(self, system, state, t, n):
+        if self._pending is not None:
+            self._pending.result()
+        written = super().maybe_write(system, state, t, n)
+        if self.written == 2:
+            self._pending.result()
+            raise Preempted()
+        return written
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "out")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writer_chunks_and_reader_windows(self):
+        x = np.arange(6) * 2.0
+        writer = ChunkedResultWriter(self.directory, x, chunk_size=4)
+        for k in range(10):
+            writer.append(float(k), np.full(6, k), np.arange(6) + k, np.ones(6))
+        writer.close()
+        reader = ChunkedResults(self.directory)
+        self.assertEqual(len(reader), 10)
+        self.assertEqual([c["rows"] for c in reader.chunks], [4, 4, 2])
+        np.testing.assert_array_equal(reader.time, np.arange(10.0))
+
+        window = reader.read(3.0, 6.0, cells=slice(2, 5))
+        np.testing.assert_array_equal(window.time, [3.0, 4.0, 5.0, 6.0])
+        np.testing.assert_array_equal(window.x, [4.0, 6.0, 8.0])
+        np.testing.assert_array_equal(window.Q[0], [5.0, 6.0, 7.0])
+        self.assertEqual(len(reader.read(3.2, 3.8)), 0)
+
+    def test_stream_matches_in_memory_run(self):
+        expected, _ = make_system().run_simulation()
+        results, x = make_system().run_simulation(stream_to=self.directory)
+        self.assertIsInstance(results, ChunkedResults)
+        self.assertEqual(len(results), len(expected))
+        everything = results.read()
+        np.testing.assert_array_equal(everything.time, expected.time)
+        np.testing.assert_array_equal(everything.h, expected.h)
+        np.testing.assert_array_equal(everything.A, expected.A)
+        self.assertEqual(len(results.to_dataframe()), len(expected.to_dataframe()))
+
+    def test_rerun_replaces_old_chunks(self):
+        writer = ChunkedResultWriter(self.directory, np.zeros(2), chunk_size=1)
+        for k in range(5):
+            writer.append(float(k), np.zeros(2), np.zeros(2), np.zeros(2))
+        writer.close()
+        writer = ChunkedResultWriter(self.directory, np.zeros(2), chunk_size=1)
+        writer.append(0.0, np.ones(2), np.ones(2), np.ones(2))
+        writer.close()
+        self.assertEqual(len(ChunkedResults(self.directory)), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "h_000004.npy")))
+
+    def test_resumed_run_appends_to_its_stream(self):
+        expected, _ = make_system().run_simulation()
+        checkpoint = os.path.join(self.tmp.name, "run.ckpt")
+        system = make_system()
+        system.checkpoint = PreemptingWriter(checkpoint, every_steps=10)
+        with self.assertRaises(Preempted):
+            system.run_simulation(stream_to=self.directory)
+        results, _ = make_system().run_simulation(resume_from=checkpoint, stream_to=self.directory)
+        everything = results.read()
+        np.testing.assert_array_equal(everything.time, expected.time)
+        np.testing.assert_array_equal(everything.h, expected.h)
+
+    def test_resume_rejects_another_grid(self):
+        writer = ChunkedResultWriter(self.directory, np.zeros(3), chunk_size=1)
+        writer.append(0.0, np.zeros(3), np.zeros(3), np.zeros(3))
+        writer.close()
+        with self.assertRaises(ValueError):
+            ChunkedResultWriter(self.directory, np.zeros(2), resume_after=0.0)
+
+    def test_close_error_does_not_hide_solver_error(self):
+        system = make_system()
+        with mock.patch.object(system, "_time_loop", side_effect=Preempted()), \
+                mock.patch.object(ChunkedResultWriter, "close", side_effect=OSError("disk full")):
+            with self.assertRaises(Preempted):
+                system.run_simulation(stream_to=self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_sweep.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.sweep import parameter_grid, run_sweep, DONE, FAILED, PENDING
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "sweep")
+        self.base = {"num_nodes": 10, "delta_x": 10.0, "total_time": 5.0, "CFL": 0.9,
+                     "h_in": 2.0, "u_in": 2.0, "h_out": 2.0}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parameter_grid(self):
+        grid = parameter_grid({"h_in": [1.0, 2.0], "n": [0.02, 0.03, 0.04]})
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[1], {"h_in": 1.0, "n": 0.03})
+
+    def test_sweep_failure_isolation_and_resume(self):
+        samples = parameter_grid({"h_in": [1.5, 2.5], "n": [0.02, 0.04]})
+        samples.append({"channel_type": "Unknown"})
+        calls = []
+        result = run_sweep(samples, self.base, self.directory, workers=2,
+                           progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual(list(result.status), [DONE] * 4 + [FAILED])
+        self.assertEqual(result.failed, [4])
+        self.assertIn(4, result.errors)
+        self.assertEqual(calls[-1], (5, 5))
+        self.assertGreater(result.h[0].min(), 0.0)
+        self.assertFalse(np.array_equal(result.h[0], result.h[3]))
+
+        # Simulate a crash that lost run 1, then resume
+        expected = np.array(result.h[1])
+        status = np.load(os.path.join(self.directory, "status.npy"), mmap_mode="r+")
+        status[1] = PENDING
+        status.flush()
+        del status
+        calls.clear()
+        resumed = run_sweep(samples, self.base, self.directory, workers=1,
+                            progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual(calls[0], (3, 5))
+        self.assertEqual(resumed.status[1], DONE)
+        np.testing.assert_array_equal(resumed.h[1], expected)
+
+    def test_resume_rejects_different_sweep(self):
+        run_sweep([{"h_in": 1.5}], self.base, self.directory, workers=1)
+        with self.assertRaises(ValueError):
+            run_sweep([{"h_in": 2.5}], self.base, self.directory, workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
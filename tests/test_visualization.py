@@ -0,0 +1,61 @@
+# tests/test_visualization.py
+
+import unittest
+import numpy as np
+from src.results import OutputSchedule
+from src.solver import HydraulicSystem
+from src.utilities import initialize_nodes
+from src.visualization import (
+    lttb, plot_flow_rate, plot_hydraulic_head, plot_free_surface_width, plot_space_time, plot_animation
+)
+
+
+class TestLTTB(unittest.TestCase):
+    def test_keeps_endpoints_and_peaks(self):
+        x = np.arange(10000.0)
+        y = np.sin(x / 500.0)
+        y[4321] = 5.0
+        keep = lttb(x, y, 200)
+        self.assertEqual(len(keep), 200)
+        self.assertEqual((keep[0], keep[-1]), (0, 9999))
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        self.assertIn(4321, keep)
+
+    def test_short_input_untouched(self):
+        np.testing.assert_array_equal(lttb(np.arange(5.0), np.ones(5), 10), np.arange(5))
+
+
+class TestPlots(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        system = HydraulicSystem(initialize_nodes(3000, h0=1.5), delta_x=1.0, total_time=2.0, CFL=0.9,
+                                 h_in=2.5, u_in=1.0, h_out=1.5, output=OutputSchedule.every_step())
+        cls.results, cls.x = system.run_simulation()
+        cls.df = cls.results.to_dataframe()
+
+    def test_profile_is_one_downsampled_trace(self):
+        fig = plot_hydraulic_head(self.df, max_points=500)
+        self.assertEqual(len(fig.data), 1)
+        self.assertEqual(len(fig.data[0].x), 500)
+        final = self.results.h[-1]
+        self.assertAlmostEqual(max(fig.data[0].y), final.max())
+        self.assertEqual(len(plot_flow_rate(self.df).data[0].x), 2000)
+
+    def test_missing_column_gives_empty_figure(self):
+        self.assertEqual(len(plot_free_surface_width(self.df).data), 0)
+
+    def test_space_time_heatmap_is_decimated(self):
+        fig = plot_space_time(self.results, "h", max_times=10, max_cells=50)
+        self.assertEqual(np.shape(fig.data[0].z), (10, 50))
+        self.assertEqual(fig.data[0].y[-1], self.results.time[-1])
+        from_df = plot_space_time(self.df.iloc[:3000 * 4], "Q", max_times=10, max_cells=50)
+        self.assertEqual(np.shape(from_df.data[0].z), (4, 50))
+
+    def test_animation_frames(self):
+        fig = plot_animation(self.results, "A", max_frames=5, max_points=100)
+        self.assertEqual(len(fig.frames), 5)
+        self.assertEqual(len(fig.frames[0].data[0].x), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()